@@ -0,0 +1,18 @@
+import threading
+import time
+
+_log_lock = threading.Lock()
+
+
+def write_log_entry(log_path, level, message):
+    print(f"[{level}] {message}")
+    if not log_path:
+        return
+
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        with _log_lock:
+            with open(log_path, 'a', encoding='utf-8') as log_file:
+                log_file.write(f"\n[ {timestamp} ]  {level}\n{message}\n")
+    except Exception as exc:
+        print(f"Unable to write activity log {log_path}: {exc}")
@@ -0,0 +1,115 @@
+# Compares the Python-side memory of a queue held as plain dicts, the way
+# records were stored before QueueRecord and MediaInfo, with the slotted
+# records. Run from the repository root:
+#
+#     python benchmarks/queue_memory.py --files 200000
+
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from queue_record import MediaInfo, QueueRecord
+
+CODECS = ['h264', 'hevc', 'mpeg4', 'vp9']
+RESOLUTIONS = [(1920, 1080), (1280, 720), (3840, 2160), (720, 480)]
+
+
+def build_analysis(index):
+    # Probe results come from parsing ffprobe's JSON, so every file gets its
+    # own copies of the same codec and label strings.
+    codec = CODECS[index % len(CODECS)]
+    width, height = RESOLUTIONS[index % len(RESOLUTIONS)]
+    probe = json.loads(json.dumps({
+        'duration_seconds': 1200.0 + index % 3600,
+        'video_codec': codec,
+        'audio_codec': 'aac',
+        'audio_channels': 2,
+        'width': width,
+        'height': height,
+    }))
+    duration_seconds = probe['duration_seconds']
+    return {
+        **probe,
+        'length_formatted': f"{int(duration_seconds // 3600):02}:{int(duration_seconds % 3600 // 60):02}:00",
+        'mb_per_min_before': 40.0 + index % 50,
+        'estimated_seconds': duration_seconds / 2.5,
+        'estimated_display': "00:08:00",
+        'estimated_output_size_mb': duration_seconds / 6.0,
+        'resolved_encoder': ''.join(['lib', 'x265']),
+        'encoder_label': ''.join(['CPU H.265 ', '(libx265)']),
+        'video_codec_label': codec.upper(),
+        'resolution_label': f"{width}x{height}",
+        'audio_label': ''.join(['AAC ', '2ch']),
+    }
+
+
+def build_path(index):
+    return f"/media/library/show {index // 100:05}/season {index % 10:02}/episode {index:07}.mkv"
+
+
+def build_dict_record(row, file_path, analysis):
+    return {
+        'row': row,
+        'file_path': file_path,
+        'filename': os.path.basename(file_path),
+        'size_mb': 1500.0 + row % 1000,
+        'status': ''.join(['Ana', 'lyzed']),
+        'source_info': analysis,
+        'resolved_encoder': ''.join(['lib', 'x265']),
+        'priority_preset': None,
+        'estimated_seconds': analysis['estimated_seconds'],
+        'eta_seconds': None,
+        'eta_display': '--',
+        'elapsed_seconds': 0.0,
+        'elapsed_display': '',
+        'avg_speed_multiplier': 0.0,
+        'avg_speed_display': '',
+        'output_size_mb': None,
+    }
+
+
+def build_slotted_record(row, file_path, analysis):
+    record = QueueRecord(row, file_path, 1500.0 + row % 1000, ''.join(['lib', 'x265']))
+    record['status'] = ''.join(['Ana', 'lyzed'])
+    record['source_info'] = MediaInfo(analysis)
+    record['estimated_seconds'] = analysis['estimated_seconds']
+    return record
+
+
+def measure(build_record, file_count):
+    # Paths are built up front and kept by both layouts, so only the records
+    # and the indexes the queue keeps over them are measured.
+    paths = [build_path(index) for index in range(file_count)]
+    tracemalloc.start()
+    files_list = []
+    records_by_path = {}
+    records_by_row = {}
+    for row, file_path in enumerate(paths):
+        record = build_record(row, file_path, build_analysis(row))
+        files_list.append(record)
+        records_by_path[file_path] = record
+        records_by_row[row] = record
+    current_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=200000)
+    args = parser.parse_args()
+
+    results = []
+    for label, build_record in (('dict', build_dict_record), ('slotted', build_slotted_record)):
+        used_bytes = measure(build_record, args.files)
+        results.append(used_bytes)
+        print(f"{label:>8}: {used_bytes / 1024 ** 2:7.1f} MiB ({used_bytes / args.files:.0f} B/file)")
+    print(f"reduction: {(1 - results[1] / results[0]) * 100:.0f}%")
+
+
+if __name__ == '__main__':
+    main()
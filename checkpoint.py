@@ -0,0 +1,129 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+
+
+class EncodeCheckpoint:
+    STATE_FILE = "checkpoint.json"
+    SEGMENT_PATTERN = "segment_%05d{extension}"
+    END_TOLERANCE_SECONDS = 1.0
+
+    def __init__(self, checkpoint_root, source_path, signature):
+        self.source_path = source_path
+        self.signature = signature
+        stat_result = os.stat(source_path)
+        self.source_size = stat_result.st_size
+        self.source_mtime = stat_result.st_mtime
+        self.extension = os.path.splitext(source_path)[1] or '.mkv'
+        key_text = f"{os.path.abspath(source_path)}|{self.source_size}|{self.source_mtime}"
+        self.folder = os.path.join(checkpoint_root, hashlib.sha1(key_text.encode('utf-8')).hexdigest()[:16])
+        self.state_path = os.path.join(self.folder, self.STATE_FILE)
+        self.runs = []
+        self.load()
+
+    def load(self):
+        state = None
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as state_file:
+                    state = json.load(state_file)
+            except Exception as exc:
+                print(f"Unable to read checkpoint {self.state_path}: {exc}")
+
+        if state and state.get('signature') == self.signature:
+            self.runs = state.get('runs', [])
+            return
+
+        if state:
+            print(f"Encode settings changed for {self.source_path}; discarding checkpoint")
+        self.discard()
+        self.runs = []
+
+    def save(self):
+        os.makedirs(self.folder, exist_ok=True)
+        state = {
+            'source_path': self.source_path,
+            'source_size': self.source_size,
+            'source_mtime': self.source_mtime,
+            'signature': self.signature,
+            'runs': self.runs,
+        }
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as state_file:
+            json.dump(state, state_file)
+        os.replace(temp_path, self.state_path)
+
+    def get_completed_segments(self):
+        # ffmpeg's segment muxer only lists a segment once it has been closed,
+        # so the per-run lists double as crash-safe progress records.
+        segments = []
+        for run in self.runs:
+            list_path = os.path.join(self.folder, run['list_file'])
+            if not os.path.exists(list_path):
+                continue
+            with open(list_path, 'r', encoding='utf-8', newline='') as list_file:
+                for entry in csv.reader(list_file):
+                    if len(entry) < 3:
+                        continue
+                    segment_name = os.path.basename(entry[0])
+                    if not os.path.exists(os.path.join(self.folder, segment_name)):
+                        continue
+                    segments.append({
+                        'file': segment_name,
+                        'start': run['offset'] + float(entry[1]),
+                        'end': run['offset'] + float(entry[2]),
+                    })
+        return segments
+
+    def get_resume_point(self):
+        segments = self.get_completed_segments()
+        if not segments:
+            return 0.0, 0
+        return segments[-1]['end'], len(segments)
+
+    def is_complete(self, duration_seconds):
+        resume_offset, _ = self.get_resume_point()
+        return bool(duration_seconds) and resume_offset >= duration_seconds - self.END_TOLERANCE_SECONDS
+
+    def start_run(self):
+        resume_offset, next_index = self.get_resume_point()
+        self._remove_unlisted_segments()
+        run = {
+            'list_file': f"run_{len(self.runs):03d}.csv",
+            'offset': resume_offset,
+            'first_index': next_index,
+        }
+        self.runs.append(run)
+        self.save()
+        return run
+
+    def get_run_list_path(self, run):
+        return os.path.join(self.folder, run['list_file'])
+
+    def get_segment_output_pattern(self):
+        return os.path.join(self.folder, self.SEGMENT_PATTERN.format(extension=self.extension))
+
+    def write_concat_list(self):
+        concat_path = os.path.join(self.folder, "concat.txt")
+        with open(concat_path, 'w', encoding='utf-8') as concat_file:
+            for segment in self.get_completed_segments():
+                segment_path = os.path.join(self.folder, segment['file']).replace('\\', '/').replace("'", "'\\''")
+                concat_file.write(f"file '{segment_path}'\n")
+        return concat_path
+
+    def discard(self):
+        if os.path.isdir(self.folder):
+            shutil.rmtree(self.folder, ignore_errors=True)
+
+    def _remove_unlisted_segments(self):
+        if not os.path.isdir(self.folder):
+            return
+        listed_files = {segment['file'] for segment in self.get_completed_segments()}
+        for entry in os.listdir(self.folder):
+            if entry.startswith("segment_") and entry not in listed_files:
+                try:
+                    os.remove(os.path.join(self.folder, entry))
+                except OSError as exc:
+                    print(f"Unable to remove partial segment {entry}: {exc}")
@@ -0,0 +1,143 @@
+import time
+
+from activity_log import write_log_entry
+
+
+class ConcurrencyController:
+    WARMUP_SECONDS = 30.0
+    WINDOW_SECONDS = 120.0
+    GAP_TOLERANCE_SECONDS = 20.0
+    SAMPLE_INTERVAL = 1.0
+    MIN_IMPROVEMENT = 0.05
+    REPROBE_WINDOWS = 10
+
+    def __init__(self, max_jobs, log_path='', min_jobs=1):
+        self.min_jobs = max(int(min_jobs), 1)
+        self.max_jobs = max(int(max_jobs), self.min_jobs)
+        self.log_path = log_path
+        self.target_jobs = self.min_jobs
+        self.direction = 1
+        self.previous_level = None
+        self.settled = False
+        self.settled_windows = 0
+        self.last_throughput = 0.0
+        self.window_started = time.time()
+        self.window_saturated = False
+        self.gap_started = None
+        self.last_sample_at = 0.0
+        self.samples = []
+        self.log(f"Auto concurrency started at {self.target_jobs} job(s), limit {self.max_jobs}")
+
+    def observe(self, speeds, running_jobs, now=None):
+        now = time.time() if now is None else now
+
+        # Only a saturated level says anything about how that level performs;
+        # while jobs are spinning up, draining or being trimmed, start over.
+        # Once saturated, the short gap between one job finishing and the
+        # next starting is skipped instead of restarting the window.
+        if running_jobs == self.target_jobs:
+            self.window_saturated = True
+            self.gap_started = None
+        elif running_jobs > self.target_jobs or not self.window_saturated:
+            self._restart_window(now)
+            return self.target_jobs
+        else:
+            if self.gap_started is None:
+                self.gap_started = now
+            if now - self.gap_started > self.GAP_TOLERANCE_SECONDS:
+                self._restart_window(now)
+            return self.target_jobs
+
+        if now - self.window_started < self.WARMUP_SECONDS:
+            return self.target_jobs
+
+        if now - self.last_sample_at >= self.SAMPLE_INTERVAL:
+            self.samples.append(sum(speeds))
+            self.last_sample_at = now
+
+        if now - self.window_started >= self.WARMUP_SECONDS + self.WINDOW_SECONDS and self.samples:
+            throughput = sum(self.samples) / len(self.samples)
+            self.last_throughput = throughput
+            self._decide(throughput, now)
+        return self.target_jobs
+
+    def get_throughput(self):
+        return self.last_throughput
+
+    def log(self, message):
+        write_log_entry(self.log_path, 'TUNE', message)
+
+    def _decide(self, throughput, now):
+        level = self.target_jobs
+        self.log(f"Measured {throughput:.2f}x aggregate throughput at {level} job(s)")
+
+        if self.settled:
+            self.settled_windows += 1
+            if self.settled_windows >= self.REPROBE_WINDOWS:
+                self._reprobe(level, throughput, now)
+            else:
+                self._restart_window(now)
+            return
+
+        if self.previous_level is None:
+            self.previous_level = (level, throughput)
+            self._step(level, now, "first measurement")
+            return
+
+        previous_jobs, previous_throughput = self.previous_level
+        if throughput > previous_throughput * (1 + self.MIN_IMPROVEMENT):
+            self.previous_level = (level, throughput)
+            self._step(
+                level,
+                now,
+                f"{throughput:.2f}x beats {previous_throughput:.2f}x at {previous_jobs} job(s)",
+            )
+            return
+
+        self._settle(
+            previous_jobs,
+            now,
+            f"{throughput:.2f}x at {level} job(s) is no better than {previous_throughput:.2f}x at {previous_jobs} job(s)",
+        )
+
+    def _step(self, level, now, reason):
+        next_level = level + self.direction
+        if self.min_jobs <= next_level <= self.max_jobs:
+            self._set_target(next_level, now, f"{reason}; trying {next_level} job(s)")
+        else:
+            self._settle(level, now, f"{reason}; {level} job(s) is the configured limit")
+
+    def _settle(self, level, now, reason):
+        self.settled = True
+        self.settled_windows = 0
+        self._set_target(level, now, f"{reason}; holding at {level} job(s)")
+
+    def _reprobe(self, level, throughput, now):
+        # Alternate the probe direction so a changed encoder or disk mix can
+        # pull the level back down as well as up.
+        self.direction = -self.direction
+        if not self.min_jobs <= level + self.direction <= self.max_jobs:
+            self.direction = -self.direction
+        if not self.min_jobs <= level + self.direction <= self.max_jobs:
+            self.settled_windows = 0
+            self._restart_window(now)
+            return
+
+        self.settled = False
+        self.previous_level = (level, throughput)
+        self._step(level, now, f"re-probing after {self.REPROBE_WINDOWS} settled windows")
+
+    def _set_target(self, level, now, reason):
+        if level != self.target_jobs:
+            self.log(f"Concurrency {self.target_jobs} -> {level}: {reason}")
+        else:
+            self.log(f"Concurrency stays at {level}: {reason}")
+        self.target_jobs = level
+        self._restart_window(now)
+
+    def _restart_window(self, now):
+        self.window_started = now
+        self.window_saturated = False
+        self.gap_started = None
+        self.last_sample_at = 0.0
+        self.samples = []
@@ -0,0 +1,387 @@
+import hmac
+import json
+import os
+import secrets
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Empty, Full, Queue
+from urllib.parse import parse_qs, urlparse
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+
+from activity_log import write_log_entry
+from folder_watch import is_video_file
+from process_priority import PRIORITY_PRESETS
+from resolution_cap import RESOLUTION_CAPS
+
+API_HOST = '127.0.0.1'
+LOOPBACK_HOSTS = {'127.0.0.1', 'localhost', '[::1]'}
+CALL_TIMEOUT = 30.0
+HEARTBEAT_SECONDS = 15.0
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+def generate_token():
+    return secrets.token_urlsafe(32)
+
+
+def is_loopback_host(host_header):
+    # A rebound DNS name still resolves to loopback, but the browser sends
+    # that name in Host, so only loopback names and addresses are accepted.
+    host = (host_header or '').strip().lower()
+    if host.startswith('['):
+        host = host[:host.find(']') + 1]
+    else:
+        host = host.split(':', 1)[0]
+    return host in LOOPBACK_HOSTS
+
+
+class ControlApi(QObject):
+    # Local JSON API over loopback HTTP. Requests are served on background
+    # threads, but everything that touches the queue runs on the GUI thread.
+    call_requested = pyqtSignal(object)
+
+    def __init__(self, main_window, port, token='', log_path=''):
+        super().__init__()
+        self.main_window = main_window
+        self.file_manager = main_window.file_manager
+        self.port = port
+        self.token = token
+        self.log_path = log_path
+        self.server = None
+        self.thread = None
+        self.subscribers = []
+        self.subscribers_lock = threading.Lock()
+        self.summary = ''
+        self.stats = ''
+        self.call_requested.connect(self._run_call, type=Qt.QueuedConnection)
+
+        video_processor = self.file_manager.video_processor
+        video_processor.status_updated.connect(self._publish_status)
+        video_processor.runtime_updated.connect(self._publish)
+        video_processor.output_updated.connect(self._publish)
+        self.file_manager.queue_summary_updated.connect(self._set_summary)
+        self.file_manager.queue_stats_updated.connect(self._set_stats)
+
+    def start(self):
+        self.server = ThreadingHTTPServer((API_HOST, self.port), ControlRequestHandler)
+        self.server.daemon_threads = True
+        self.server.api = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        write_log_entry(self.log_path, 'API', f"Control API listening on http://{API_HOST}:{self.server.server_port}")
+
+    def stop(self):
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+        with self.subscribers_lock:
+            subscribers, self.subscribers = self.subscribers, []
+        for subscriber in subscribers:
+            subscriber.put(None)
+
+    def call(self, func, *args):
+        # Runs func on the GUI thread and waits for its result.
+        request = {'func': func, 'args': args, 'done': threading.Event()}
+        self.call_requested.emit(request)
+        if not request['done'].wait(CALL_TIMEOUT):
+            raise TimeoutError("The GUI did not answer in time")
+        if 'error' in request:
+            raise request['error']
+        return request['result']
+
+    def _run_call(self, request):
+        try:
+            request['result'] = request['func'](*request['args'])
+        except Exception as exc:
+            request['error'] = exc
+        finally:
+            request['done'].set()
+
+    def is_authorized(self, header_value):
+        if not self.token:
+            return False
+        return hmac.compare_digest(header_value or '', f"Bearer {self.token}")
+
+    def subscribe(self):
+        subscriber = Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self.subscribers_lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.subscribers_lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def _publish_status(self, row, status):
+        self._publish(row, {'status': status})
+
+    def _publish(self, row, values):
+        record = self.file_manager.records_by_row.get(row)
+        if record is None:
+            return
+        with self.subscribers_lock:
+            subscribers = list(self.subscribers)
+        if not subscribers:
+            return
+        event = {'path': record['file_path'], 'row': row, **values}
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except Full:
+                # A client that stopped reading loses events rather than
+                # holding up the GUI.
+                pass
+
+    def _set_summary(self, summary):
+        self.summary = summary
+
+    def _set_stats(self, stats):
+        self.stats = stats
+
+    # The methods below run on the GUI thread through call().
+
+    def get_status(self):
+        records = list(self.main_window.files_list)
+        return {
+            'processing': self.file_manager.is_processing_active(),
+            'paused': self.file_manager.video_processor.is_paused(),
+            'loading': self.file_manager.is_loading(),
+            'folder': getattr(self.main_window, 'current_folder', ''),
+            'total': len(records),
+            'statuses': dict(Counter(record['status'] for record in records)),
+            'summary': self.summary,
+            'stats': self.stats,
+        }
+
+    def get_jobs(self, paths=None, status=None):
+        if paths:
+            records = [self.file_manager.records_by_path[path] for path in paths if path in self.file_manager.records_by_path]
+        else:
+            records = list(self.main_window.files_list)
+        if status:
+            records = [record for record in records if record['status'] == status]
+        return [self._serialize_record(record) for record in records]
+
+    def add_jobs(self, files, start):
+        added = list(dict.fromkeys(
+            file_path for file_path, _ in files if file_path not in self.file_manager.records_by_path
+        ))
+        self.file_manager.add_files_to_table(files)
+        self.file_manager.refresh_queue_overview()
+        if start:
+            self.start_queue()
+        return added
+
+    def remove_jobs(self, paths):
+        known_paths = [path for path in paths if path in self.file_manager.records_by_path]
+        self.file_manager.remove_files_from_table(known_paths)
+        return [path for path in known_paths if path not in self.file_manager.records_by_path]
+
+    def update_jobs(self, paths, values):
+        rows = [
+            self.file_manager.records_by_path[path]['row']
+            for path in paths
+            if path in self.file_manager.records_by_path
+        ]
+        if 'urgent' in values:
+            self.file_manager.set_urgent_for_rows(rows, bool(values['urgent']))
+        if 'priority' in values:
+            self.file_manager.set_priority_for_rows(rows, values['priority'])
+        if 'resolution_cap' in values:
+            self.file_manager.set_resolution_cap_for_rows(rows, values['resolution_cap'])
+        return len(rows)
+
+    def start_queue(self):
+        if self.file_manager.is_processing_active():
+            return False
+        self.main_window.on_start_pressed()
+        return True
+
+    def stop_queue(self, immediate):
+        if not self.file_manager.is_processing_active():
+            return False
+        self.file_manager.request_stop_processing(finish_current=not immediate)
+        return True
+
+    def _serialize_record(self, record):
+        return {
+            'path': record['file_path'],
+            'row': record['row'],
+            'status': record['status'],
+            'size_mb': record['size_mb'],
+            'output_size_mb': record['output_size_mb'],
+            'eta_seconds': record['eta_seconds'],
+            'elapsed_seconds': record['elapsed_seconds'],
+            'avg_speed_multiplier': record['avg_speed_multiplier'],
+            'encoder': record['resolved_encoder'],
+            'preset': record['encoder_preset'],
+            'priority': record['priority_preset'],
+            'resolution_cap': record['resolution_cap'],
+            'urgent': record['file_path'] in self.file_manager.urgent_paths,
+        }
+
+
+class ControlRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'EZ_ffmpeg'
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method):
+        api = self.server.api
+        # Browsers always send Origin on cross-site requests; local clients
+        # such as curl or scripts do not.
+        if self.headers.get('Origin') is not None:
+            self._send_json(403, {'error': 'Requests from web pages are not accepted'})
+            return
+        if not is_loopback_host(self.headers.get('Host')):
+            self._send_json(403, {'error': 'Host must be 127.0.0.1, localhost or [::1]'})
+            return
+        if not api.is_authorized(self.headers.get('Authorization')):
+            self._send_json(401, {'error': 'Missing or wrong token'})
+            return
+        content_type = (self.headers.get('Content-Type') or '').split(';', 1)[0].strip().lower()
+        if method in ('POST', 'DELETE') and content_type != 'application/json':
+            self._send_json(415, {'error': 'Expected Content-Type: application/json'})
+            return
+
+        url = urlparse(self.path)
+        route = (method, url.path.rstrip('/') or '/')
+        handlers = {
+            ('GET', '/status'): self._get_status,
+            ('GET', '/jobs'): self._get_jobs,
+            ('POST', '/jobs'): self._add_jobs,
+            ('DELETE', '/jobs'): self._remove_jobs,
+            ('POST', '/jobs/update'): self._update_jobs,
+            ('POST', '/start'): self._start,
+            ('POST', '/stop'): self._stop,
+            ('GET', '/telemetry'): self._stream_telemetry,
+        }
+        handler = handlers.get(route)
+        if handler is None:
+            self._send_json(404, {'error': f"Unknown endpoint {method} {url.path}"})
+            return
+
+        try:
+            handler(api, parse_qs(url.query))
+        except ValueError as exc:
+            self._send_json(400, {'error': str(exc)})
+        except TimeoutError as exc:
+            self._send_json(503, {'error': str(exc)})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as exc:
+            write_log_entry(api.log_path, 'API', f"{method} {url.path} failed: {exc}")
+            self._send_json(500, {'error': str(exc)})
+
+    def _get_status(self, api, query):
+        self._send_json(200, api.call(api.get_status))
+
+    def _get_jobs(self, api, query):
+        status = query.get('status', [None])[0]
+        self._send_json(200, {'jobs': api.call(api.get_jobs, query.get('path'), status)})
+
+    def _add_jobs(self, api, query):
+        body = self._read_json()
+        files = []
+        rejected = []
+        # Files are checked here so thousands of stat calls stay off the GUI thread.
+        for file_path in self._get_paths(body):
+            file_path = os.path.abspath(file_path)
+            if not os.path.isfile(file_path) or not is_video_file(file_path):
+                rejected.append(file_path)
+                continue
+            files.append((file_path, os.path.getsize(file_path) / (1024 * 1024)))
+        added = api.call(api.add_jobs, files, bool(body.get('start')))
+        self._send_json(200, {'added': added, 'rejected': rejected})
+
+    def _remove_jobs(self, api, query):
+        paths = self._get_paths(self._read_json())
+        removed = api.call(api.remove_jobs, paths)
+        # Files that are being processed keep their rows.
+        self._send_json(200, {'removed': removed, 'kept': [path for path in paths if path not in removed]})
+
+    def _update_jobs(self, api, query):
+        body = self._read_json()
+        values = {key: body[key] for key in ('urgent', 'priority', 'resolution_cap') if key in body}
+        if not values:
+            raise ValueError("Nothing to update: send urgent, priority or resolution_cap")
+        if values.get('priority') not in (None, *PRIORITY_PRESETS):
+            raise ValueError(f"Unknown priority {values['priority']!r}")
+        if values.get('resolution_cap') not in (None, *RESOLUTION_CAPS):
+            raise ValueError(f"Unknown resolution cap {values['resolution_cap']!r}")
+        updated = api.call(api.update_jobs, self._get_paths(body), values)
+        self._send_json(200, {'updated': updated})
+
+    def _start(self, api, query):
+        self._send_json(200, {'started': api.call(api.start_queue)})
+
+    def _stop(self, api, query):
+        body = self._read_json()
+        self._send_json(200, {'stopping': api.call(api.stop_queue, bool(body.get('immediate')))})
+
+    def _stream_telemetry(self, api, query):
+        # Newline-delimited JSON, one event per status, runtime or output
+        # update of any job, until the client disconnects.
+        paths = set(query.get('path', []))
+        subscriber = api.subscribe()
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            while True:
+                try:
+                    event = subscriber.get(timeout=HEARTBEAT_SECONDS)
+                except Empty:
+                    event = {'heartbeat': True}
+                if event is None:
+                    break
+                if paths and event.get('path') not in paths and not event.get('heartbeat'):
+                    continue
+                self.wfile.write(json.dumps(event, separators=(',', ':')).encode('utf-8') + b"\n")
+                self.wfile.flush()
+        finally:
+            api.unsubscribe(subscriber)
+
+    def _get_paths(self, body):
+        paths = body.get('paths')
+        if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+            raise ValueError("Expected a JSON body with a 'paths' list")
+        return paths
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError as exc:
+            raise ValueError(f"Invalid JSON body: {exc}")
+        if not isinstance(body, dict):
+            raise ValueError("Expected a JSON object")
+        return body
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
@@ -0,0 +1,84 @@
+import hashlib
+import os
+
+SAMPLE_BYTES = 1024 * 1024
+SAMPLE_COUNT = 3
+HASH_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def get_sample_hash(file_path, size_bytes):
+    # Head, middle and tail samples tell most same-size files apart after
+    # reading a few megabytes instead of the whole file.
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as source_file:
+        for offset in (0, max(size_bytes // 2 - SAMPLE_BYTES // 2, 0), max(size_bytes - SAMPLE_BYTES, 0)):
+            source_file.seek(offset)
+            digest.update(source_file.read(SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+def get_full_hash(file_path):
+    digest = hashlib.blake2b(digest_size=32)
+    with open(file_path, 'rb') as source_file:
+        while True:
+            chunk = source_file.read(HASH_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_duplicates(candidates, should_stop=None):
+    # candidates: (file_path, size_key). Returns groups of paths with equal
+    # content; each stage only runs on files still tied after the last one.
+    stats = {'sampled': 0, 'fully_hashed': 0, 'bytes_read': 0}
+    by_size = {}
+    for file_path, size_key in candidates:
+        by_size.setdefault(size_key, []).append(file_path)
+
+    groups = []
+    for same_size in by_size.values():
+        if len(same_size) < 2:
+            continue
+        by_sample = _group_by(same_size, lambda path, size: get_sample_hash(path, size), stats, 'sampled', should_stop)
+        for same_sample, size_bytes in by_sample:
+            if size_bytes <= SAMPLE_BYTES * SAMPLE_COUNT:
+                # The samples already covered every byte.
+                groups.append(same_sample)
+                continue
+            by_content = _group_by(same_sample, lambda path, size: get_full_hash(path), stats, 'fully_hashed', should_stop)
+            groups.extend(same_content for same_content, _ in by_content)
+        if should_stop and should_stop():
+            break
+    return groups, stats
+
+
+def _group_by(file_paths, get_key, stats, counter, should_stop):
+    grouped = {}
+    for file_path in file_paths:
+        if should_stop and should_stop():
+            return []
+        try:
+            size_bytes = os.path.getsize(file_path)
+            key = (size_bytes, get_key(file_path, size_bytes))
+        except OSError as exc:
+            print(f"Skipping {file_path} in duplicate check: {exc}")
+            continue
+        stats[counter] += 1
+        stats['bytes_read'] += size_bytes if counter == 'fully_hashed' else min(size_bytes, SAMPLE_BYTES * SAMPLE_COUNT)
+        grouped.setdefault(key, []).append(file_path)
+    return [(paths, key[0]) for key, paths in grouped.items() if len(paths) > 1]
+
+
+def release_duplicates(primary):
+    # Copies that were waiting on a primary that did not complete go back to
+    # the queue and are encoded on their own. Returns the released records.
+    released = []
+    for duplicate in primary.get('duplicate_records') or []:
+        if duplicate['status'] != "Duplicate" or duplicate['duplicate_of'] != primary['file_path']:
+            continue
+        duplicate['duplicate_of'] = None
+        duplicate['status'] = "Analyzed" if duplicate.get('source_info') else "Queued"
+        released.append(duplicate)
+    primary['duplicate_records'] = None
+    return released
@@ -0,0 +1,94 @@
+import json
+import re
+import sys
+import time
+
+TIME_PATTERN = re.compile(r'time=(\d+):(\d+):(\d+(?:\.\d+)?)')
+SPEED_PATTERN = re.compile(r'speed=\s*([0-9.]+)x')
+LINE_SPLIT_PATTERN = re.compile(rb'[\r\n]+')
+REPORT_INTERVAL = 0.5
+READ_BYTES = 64 * 1024
+
+
+def parse_progress_time(line):
+    match = TIME_PATTERN.search(line)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def parse_speed(line):
+    match = SPEED_PATTERN.search(line)
+    if not match:
+        return None
+    try:
+        speed_multiplier = float(match.group(1))
+    except ValueError:
+        return None
+    return speed_multiplier if speed_multiplier > 0 else None
+
+
+def monitor_stream(stream, report, echo=None, interval=REPORT_INTERVAL):
+    # Reads ffmpeg's stderr and calls report() with the latest progress at
+    # most once per interval, however many lines ffmpeg writes.
+    pending = {}
+    last_report_at = 0.0
+    buffer = b''
+    while True:
+        chunk = stream.read1(READ_BYTES) if hasattr(stream, 'read1') else stream.read(READ_BYTES)
+        if not chunk:
+            break
+        lines = LINE_SPLIT_PATTERN.split(buffer + chunk)
+        buffer = lines.pop()
+        for raw_line in lines:
+            _parse_line(raw_line, pending, echo)
+        now = time.monotonic()
+        if pending and now - last_report_at >= interval:
+            report(pending)
+            pending = {}
+            last_report_at = now
+
+    _parse_line(buffer, pending, echo)
+    if pending:
+        report(pending)
+
+
+def _parse_line(raw_line, pending, echo):
+    if not raw_line.strip():
+        return
+    line = raw_line.decode('utf-8', errors='replace')
+    if echo:
+        echo(line.strip())
+    progress_time = parse_progress_time(line)
+    if progress_time is not None:
+        pending['time'] = progress_time
+    speed_multiplier = parse_speed(line)
+    if speed_multiplier is not None:
+        pending['speed'] = speed_multiplier
+
+
+def main():
+    # Runs as a child of the GUI with ffmpeg's stderr on stdin. The raw log
+    # goes to the inherited stderr, progress reports go to stdout as JSON lines.
+    def report(progress):
+        sys.stdout.write(json.dumps(progress, separators=(',', ':')) + "\n")
+        sys.stdout.flush()
+
+    def echo(line):
+        if sys.stderr is None:
+            return
+        try:
+            sys.stderr.write(line + "\n")
+        except (OSError, ValueError):
+            pass
+
+    try:
+        monitor_stream(sys.stdin.buffer, report, echo)
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+import errno
+import mmap
+import os
+import shutil
+import sys
+import threading
+import time
+
+FICLONE = 0x40049409
+CHUNK_BYTES = 8 * 1024 * 1024
+WRITEBACK_BYTES = 64 * 1024 * 1024
+PROGRESS_INTERVAL = 0.5
+COPY_METHODS = ['reflink', 'copy_file_range', 'sendfile', 'buffered']
+FALLBACK_ERRNOS = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    getattr(errno, 'ENOTSUP', errno.EOPNOTSUPP),
+    errno.EBADF,
+    errno.ETXTBSY,
+}
+
+_unsupported_methods = {}
+_unsupported_lock = threading.Lock()
+
+
+class CopyPacer:
+    def __init__(self, size, max_mb_per_second=0.0, progress_callback=None):
+        self.size = size
+        self.max_bytes_per_second = max(float(max_mb_per_second or 0.0), 0.0) * 1024 * 1024
+        self.progress_callback = progress_callback
+        self.start_time = time.time()
+        self.last_report_at = 0.0
+
+    def restart(self):
+        self.start_time = time.time()
+
+    def advance(self, copied):
+        elapsed = time.time() - self.start_time
+        if self.max_bytes_per_second:
+            # Sleep off any lead over the ceiling so the average never exceeds it.
+            ahead_by = copied / self.max_bytes_per_second - elapsed
+            if ahead_by > 0:
+                time.sleep(ahead_by)
+                elapsed += ahead_by
+
+        now = time.time()
+        if self.progress_callback and (now - self.last_report_at >= PROGRESS_INTERVAL or copied >= self.size):
+            self.last_report_at = now
+            mb_per_second = copied / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+            self.progress_callback(copied, self.size, mb_per_second)
+
+
+def copy_file(source_path, destination_path, max_mb_per_second=0.0, progress_callback=None):
+    # Tries the cheapest mechanism first and remembers which ones a given
+    # source/destination filesystem pair has rejected.
+    size = os.path.getsize(source_path)
+    device_pair = _get_device_pair(source_path, destination_path)
+    start_time = time.time()
+    pacer = CopyPacer(size, max_mb_per_second, progress_callback)
+
+    method = None
+    for candidate in _get_candidate_methods(device_pair):
+        pacer.restart()
+        try:
+            _COPIERS[candidate](source_path, destination_path, size, pacer)
+        except OSError as exc:
+            if candidate == 'buffered' or exc.errno not in FALLBACK_ERRNOS:
+                raise
+            with _unsupported_lock:
+                _unsupported_methods.setdefault(device_pair, set()).add(candidate)
+            continue
+        method = candidate
+        break
+
+    shutil.copystat(source_path, destination_path)
+    elapsed_seconds = max(time.time() - start_time, 0.001)
+    return {
+        'method': method,
+        'bytes': size,
+        'seconds': elapsed_seconds,
+        'mb_per_second': size / (1024 * 1024) / elapsed_seconds,
+    }
+
+
+def format_copy_report(result):
+    return f"{result['method']}, {result['bytes'] / (1024 * 1024):.0f} MB at {result['mb_per_second']:.0f} MB/s"
+
+
+def _get_candidate_methods(device_pair):
+    with _unsupported_lock:
+        unsupported = _unsupported_methods.get(device_pair, set())
+    candidates = []
+    for method in COPY_METHODS:
+        if method in unsupported:
+            continue
+        if method != 'buffered' and not sys.platform.startswith('linux'):
+            continue
+        if method == 'copy_file_range' and not hasattr(os, 'copy_file_range'):
+            continue
+        candidates.append(method)
+    return candidates
+
+
+def _get_device_pair(source_path, destination_path):
+    destination_folder = os.path.dirname(os.path.abspath(destination_path))
+    return os.stat(source_path).st_dev, os.stat(destination_folder).st_dev
+
+
+def _copy_reflink(source_path, destination_path, size, pacer):
+    import fcntl
+
+    # A reflink shares extents instead of moving data, so there is nothing to
+    # throttle; report completion straight away.
+    with open(source_path, 'rb') as source_file, open(destination_path, 'wb') as destination_file:
+        fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+    pacer.advance(size)
+
+
+def _copy_with_file_range(source_path, destination_path, size, pacer):
+    _copy_in_chunks(
+        source_path,
+        destination_path,
+        size,
+        pacer,
+        lambda source_file, destination_file, count: os.copy_file_range(
+            source_file.fileno(),
+            destination_file.fileno(),
+            count,
+        ),
+    )
+
+
+def _copy_with_sendfile(source_path, destination_path, size, pacer):
+    _copy_in_chunks(
+        source_path,
+        destination_path,
+        size,
+        pacer,
+        lambda source_file, destination_file, count: os.sendfile(
+            destination_file.fileno(),
+            source_file.fileno(),
+            None,
+            count,
+        ),
+    )
+
+
+def _copy_buffered(source_path, destination_path, size, pacer):
+    # An anonymous mmap is page aligned, which keeps reads and writes on
+    # whole pages for network filesystems and block devices alike.
+    buffer = mmap.mmap(-1, CHUNK_BYTES)
+    view = memoryview(buffer)
+
+    def copy_chunk(source_file, destination_file, count):
+        read_bytes = source_file.readinto(view[:count])
+        written = 0
+        while written < read_bytes:
+            written += destination_file.write(view[written:read_bytes])
+        return read_bytes
+
+    try:
+        _copy_in_chunks(source_path, destination_path, size, pacer, copy_chunk)
+    finally:
+        view.release()
+        buffer.close()
+
+
+def _copy_in_chunks(source_path, destination_path, size, pacer, copy_chunk):
+    with open(source_path, 'rb', buffering=0) as source_file, open(destination_path, 'wb', buffering=0) as destination_file:
+        _advise(source_file, 0, 0, 'POSIX_FADV_SEQUENTIAL')
+        copied = 0
+        flushed = 0
+        while copied < size:
+            written = copy_chunk(source_file, destination_file, min(CHUNK_BYTES, size - copied))
+            if written == 0:
+                # Some filesystems report success without moving any data.
+                raise OSError(errno.EINVAL, "copy made no progress", source_path)
+            # Pages of a one-off copy would otherwise push everything else
+            # out of the page cache.
+            _advise(source_file, copied, written, 'POSIX_FADV_DONTNEED')
+            copied += written
+            if copied - flushed >= WRITEBACK_BYTES or copied >= size:
+                _drop_written_pages(destination_file, flushed, copied - flushed)
+                flushed = copied
+            pacer.advance(copied)
+
+
+def _drop_written_pages(destination_file, offset, length):
+    # Dirty pages cannot be dropped, so force them out first.
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    os.fdatasync(destination_file.fileno())
+    _advise(destination_file, offset, length, 'POSIX_FADV_DONTNEED')
+
+
+def _advise(file_object, offset, length, advice_name):
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(file_object.fileno(), offset, length, getattr(os, advice_name))
+    except OSError:
+        pass
+
+
+_COPIERS = {
+    'reflink': _copy_reflink,
+    'copy_file_range': _copy_with_file_range,
+    'sendfile': _copy_with_sendfile,
+    'buffered': _copy_buffered,
+}
@@ -1,7 +1,8 @@
 import os
 import threading
-import mimetypes
+import time
 import configparser
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from PyQt5.QtWidgets import QFileDialog, QTableWidgetItem
@@ -20,39 +21,97 @@ from table_columns import (
     COLUMN_MB_BEFORE,
     COLUMN_MB_PER_MIN_AFTER,
     COLUMN_MB_PER_MIN_BEFORE,
+    COLUMN_PRIORITY,
     COLUMN_RESOLUTION,
     COLUMN_STATUS,
 )
+from activity_log import write_log_entry
+from concurrency import ConcurrencyController
+from duplicate_finder import find_duplicates, release_duplicates
+from folder_watch import FolderWatcher, is_video_file
+from pause_policy import PausePolicy
+from preset_planner import PresetPlanner
+from process_priority import get_priority_label
+from queue_record import MediaInfo, QueueRecord
+from queue_ordering import get_deferred_keys, get_savings_rate, predict_saved_mb, rank_by_savings_rate, select_for_deadline
+from scan_index import DirectoryIndex
 from table_widgets import NumericTableWidgetItem
 from video_processing import VideoProcessor
 
 
 class FileLoader(QObject):
-    file_loaded = pyqtSignal(str, float)
+    # Files reach the table in batches so large scans do not flood the UI
+    # thread with one queued signal per file.
+    BATCH_SIZE = 500
+    BATCH_SECONDS = 0.25
+
+    files_loaded = pyqtSignal(list)
+    files_removed = pyqtSignal(list)
     loading_finished = pyqtSignal()
 
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
 
-    def list_files(self, folder_path):
+    def list_files(self, folder_path, index_path='', known_sizes=None):
+        # known_sizes maps the paths already in the queue to their size in MB;
+        # when given, only additions, size changes and removals are reported.
         print(f"Listing files in folder: {folder_path}")
-        for root, dirs, files in os.walk(folder_path):
-            for file_name in files:
-                file_path = os.path.join(root, file_name)
-                mime_type, _ = mimetypes.guess_type(file_path)
-                if mime_type and mime_type.startswith('video'):
-                    size_mb = os.path.getsize(file_path) / (1024 * 1024)
-                    self.file_loaded.emit(file_path, size_mb)
-                    print(f"File loaded: {file_path}, size: {size_mb} MB")
-        self.loading_finished.emit()
+        started_at = time.perf_counter()
+        index = DirectoryIndex(index_path)
+        index.load(folder_path)
+
+        batch = []
+        last_flush_at = time.perf_counter()
+
+        def flush_batch():
+            nonlocal batch, last_flush_at
+            if batch:
+                self.files_loaded.emit(batch)
+                batch = []
+            last_flush_at = time.perf_counter()
+
+        def emit_directory(folder_files):
+            for file_path, (size_bytes, _) in folder_files.items():
+                size_mb = size_bytes / (1024 * 1024)
+                if known_sizes is not None and known_sizes.get(file_path) == size_mb:
+                    continue
+                batch.append((file_path, size_mb))
+                print(f"File loaded: {file_path}, size: {size_mb} MB")
+            if len(batch) >= self.BATCH_SIZE or time.perf_counter() - last_flush_at >= self.BATCH_SECONDS:
+                flush_batch()
+
+        try:
+            files = index.scan(is_video_file, emit_directory)
+            flush_batch()
+            if known_sizes is not None:
+                removed_paths = [file_path for file_path in known_sizes if file_path not in files]
+                if removed_paths:
+                    self.files_removed.emit(removed_paths)
+            index.save()
+            print(
+                f"Scanned {folder_path} in {time.perf_counter() - started_at:.2f}s with {index.max_workers} workers: "
+                f"{index.listed_count} folders listed, {index.reused_count} unchanged"
+            )
+        except Exception as exc:
+            print(f"Error scanning {folder_path}: {exc}")
+        finally:
+            self.loading_finished.emit()
 
 
 class FileManager(QObject):
+    DISPATCH_INTERVAL = 0.25
+    PIPELINE_PROBE_WORKERS = 4
+    # Files held back from dispatch without being finished.
+    HELD_STATUSES = {"Deferred", "Duplicate"}
+
     queue_summary_updated = pyqtSignal(str)
     queue_stats_updated = pyqtSignal(str)
     processing_complete = pyqtSignal()
     analysis_complete = pyqtSignal()
+    pause_state_changed = pyqtSignal(bool)
+    watched_file_ready = pyqtSignal(str, float)
+    duplicates_found = pyqtSignal(list)
 
     def __init__(self, main_window):
         super().__init__()
@@ -61,10 +120,28 @@ class FileManager(QObject):
         self.processing_thread = None
         self.calculate_thread = None
         self.current_processing_row = None
+        self.concurrency_controller = None
+        self.preset_planner = None
+        self.pause_policy = None
+        self.manual_pause = False
+        self.policy_pause_reasons = set()
         self.records_by_row = {}
         self.records_by_path = {}
+        self.folder_watcher = None
+        self.requeued_paths = set()
+        self.urgent_paths = set()
+        self.watched_file_ready.connect(self.on_watched_file_ready, type=Qt.QueuedConnection)
         self.file_loader = FileLoader(main_window)
-        self.file_loader.file_loaded.connect(self.add_file_to_table, type=Qt.QueuedConnection)
+        self.loading_thread = None
+        self.loading_pending = False
+        self.pipeline_active = False
+        self.pipeline_probe_pool = None
+        self.pipeline_probes_pending = 0
+        self.pipeline_lock = threading.Lock()
+        self.duplicate_thread = None
+        self.duplicates_found.connect(self.on_duplicates_found, type=Qt.QueuedConnection)
+        self.file_loader.files_loaded.connect(self.add_files_to_table, type=Qt.QueuedConnection)
+        self.file_loader.files_removed.connect(self.remove_files_from_table, type=Qt.QueuedConnection)
         self.file_loader.loading_finished.connect(self.on_loading_finished, type=Qt.QueuedConnection)
         self.video_processor = VideoProcessor(main_window)
         self.video_processor.analysis_updated.connect(self.update_analysis)
@@ -79,6 +156,10 @@ class FileManager(QObject):
         self.live_sort_timer.timeout.connect(self.sort_table_by_size)
 
     def browse_folder(self):
+        if self.is_loading():
+            print("A folder scan is already running")
+            return
+
         default_path = ''
         config_path = 'settings.ini'
         if os.path.exists(config_path):
@@ -88,12 +169,19 @@ class FileManager(QObject):
 
         folder_path = QFileDialog.getExistingDirectory(self.main_window, "Select Folder", default_path)
         if folder_path:
+            if self._is_loaded_folder(folder_path):
+                self.rescan_folder()
+                return
+
+            # The watch restarts on the new folder once its listing is in the table.
+            self.stop_folder_watch()
             self.main_window.current_folder = os.path.normpath(folder_path).replace('\\', '/')
             self.main_window.folder_path_label.setText(f"Folder: {self.main_window.current_folder}")
             self.main_window.file_table.setRowCount(0)
             self.main_window.files_list = []
             self.records_by_row = {}
             self.records_by_path = {}
+            self.urgent_paths = set()
             self.current_processing_row = None
             self.stop_requested = False
             self.video_processor.stop_requested = False
@@ -110,9 +198,90 @@ class FileManager(QObject):
             with open(config_path, 'w') as configfile:
                 config.write(configfile)
 
-            threading.Thread(target=self.file_loader.list_files, args=(self.main_window.current_folder,), daemon=True).start()
+            self._start_loading()
+
+    def rescan_folder(self):
+        folder_path = getattr(self.main_window, 'current_folder', '')
+        if not folder_path or not os.path.isdir(folder_path):
+            print("No folder loaded to rescan")
+            return
+        if self.is_loading():
+            print("A folder scan is already running")
+            return
+
+        print(f"Rescanning folder: {folder_path}")
+        known_sizes = {record['file_path']: record['size_mb'] for record in self.main_window.files_list}
+        self._start_loading(known_sizes)
+
+    def is_loading(self):
+        # Scanned batches reach the table through queued calls on the GUI
+        # thread, so a load lasts until finalize_loading, not until the scan
+        # thread exits.
+        return self.loading_pending or bool(self.loading_thread and self.loading_thread.is_alive())
+
+    def _is_loaded_folder(self, folder_path):
+        current_folder = getattr(self.main_window, 'current_folder', '')
+        normalized_path = os.path.normpath(folder_path).replace('\\', '/')
+        return bool(self.main_window.files_list) and normalized_path == current_folder
+
+    def _start_loading(self, known_sizes=None):
+        folder_path = self.main_window.current_folder
+        index_path = DirectoryIndex.get_index_path(self.video_processor.scan_index_folder, folder_path)
+        self.pipeline_active = self.main_window.is_pipeline_enabled()
+        self.loading_pending = True
+        self.loading_thread = threading.Thread(
+            target=self.file_loader.list_files,
+            args=(folder_path, index_path, known_sizes),
+            daemon=True,
+        )
+        self.loading_thread.start()
+        if self.pipeline_active and not self.is_processing_active():
+            # The dispatcher waits for probed files while the scan is still running.
+            self.main_window.on_start_pressed()
+
+    def is_pipeline_feeding(self):
+        with self.pipeline_lock:
+            probes_pending = self.pipeline_probes_pending
+        return self.pipeline_active and (self.loading_pending or probes_pending > 0)
+
+    def _submit_pipeline_probe(self, record):
+        with self.pipeline_lock:
+            self.pipeline_probes_pending += 1
+            if self.pipeline_probe_pool is None:
+                self.pipeline_probe_pool = ThreadPoolExecutor(max_workers=self.PIPELINE_PROBE_WORKERS)
+        self.pipeline_probe_pool.submit(self._probe_for_pipeline, record)
+
+    def _probe_for_pipeline(self, record):
+        try:
+            if self.stop_requested or record.get('source_info'):
+                return
+            analysis = self.video_processor.analyze_video(record)
+            if analysis:
+                self.video_processor.analysis_updated.emit(record['row'], analysis)
+                if record['status'] == 'Queued':
+                    self.video_processor.status_updated.emit(record['row'], "Analyzed")
+            else:
+                self.video_processor.status_updated.emit(record['row'], "Error analyzing")
+        except Exception as exc:
+            print(f"Error probing {record['file_path']}: {exc}")
+        finally:
+            with self.pipeline_lock:
+                self.pipeline_probes_pending -= 1
+
+    def add_files_to_table(self, files):
+        for file_path, size in files:
+            record = self.add_file_to_table(file_path, size, refresh=False)
+            if record is not None and self.pipeline_active:
+                self._submit_pipeline_probe(record)
+        self.refresh_estimates_for_selected_encoder()
+        self.schedule_live_sort()
+
+    def add_file_to_table(self, file_path, size, refresh=True):
+        record = self.records_by_path.get(file_path)
+        if record is not None:
+            self._update_known_file(record, size)
+            return None
 
-    def add_file_to_table(self, file_path, size):
         print(f"Adding file to table: {file_path}, size: {size} MB")
         row = self.main_window.file_table.rowCount()
         self.main_window.file_table.insertRow(row)
@@ -123,7 +292,25 @@ class FileManager(QObject):
         self.main_window.file_table.setItem(row, COLUMN_STATUS, QTableWidgetItem("Queued"))
         self.main_window.file_table.setItem(row, COLUMN_ENCODER, QTableWidgetItem(self.video_processor.get_encoder_label(self.main_window.get_selected_encoder_mode())))
         self.main_window.file_table.setItem(row, COLUMN_MB_BEFORE, NumericTableWidgetItem(size))
+        self.main_window.file_table.setItem(row, COLUMN_PRIORITY, QTableWidgetItem(get_priority_label(self.main_window.get_selected_priority_preset())))
+
+        # Detail cells are created when they first get a value; empty items
+        # would cost a QTableWidgetItem per cell for files never analyzed.
+        record = QueueRecord(
+            row,
+            file_path,
+            size,
+            self.video_processor.resolve_encoder_mode(self.main_window.get_selected_encoder_mode()),
+        )
+        self.main_window.files_list.append(record)
+        self.records_by_row[row] = record
+        self.records_by_path[file_path] = record
+        if refresh:
+            self.refresh_estimates_for_selected_encoder()
+            self.schedule_live_sort()
+        return record
 
+    def _clear_row_details(self, row):
         for column in (
             COLUMN_CODEC,
             COLUMN_RESOLUTION,
@@ -134,18 +321,87 @@ class FileManager(QObject):
             COLUMN_AVG_SPEED,
             COLUMN_MB_AFTER,
             COLUMN_MB_PER_MIN_AFTER,
+            COLUMN_MB_PER_MIN_BEFORE,
         ):
-            self.main_window.file_table.setItem(row, column, QTableWidgetItem(""))
-        self.main_window.file_table.setItem(row, COLUMN_MB_PER_MIN_BEFORE, NumericTableWidgetItem(None))
-
-        record = {
-            'row': row,
-            'file_path': file_path,
-            'filename': os.path.basename(file_path),
-            'size_mb': size,
+            self.main_window.file_table.takeItem(row, column)
+
+    def update_folder_watch(self):
+        folder_path = getattr(self.main_window, 'current_folder', '')
+        if self.main_window.is_folder_watch_enabled() and folder_path and os.path.isdir(folder_path):
+            self.start_folder_watch(folder_path)
+        else:
+            self.stop_folder_watch()
+
+    def start_folder_watch(self, folder_path):
+        if self.folder_watcher is not None and self.folder_watcher.is_running():
+            if self.folder_watcher.folder_path == folder_path:
+                return
+            self.folder_watcher.stop()
+        self.folder_watcher = FolderWatcher(
+            folder_path,
+            self.watched_file_ready.emit,
+            ignore_folders=[self.video_processor.cache_folder],
+            log_path=self.video_processor.activity_log_path,
+        )
+        self.folder_watcher.start()
+
+    def stop_folder_watch(self):
+        if self.folder_watcher is not None:
+            self.folder_watcher.stop()
+            self.folder_watcher = None
+
+    def on_watched_file_ready(self, file_path, size_mb):
+        if self.video_processor.is_written_output(file_path):
+            return
+
+        print(f"Watched folder reported: {file_path}, size: {size_mb} MB")
+        self.add_file_to_table(file_path, size_mb)
+        if self.main_window.is_watch_auto_start_enabled() and not self.is_processing_active() and not self.stop_requested:
+            self.main_window.on_start_pressed()
+
+    def _update_known_file(self, record, size_mb):
+        # Our own replace writes are not source changes, and a file that is
+        # being processed keeps its row until it finishes.
+        if self.video_processor.is_written_output(record['file_path']):
+            return
+        if self._is_active_processing_status(record['status']):
+            return
+        # Rescans and the polling watcher also report files whose mtime
+        # moved without new content; only a new size counts as a change.
+        if size_mb == record['size_mb']:
+            return
+        print(f"Changed file: {record['file_path']}, size: {size_mb} MB")
+        self._requeue_record(record, size_mb)
+
+    def remove_files_from_table(self, file_paths):
+        removed_rows = []
+        for file_path in file_paths:
+            record = self.records_by_path.get(file_path)
+            if record is None or self._is_active_processing_status(record['status']):
+                continue
+            print(f"File no longer in folder: {file_path}")
+            self._release_duplicates(record)
+            self.records_by_path.pop(file_path)
+            self.urgent_paths.discard(file_path)
+            removed_rows.append(record['row'])
+        if not removed_rows:
+            return
+
+        self.main_window.files_list = [
+            record for record in self.main_window.files_list if record['file_path'] in self.records_by_path
+        ]
+        for row in sorted(removed_rows, reverse=True):
+            self.main_window.file_table.removeRow(row)
+        self._rebuild_row_mappings()
+        self.refresh_queue_overview()
+
+    def _requeue_record(self, record, size_mb):
+        self._release_duplicates(record)
+        record.update({
+            'size_mb': size_mb,
             'status': 'Queued',
             'source_info': None,
-            'resolved_encoder': self.video_processor.resolve_encoder_mode(self.main_window.get_selected_encoder_mode()),
+            'encoder_preset': None,
             'estimated_seconds': None,
             'eta_seconds': None,
             'eta_display': '--',
@@ -154,12 +410,16 @@ class FileManager(QObject):
             'avg_speed_multiplier': 0.0,
             'avg_speed_display': '',
             'output_size_mb': None,
-        }
-        self.main_window.files_list.append(record)
-        self.records_by_row[row] = record
-        self.records_by_path[file_path] = record
+            'duplicate_of': None,
+            'duplicate_records': None,
+        })
+        # Lets a running queue pick the file up again after it was attempted.
+        self.requeued_paths.add(record['file_path'])
+        row = record['row']
+        self._clear_row_details(row)
+        self.main_window.file_table.setItem(row, COLUMN_MB_BEFORE, NumericTableWidgetItem(size_mb))
+        self._set_text(row, COLUMN_STATUS, record['status'])
         self.refresh_estimates_for_selected_encoder()
-        self.schedule_live_sort()
 
     def on_loading_finished(self):
         if self.post_load_sort_pending:
@@ -169,8 +429,73 @@ class FileManager(QObject):
         QTimer.singleShot(0, self.finalize_loading)
 
     def finalize_loading(self):
+        # Runs after every queued batch of the scan has been added.
         self.post_load_sort_pending = False
-        self.sort_table_by_size(force=True)
+        self.loading_pending = False
+        # Rows are how running jobs report back, so they are not reshuffled
+        # under a queue that already started.
+        if not self.is_processing_active():
+            self.sort_table_by_size(force=True)
+        self.update_folder_watch()
+        if self.main_window.is_duplicate_check_enabled():
+            self.start_duplicate_check()
+
+    def start_duplicate_check(self):
+        if self.duplicate_thread and self.duplicate_thread.is_alive():
+            return
+        candidates = [
+            (record['file_path'], record['size_mb'])
+            for record in self.main_window.files_list
+            if not record.get('duplicate_of') and not self._is_terminal_status(record['status'])
+        ]
+        self.duplicate_thread = threading.Thread(target=self._find_duplicates, args=(candidates,), daemon=True)
+        self.duplicate_thread.start()
+
+    def _find_duplicates(self, candidates):
+        started_at = time.perf_counter()
+        groups, stats = find_duplicates(candidates, should_stop=lambda: self.stop_requested)
+        duplicate_count = sum(len(group) - 1 for group in groups)
+        write_log_entry(
+            self.video_processor.activity_log_path,
+            'DEDUP',
+            f"{duplicate_count} duplicates in {len(groups)} groups among {len(candidates)} files "
+            f"({stats['sampled']} sampled, {stats['fully_hashed']} fully hashed, "
+            f"{stats['bytes_read'] / (1024 * 1024):.0f} MB read in {time.perf_counter() - started_at:.1f}s)",
+        )
+        if groups:
+            self.duplicates_found.emit(groups)
+
+    def on_duplicates_found(self, groups):
+        for file_paths in groups:
+            records = [self.records_by_path[path] for path in file_paths if path in self.records_by_path]
+            if len(records) < 2:
+                continue
+            # A copy that is already underway stays the one that gets encoded.
+            primary = min(
+                records,
+                key=lambda record: (not self._is_active_processing_status(record['status']), record['row']),
+            )
+            duplicates = [
+                record for record in records
+                if record is not primary
+                and not self._is_active_processing_status(record['status'])
+                and not self._is_terminal_status(record['status'])
+            ]
+            if not duplicates:
+                continue
+            primary['duplicate_records'] = (primary.get('duplicate_records') or []) + duplicates
+            for record in duplicates:
+                print(f"Duplicate of {primary['file_path']}: {record['file_path']}")
+                record['duplicate_of'] = primary['file_path']
+                record['status'] = "Duplicate"
+                self._set_text(record['row'], COLUMN_STATUS, "Duplicate")
+        self.refresh_queue_overview()
+
+    def _release_duplicates(self, record):
+        for duplicate in release_duplicates(record):
+            print(f"Queueing {duplicate['file_path']} on its own, {record['file_path']} did not complete")
+            self.requeued_paths.add(duplicate['file_path'])
+            self._set_text(duplicate['row'], COLUMN_STATUS, duplicate['status'])
 
     def schedule_live_sort(self):
         if (self.processing_thread and self.processing_thread.is_alive()) or (
@@ -184,7 +509,7 @@ class FileManager(QObject):
 
     def process_files(self):
         if not self.processing_thread or not self.processing_thread.is_alive():
-            self.sort_table_by_size()
+            self.apply_ordering_policy()
             self.stop_requested = False
             self.video_processor.stop_requested = False
             print("Starting file processing thread")
@@ -192,22 +517,264 @@ class FileManager(QObject):
             self.processing_thread.start()
 
     def _process_files(self):
-        sorted_files = sorted(self.main_window.files_list, key=lambda record: record['row'])
+        parallel_mode = self.main_window.get_selected_parallel_jobs()
+        if parallel_mode == 'auto':
+            self.concurrency_controller = ConcurrencyController(
+                self.main_window.get_max_parallel_jobs(),
+                log_path=self.video_processor.activity_log_path,
+            )
+        else:
+            self.concurrency_controller = None
+        pause_cpu_percent, resume_cpu_percent, pause_schedule = self.main_window.get_pause_policy_settings()
+        self.pause_policy = PausePolicy(
+            pause_cpu_percent,
+            resume_cpu_percent,
+            pause_schedule,
+            log_path=self.video_processor.activity_log_path,
+        )
+        for record in list(self.main_window.files_list):
+            if not self._is_terminal_status(record['status']):
+                record['encoder_preset'] = None
+        if self.main_window.get_selected_preset_mode() == 'deadline':
+            self.preset_planner = PresetPlanner(
+                time.time() + self.main_window.get_deadline_hours() * 3600,
+                log_path=self.video_processor.activity_log_path,
+            )
+        else:
+            self.preset_planner = None
+
+        workers = {}
+        attempted_paths = set()
         try:
-            for record in sorted_files:
+            while True:
+                workers = {path: worker for path, worker in workers.items() if worker.is_alive()}
+                # Preempted jobs keep their worker thread but not their slot.
+                preempted_paths = self.video_processor.get_preempted_paths()
+                running_jobs = len([path for path in workers if path not in preempted_paths])
+                target_jobs = self._get_target_job_count(parallel_mode, running_jobs)
+                if self.pause_policy.is_enabled():
+                    self.policy_pause_reasons = self.pause_policy.evaluate(self.video_processor.get_active_pids())
+                    self._apply_pause_state()
+
+                finalizing = not self.video_processor.finalizer.is_idle()
                 if self.stop_requested:
-                    print("Stop requested, terminating file processing")
-                    break
-                if self._is_terminal_status(record['status']):
-                    continue
-                self.current_processing_row = record['row']
-                print(f"Processing file: {record['file_path']}, size: {record['size_mb']} MB")
-                self.video_processor.process_video(record)
+                    # Finishing the current files includes the preempted ones.
+                    for file_path in preempted_paths:
+                        self.video_processor.resume_preempted_job(file_path)
+                    if not workers and not finalizing:
+                        print("Stop requested, terminating file processing")
+                        break
+                elif not self.video_processor.is_paused():
+                    requeued_paths, self.requeued_paths = self.requeued_paths, set()
+                    attempted_paths.difference_update(requeued_paths)
+                    if self.preset_planner is not None and self.preset_planner.should_replan():
+                        self._replan_presets(attempted_paths)
+                    if self._has_urgent_pending(attempted_paths):
+                        if running_jobs >= target_jobs and self._preempt_for_urgent(workers, preempted_paths):
+                            running_jobs -= 1
+                    else:
+                        for file_path in preempted_paths:
+                            if running_jobs >= target_jobs:
+                                break
+                            if self.video_processor.resume_preempted_job(file_path):
+                                print(f"Resuming preempted file: {file_path}")
+                                running_jobs += 1
+                    while running_jobs < target_jobs:
+                        record = self._next_pending_record(attempted_paths)
+                        if record is None:
+                            break
+                        running_jobs += 1
+                        attempted_paths.add(record['file_path'])
+                        self.current_processing_row = record['row']
+                        print(f"Processing file: {record['file_path']}, size: {record['size_mb']} MB")
+                        worker = threading.Thread(target=self.video_processor.process_video, args=(record,), daemon=True)
+                        workers[record['file_path']] = worker
+                        worker.start()
+
+                    if not workers and not finalizing and not self.is_pipeline_feeding():
+                        break
+
+                time.sleep(self.DISPATCH_INTERVAL)
         finally:
             self.current_processing_row = None
+            self.concurrency_controller = None
+            self.preset_planner = None
+            self.pause_policy = None
+            self.policy_pause_reasons = set()
+            self._apply_pause_state()
             self.refresh_queue_overview()
             self.processing_complete.emit()
 
+    def _get_target_job_count(self, parallel_mode, running_jobs):
+        if self.concurrency_controller is None:
+            return parallel_mode
+
+        return self.concurrency_controller.observe(self.video_processor.get_encoding_speeds(), running_jobs)
+
+    def _replan_presets(self, attempted_paths):
+        planner = self.preset_planner
+        for predicted_speed, observed_speed in self.video_processor.get_speed_observations():
+            planner.observe_speed(predicted_speed, observed_speed)
+
+        resolved_encoder = self.video_processor.resolve_encoder_mode(self.main_window.get_selected_encoder_mode())
+        busy_seconds = 0.0
+        jobs = []
+        pending_records = {}
+        unanalyzed_records = []
+        for record in list(self.main_window.files_list):
+            if record['file_path'] in attempted_paths:
+                if self._is_active_processing_status(record['status']):
+                    busy_seconds += self._get_record_estimate(record) or 0.0
+                continue
+            if self._is_terminal_status(record['status']) or record['status'] in self.HELD_STATUSES:
+                continue
+            if not record.get('source_info'):
+                unanalyzed_records.append(record)
+                continue
+            base_seconds = self.video_processor.estimate_encode_seconds(
+                record['source_info'],
+                resolved_encoder,
+                resolution_cap=self.video_processor.resolve_resolution_cap(record),
+            )
+            if not base_seconds:
+                continue
+            jobs.append((record['file_path'], resolved_encoder, base_seconds))
+            pending_records[record['file_path']] = record
+
+        # Files that have not been probed yet have no duration, so they are
+        # counted at the encode time per MB of the analyzed ones.
+        analyzed_mb = sum(record['size_mb'] for record in pending_records.values())
+        unplanned = 0
+        if analyzed_mb:
+            seconds_per_mb = sum(base_seconds for _, _, base_seconds in jobs) / analyzed_mb
+            for record in unanalyzed_records:
+                jobs.append((record['file_path'], resolved_encoder, record['size_mb'] * seconds_per_mb))
+                pending_records[record['file_path']] = record
+        else:
+            unplanned = len(unanalyzed_records)
+
+        plan = planner.plan(jobs, busy_seconds, self.get_parallel_job_count(), unplanned=unplanned)
+        for file_path, record in pending_records.items():
+            preset = plan.get(file_path)
+            if record.get('encoder_preset') == preset:
+                continue
+            record['encoder_preset'] = preset
+            if record.get('source_info'):
+                record['estimated_seconds'] = self.video_processor.estimate_encode_seconds(
+                    record['source_info'],
+                    resolved_encoder,
+                    preset,
+                    self.video_processor.resolve_resolution_cap(record),
+                )
+            self.video_processor.encoder_updated.emit(
+                record['row'],
+                self.video_processor.get_encoder_label(resolved_encoder, preset),
+            )
+
+    def get_parallel_job_count(self):
+        controller = self.concurrency_controller
+        if controller is not None:
+            return controller.target_jobs
+        parallel_mode = self.main_window.get_selected_parallel_jobs()
+        return parallel_mode if parallel_mode != 'auto' else 1
+
+    def _get_urgent_pending(self, attempted_paths):
+        # Marking a deferred file urgent overrides the deadline plan.
+        records = [self.records_by_path[path] for path in list(self.urgent_paths) if path in self.records_by_path]
+        return [
+            record for record in records
+            if record['file_path'] not in attempted_paths
+            and not self._is_terminal_status(record['status'])
+            and record['status'] != "Duplicate"
+        ]
+
+    def _has_urgent_pending(self, attempted_paths):
+        return bool(self._get_urgent_pending(attempted_paths))
+
+    def _preempt_for_urgent(self, workers, preempted_paths):
+        candidate_paths = {
+            file_path for file_path in workers
+            if file_path not in preempted_paths
+            and file_path not in self.urgent_paths
+        }
+        file_path = self.video_processor.preempt_job(candidate_paths)
+        if file_path is None:
+            return False
+        write_log_entry(
+            self.video_processor.activity_log_path,
+            'URGENT',
+            f"Suspended {file_path} to make room for an urgent file",
+        )
+        return True
+
+    def _next_pending_record(self, attempted_paths):
+        urgent = self._get_urgent_pending(attempted_paths)
+        if urgent:
+            return min(urgent, key=lambda record: record['row'])
+        pending = [
+            record for record in list(self.main_window.files_list)
+            if record['file_path'] not in attempted_paths
+            and not self._is_terminal_status(record['status'])
+            and record['status'] not in self.HELD_STATUSES
+        ]
+        if self.is_pipeline_feeding():
+            # While files are still arriving, only probed files are started,
+            # those clearing the MB/min threshold first, best ranked first.
+            pending = [record for record in pending if record.get('source_info')]
+            if not pending:
+                return None
+            try:
+                threshold = float(self.main_window.threshold_input.text())
+            except ValueError:
+                threshold = 0.0
+            minimum_mb_per_min = self.main_window.mb_min_slider.value() + threshold
+            return min(
+                pending,
+                key=lambda record: (
+                    (record['source_info'].get('mb_per_min_before') or 0.0) < minimum_mb_per_min,
+                    -self._get_pipeline_rank(record),
+                    record['row'],
+                ),
+            )
+        if not pending:
+            return None
+        return min(pending, key=lambda record: record['row'])
+
+    def _get_pipeline_rank(self, record):
+        policy = self.main_window.get_selected_ordering_policy()
+        if policy == 'largest':
+            return record['size_mb']
+        if policy == 'mb_per_min':
+            return record['source_info'].get('mb_per_min_before') or 0.0
+        saved_mb = predict_saved_mb(
+            record['size_mb'],
+            record['source_info'].get('duration_seconds'),
+            self.main_window.mb_min_slider.value(),
+        )
+        return get_savings_rate(saved_mb, self._get_record_estimate(record)) or 0.0
+
+    def pause_processing(self):
+        self.manual_pause = True
+        self._apply_pause_state()
+
+    def resume_processing(self):
+        self.manual_pause = False
+        self._apply_pause_state()
+
+    def get_pause_reasons(self):
+        reasons = set(self.policy_pause_reasons)
+        if self.manual_pause:
+            reasons.add('manual')
+        return reasons
+
+    def _apply_pause_state(self):
+        reasons = self.get_pause_reasons()
+        was_paused = self.video_processor.is_paused()
+        self.video_processor.set_pause_reasons(reasons)
+        if was_paused != bool(reasons):
+            self.pause_state_changed.emit(bool(reasons))
+            self.refresh_queue_overview()
+
     def stop_processing(self):
         self.request_stop_processing(finish_current=False)
 
@@ -226,6 +793,7 @@ class FileManager(QObject):
         return self.is_processing_active() or bool(self.calculate_thread and self.calculate_thread.is_alive())
 
     def prepare_for_exit(self):
+        self.stop_folder_watch()
         self.stop_requested = True
         self.video_processor.request_stop(immediate=True)
         self.video_processor.abort_active_process()
@@ -237,7 +805,7 @@ class FileManager(QObject):
             return
 
         print(f"Updating analysis for row {row}: {analysis}")
-        record['source_info'] = analysis
+        record['source_info'] = MediaInfo(analysis)
         record['resolved_encoder'] = analysis.get('resolved_encoder')
         record['estimated_seconds'] = analysis.get('estimated_seconds')
 
@@ -247,6 +815,7 @@ class FileManager(QObject):
         self._set_text(row, COLUMN_AUDIO, analysis.get('audio_label', ''))
         self._set_text(row, COLUMN_LENGTH, analysis.get('length_formatted', ''))
         self._set_numeric(row, COLUMN_MB_PER_MIN_BEFORE, analysis.get('mb_per_min_before'))
+        self._set_status_tooltip(row, self.video_processor.savings_predictor.describe(analysis.get('predicted_savings')))
 
         if not self._is_active_processing_status(record['status']):
             self._set_text(row, COLUMN_ETA, analysis.get('estimated_display', '--'))
@@ -291,6 +860,8 @@ class FileManager(QObject):
         record = self.records_by_row.get(row)
         if record:
             record['status'] = status
+            if record.get('duplicate_records') and self._is_failed_status(status):
+                self._release_duplicates(record)
 
         try:
             print(f"Updating status for row {row}: {status}")
@@ -332,7 +903,10 @@ class FileManager(QObject):
         print("Stop analysis requested")
 
     def on_analysis_finished(self):
-        self.sort_table_by_analysis(force=True)
+        if self.main_window.get_selected_ordering_policy() == 'largest':
+            self.sort_table_by_analysis(force=True)
+        else:
+            self.apply_ordering_policy(force=True)
 
     def refresh_estimates_for_selected_encoder(self):
         selected_encoder = self.main_window.get_selected_encoder_mode()
@@ -349,14 +923,68 @@ class FileManager(QObject):
                 continue
 
             resolved_encoder = self.video_processor.resolve_encoder_mode(selected_encoder)
-            estimated_seconds = self.video_processor.estimate_encode_seconds(record['source_info'], resolved_encoder)
+            preset = record.get('encoder_preset')
+            estimated_seconds = self.video_processor.estimate_encode_seconds(
+                record['source_info'],
+                resolved_encoder,
+                preset,
+                self.video_processor.resolve_resolution_cap(record),
+            )
             record['resolved_encoder'] = resolved_encoder
             record['estimated_seconds'] = estimated_seconds
-            self._set_text(record['row'], COLUMN_ENCODER, self.video_processor.get_encoder_label(resolved_encoder))
+            self._set_text(
+                record['row'],
+                COLUMN_ENCODER,
+                self.video_processor.get_encoder_label(resolved_encoder, preset),
+            )
             self._set_text(record['row'], COLUMN_ETA, self.video_processor.format_seconds(estimated_seconds))
 
         self.refresh_queue_overview()
 
+    def refresh_priorities_for_selected_preset(self):
+        for record in self.main_window.files_list:
+            if record.get('priority_preset'):
+                continue
+            self._set_text(record['row'], COLUMN_PRIORITY, self._get_priority_text(record))
+
+    def _get_priority_text(self, record):
+        label = get_priority_label(record.get('priority_preset') or self.main_window.get_selected_priority_preset())
+        if record['file_path'] in self.urgent_paths:
+            return f"Urgent, {label}"
+        return label
+
+    def set_urgent_for_rows(self, rows, urgent):
+        for row in rows:
+            record = self.records_by_row.get(row)
+            if not record:
+                continue
+            if urgent:
+                self.urgent_paths.add(record['file_path'])
+            else:
+                self.urgent_paths.discard(record['file_path'])
+            self._set_text(row, COLUMN_PRIORITY, self._get_priority_text(record))
+        self.refresh_queue_overview()
+
+    def set_priority_for_rows(self, rows, preset_key):
+        for row in rows:
+            record = self.records_by_row.get(row)
+            if not record:
+                continue
+            if self._is_active_processing_status(record['status']):
+                print(f"Priority change for {record['file_path']} applies from its next run")
+            record['priority_preset'] = preset_key
+            self._set_text(row, COLUMN_PRIORITY, self._get_priority_text(record))
+
+    def set_resolution_cap_for_rows(self, rows, cap_key):
+        for row in rows:
+            record = self.records_by_row.get(row)
+            if not record:
+                continue
+            if self._is_active_processing_status(record['status']):
+                print(f"Resolution cap change for {record['file_path']} applies from its next run")
+            record['resolution_cap'] = cap_key
+        self.refresh_estimates_for_selected_encoder()
+
     def sort_table_by_size(self, force=False):
         if not force and (
             (self.processing_thread and self.processing_thread.is_alive()) or
@@ -385,6 +1013,91 @@ class FileManager(QObject):
         self._rebuild_row_mappings()
         self.main_window.file_table.viewport().update()
 
+    def apply_ordering_policy(self, force=False):
+        if not force and (
+            (self.processing_thread and self.processing_thread.is_alive()) or
+            (self.calculate_thread and self.calculate_thread.is_alive())
+        ):
+            return
+
+        self._clear_deferred_records()
+        policy = self.main_window.get_selected_ordering_policy()
+        if policy == 'mb_per_min':
+            self.sort_table_by_analysis(force=True)
+        elif policy == 'savings_rate':
+            self.sort_table_by_savings_rate()
+        elif policy == 'deadline':
+            self.sort_table_by_savings_rate(self.main_window.get_deadline_hours())
+        else:
+            self.sort_table_by_size(force=True)
+        self.refresh_queue_overview()
+
+    def sort_table_by_savings_rate(self, deadline_hours=None):
+        # Ranks by predicted MB saved per hour of encoding; with a deadline,
+        # only the subset that saves the most while fitting the window is kept.
+        target_mb_per_min = self.main_window.mb_min_slider.value()
+        candidates = []
+        for record in self.main_window.files_list:
+            source_info = record.get('source_info') or {}
+            saved_mb = predict_saved_mb(record['size_mb'], source_info.get('duration_seconds'), target_mb_per_min)
+            candidates.append((record['file_path'], saved_mb, self._get_record_estimate(record)))
+
+        ordered_paths = rank_by_savings_rate(candidates)
+        if deadline_hours:
+            pending_candidates = [
+                candidate for candidate in candidates
+                if not self._is_terminal_status(self.records_by_path[candidate[0]]['status'])
+                and self.records_by_path[candidate[0]]['status'] != "Duplicate"
+            ]
+            capacity_seconds = deadline_hours * 3600 * max(self.get_parallel_job_count(), 1)
+            selected_paths = select_for_deadline(pending_candidates, capacity_seconds)
+            deferred_paths = get_deferred_keys(pending_candidates, selected_paths)
+            for file_path in deferred_paths:
+                self._defer_record(self.records_by_path[file_path])
+            ordered_paths.sort(key=lambda file_path: self.records_by_path[file_path]['status'] == "Deferred")
+            unpredicted = len(pending_candidates) - len(selected_paths) - len(deferred_paths)
+            print(
+                f"Deadline plan: {len(selected_paths)} of {len(pending_candidates)} files fit into {deadline_hours} h"
+                + (f", {unpredicted} not analyzed yet" if unpredicted else "")
+            )
+
+        self._reorder_rows(ordered_paths)
+
+    def _defer_record(self, record):
+        record['status'] = "Deferred"
+        self._set_text(record['row'], COLUMN_STATUS, "Deferred")
+
+    def _clear_deferred_records(self):
+        for record in self.main_window.files_list:
+            if record['status'] == "Deferred":
+                record['status'] = "Analyzed" if record.get('source_info') else "Queued"
+                self._set_text(record['row'], COLUMN_STATUS, record['status'])
+
+    def _reorder_rows(self, ordered_paths):
+        table = self.main_window.file_table
+        column_count = table.columnCount()
+        items_by_path = {}
+        unmatched_rows = []
+        for row in range(table.rowCount()):
+            row_items = [table.takeItem(row, column) for column in range(column_count)]
+            filename_item = row_items[COLUMN_FILENAME]
+            file_path = filename_item.toolTip() if filename_item is not None else None
+            if file_path in self.records_by_path:
+                items_by_path[file_path] = row_items
+            else:
+                unmatched_rows.append(row_items)
+
+        rows_in_order = [items_by_path.pop(file_path) for file_path in ordered_paths if file_path in items_by_path]
+        rows_in_order.extend(items_by_path.values())
+        rows_in_order.extend(unmatched_rows)
+        for row, row_items in enumerate(rows_in_order):
+            for column, item in enumerate(row_items):
+                if item is not None:
+                    table.setItem(row, column, item)
+
+        self._rebuild_row_mappings()
+        table.viewport().update()
+
     def _rebuild_row_mappings(self):
         self.records_by_row = {}
 
@@ -409,7 +1122,12 @@ class FileManager(QObject):
         failed = 0
         processing = 0
         queued = 0
+        deferred = 0
+        duplicates = 0
+        preempted = 0
+        likely_losers = 0
         saved_mb = 0.0
+        savings_predictor = self.video_processor.savings_predictor
 
         for record in self.main_window.files_list:
             status = record.get('status', 'Queued')
@@ -422,8 +1140,17 @@ class FileManager(QObject):
                 failed += 1
             elif self._is_active_processing_status(status):
                 processing += 1
+                if status == "Preempted":
+                    preempted += 1
+            elif status == "Deferred":
+                deferred += 1
+            elif status == "Duplicate":
+                duplicates += 1
             else:
                 queued += 1
+                predicted_savings = (record.get('source_info') or {}).get('predicted_savings')
+                if predicted_savings is not None and savings_predictor.is_below_floor(predicted_savings):
+                    likely_losers += 1
 
             if record.get('output_size_mb') is not None:
                 saved_mb += max(record['size_mb'] - record['output_size_mb'], 0.0)
@@ -435,11 +1162,14 @@ class FileManager(QObject):
                 elif record.get('estimated_seconds'):
                     total_remaining_seconds += record['estimated_seconds']
                     current_eta = self.video_processor.format_seconds(record['estimated_seconds'])
-            elif not self._is_terminal_status(status):
+            elif not self._is_terminal_status(status) and status not in self.HELD_STATUSES:
                 estimated_seconds = self._get_record_estimate(record)
                 if estimated_seconds:
                     total_remaining_seconds += estimated_seconds
 
+        parallel_jobs = max(self.get_parallel_job_count(), 1)
+        total_remaining_seconds /= parallel_jobs
+
         finish_text = '--'
         if total_remaining_seconds > 0:
             finish_at = datetime.now() + timedelta(seconds=total_remaining_seconds)
@@ -450,6 +1180,27 @@ class FileManager(QObject):
             f"Queue remaining: {self.video_processor.format_seconds(total_remaining_seconds)} | "
             f"Finish: {finish_text}"
         )
+        controller = self.concurrency_controller
+        if controller is not None:
+            summary += f" | Parallel: auto, {controller.target_jobs} jobs"
+            if controller.get_throughput():
+                summary += f" at {controller.get_throughput():.2f}x"
+        elif parallel_jobs > 1:
+            summary += f" | Parallel: {parallel_jobs} jobs"
+        pause_reasons = self.get_pause_reasons()
+        if pause_reasons:
+            summary += f" | Paused: {', '.join(sorted(pause_reasons))}"
+        if deferred:
+            summary += f" | Deferred: {deferred} (outside deadline)"
+        if duplicates:
+            summary += f" | Duplicates: {duplicates}"
+        if preempted:
+            summary += f" | Preempted: {preempted} (waiting for urgent files)"
+        if likely_losers and savings_predictor.is_enabled():
+            summary += f" | Likely losers: {likely_losers} (below savings floor)"
+        hit_rate_text = savings_predictor.get_hit_rate_text()
+        if hit_rate_text:
+            summary += f" | Savings predictor: {hit_rate_text}"
         stats = (
             f"Queued: {queued} | Processing: {processing} | Completed: {completed} | "
             f"Skipped: {skipped} | Failed: {failed} | Saved: {saved_mb:.2f} MB"
@@ -464,7 +1215,12 @@ class FileManager(QObject):
         if record.get('source_info'):
             selected_encoder = self.main_window.get_selected_encoder_mode()
             resolved_encoder = self.video_processor.resolve_encoder_mode(selected_encoder)
-            estimate = self.video_processor.estimate_encode_seconds(record['source_info'], resolved_encoder)
+            estimate = self.video_processor.estimate_encode_seconds(
+                record['source_info'],
+                resolved_encoder,
+                record.get('encoder_preset'),
+                self.video_processor.resolve_resolution_cap(record),
+            )
             record['resolved_encoder'] = resolved_encoder
             record['estimated_seconds'] = estimate
             return estimate
@@ -478,6 +1234,13 @@ class FileManager(QObject):
             self.main_window.file_table.setItem(row, column, item)
         item.setText(text or "")
 
+    def _set_status_tooltip(self, row, text):
+        item = self.main_window.file_table.item(row, COLUMN_STATUS)
+        if item is None:
+            item = QTableWidgetItem("")
+            self.main_window.file_table.setItem(row, COLUMN_STATUS, item)
+        item.setToolTip(text)
+
     def _set_numeric(self, row, column, value):
         if value is None:
             self._set_text(row, column, "")
@@ -485,19 +1248,29 @@ class FileManager(QObject):
         self.main_window.file_table.setItem(row, column, NumericTableWidgetItem(value))
 
     def _is_active_processing_status(self, status):
-        return status in {
+        # Copy steps append live progress, e.g. "Copying to RAM cache (42%, 80 MB/s)".
+        return status.split(" (", 1)[0] in {
             "Probing",
             "Checking thresholds",
-            "Copying to cache",
+            "Copying to RAM cache",
+            "Copying to disk cache",
             "Launching encoder",
             "Processing",
+            "Paused",
+            "Preempted",
+            "Joining segments",
             "Finalizing",
             "Replacing",
             "Moving output",
+            "Copying result",
         }
 
     def _is_terminal_status(self, status):
         return status in {"Completed", "Skipped"}
 
+    def _is_failed_status(self, status):
+        # Every way a job can end without a result to copy to its duplicates.
+        return status == "Skipped" or status.startswith(("Error", "Exception", "Stopped"))
+
 
 __all__ = ["FileManager", "NumericTableWidgetItem"]
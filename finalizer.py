@@ -0,0 +1,46 @@
+import threading
+from queue import Queue
+
+
+class FinalizeWorker:
+    def __init__(self):
+        self.tasks = Queue()
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.idle = threading.Event()
+        self.idle.set()
+        self.thread = None
+
+    def submit(self, task, *args):
+        with self.lock:
+            self.pending += 1
+            self.idle.clear()
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        self.tasks.put((task, args))
+
+    def get_pending_count(self):
+        with self.lock:
+            return self.pending
+
+    def is_idle(self):
+        return self.idle.is_set()
+
+    def wait_until_idle(self, timeout=None):
+        return self.idle.wait(timeout)
+
+    def _run(self):
+        # Tasks run one at a time so cross-drive copies never compete with
+        # each other for the same disks.
+        while True:
+            task, args = self.tasks.get()
+            try:
+                task(*args)
+            except Exception as exc:
+                print(f"Finalize task failed: {exc}")
+            finally:
+                with self.lock:
+                    self.pending -= 1
+                    if self.pending == 0:
+                        self.idle.set()
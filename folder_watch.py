@@ -0,0 +1,238 @@
+import ctypes
+import ctypes.util
+import errno
+import mimetypes
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from activity_log import write_log_entry
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# Attribute changes (touch, chmod, xattrs) never change a video, so they are not watched.
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+READ_BYTES = 64 * 1024
+
+
+def is_video_file(file_path):
+    mime_type, _ = mimetypes.guess_type(file_path)
+    return bool(mime_type and mime_type.startswith('video'))
+
+
+class FolderWatcher:
+    # A file is reported once its size and mtime have held still this long,
+    # so downloads and copies in progress are not queued half written.
+    SETTLE_SECONDS = 10.0
+    CHECK_INTERVAL = 1.0
+    POLL_INTERVAL = 15.0
+
+    def __init__(self, folder_path, on_file_ready, ignore_folders=(), log_path=''):
+        self.folder_path = folder_path
+        self.on_file_ready = on_file_ready
+        self.ignore_folders = [os.path.abspath(folder) for folder in ignore_folders if folder]
+        self.log_path = log_path
+        self.backend = None
+        self.candidates = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive() and not self.stop_event.is_set()
+
+    def _run(self):
+        try:
+            inotify = InotifyWatch(self.folder_path, self._is_ignored)
+        except OSError as exc:
+            inotify = None
+            reason = f"inotify unavailable ({exc}), polling every {self.POLL_INTERVAL:.0f}s"
+        else:
+            reason = f"inotify on {inotify.get_watch_count()} folders"
+
+        self.backend = 'inotify' if inotify else 'polling'
+        write_log_entry(self.log_path, 'WATCH', f"Watching {self.folder_path}: {reason}")
+        try:
+            if inotify:
+                try:
+                    self._run_inotify(inotify)
+                except OSError as exc:
+                    self.backend = 'polling'
+                    write_log_entry(self.log_path, 'WATCH', f"inotify failed ({exc}), switching to polling")
+                    self._run_polling()
+            else:
+                self._run_polling()
+        except Exception as exc:
+            write_log_entry(self.log_path, 'WATCH', f"Watching {self.folder_path} failed: {exc}")
+        finally:
+            if inotify:
+                inotify.close()
+            write_log_entry(self.log_path, 'WATCH', f"Stopped watching {self.folder_path}")
+
+    def _run_inotify(self, inotify):
+        next_check_at = 0.0
+        while not self.stop_event.is_set():
+            changed_paths, overflowed = inotify.read_events(self.CHECK_INTERVAL)
+            if overflowed:
+                # Events were dropped, so fall back to comparing the whole tree once.
+                write_log_entry(self.log_path, 'WATCH', "inotify queue overflowed, rescanning")
+                changed_paths.update(self._scan_files())
+            for file_path in changed_paths:
+                self._add_candidate(file_path)
+            # A busy download raises events constantly; stat the candidates at
+            # most once per interval regardless.
+            if time.time() >= next_check_at:
+                self._check_candidates()
+                next_check_at = time.time() + self.CHECK_INTERVAL
+
+    def _run_polling(self):
+        known_files = self._scan_files()
+        next_poll_at = time.time() + self.POLL_INTERVAL
+        while not self.stop_event.wait(self.CHECK_INTERVAL):
+            if time.time() >= next_poll_at:
+                current_files = self._scan_files()
+                for file_path, file_state in current_files.items():
+                    if known_files.get(file_path) != file_state:
+                        self._add_candidate(file_path)
+                known_files = current_files
+                next_poll_at = time.time() + self.POLL_INTERVAL
+            self._check_candidates()
+
+    def _scan_files(self):
+        files = {}
+        for root, dirs, file_names in os.walk(self.folder_path):
+            dirs[:] = [name for name in dirs if not self._is_ignored(os.path.join(root, name))]
+            for file_name in file_names:
+                file_path = os.path.join(root, file_name)
+                if not is_video_file(file_path):
+                    continue
+                try:
+                    stat_result = os.stat(file_path)
+                except OSError:
+                    continue
+                files[file_path] = (stat_result.st_size, stat_result.st_mtime)
+        return files
+
+    def _add_candidate(self, file_path):
+        if not is_video_file(file_path) or self._is_ignored(file_path):
+            return
+        self.candidates.setdefault(file_path, (None, 0.0))
+
+    def _check_candidates(self):
+        now = time.time()
+        for file_path, (last_state, stable_since) in list(self.candidates.items()):
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                self.candidates.pop(file_path, None)
+                continue
+
+            state = (stat_result.st_size, stat_result.st_mtime)
+            if state != last_state:
+                self.candidates[file_path] = (state, now)
+            elif now - stable_since >= self.SETTLE_SECONDS and stat_result.st_size > 0:
+                self.candidates.pop(file_path, None)
+                self.on_file_ready(file_path, stat_result.st_size / (1024 * 1024))
+
+    def _is_ignored(self, path):
+        path = os.path.abspath(path)
+        return any(path == folder or path.startswith(folder + os.sep) for folder in self.ignore_folders)
+
+
+class InotifyWatch:
+    def __init__(self, folder_path, is_ignored):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "inotify needs Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.is_ignored = is_ignored
+        self.folders_by_watch = {}
+        try:
+            self.add_tree(folder_path)
+        except OSError:
+            self.close()
+            raise
+
+    def get_watch_count(self):
+        return len(self.folders_by_watch)
+
+    def add_tree(self, folder_path):
+        # Returns the files already inside, which matters for folders moved
+        # in whole: their contents arrive without events of their own.
+        existing_files = set()
+        for root, dirs, file_names in os.walk(folder_path):
+            dirs[:] = [name for name in dirs if not self.is_ignored(os.path.join(root, name))]
+            watch = self.libc.inotify_add_watch(self.fd, os.fsencode(root), WATCH_MASK)
+            if watch < 0:
+                error_number = ctypes.get_errno()
+                if error_number == errno.ENOSPC:
+                    raise OSError(error_number, "fs.inotify.max_user_watches reached")
+                continue
+            self.folders_by_watch[watch] = root
+            existing_files.update(os.path.join(root, file_name) for file_name in file_names)
+        return existing_files
+
+    def read_events(self, timeout):
+        changed_paths = set()
+        overflowed = False
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return changed_paths, overflowed
+
+        try:
+            data = os.read(self.fd, READ_BYTES)
+        except BlockingIOError:
+            return changed_paths, overflowed
+
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            watch, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + name_length].split(b'\0', 1)[0]
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                overflowed = True
+                continue
+            if mask & IN_IGNORED:
+                self.folders_by_watch.pop(watch, None)
+                continue
+            folder_path = self.folders_by_watch.get(watch)
+            if folder_path is None or not name:
+                continue
+
+            path = os.path.join(folder_path, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not self.is_ignored(path):
+                    changed_paths.update(self.add_tree(path))
+                continue
+            changed_paths.add(path)
+        return changed_paths, overflowed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+import threading
+
+
+class JsonLinesHistoryBackend:
+    def __init__(self, log_path):
+        self.log_path = log_path
+        self.entries = None
+        self.appended_since_compaction = 0
+
+    def get_paths(self):
+        return [self.log_path, f"{self.log_path}.tmp"]
+
+    def load(self):
+        entries = []
+        if not os.path.exists(self.log_path):
+            return entries
+
+        malformed_lines = 0
+        with open(self.log_path, 'r', encoding='utf-8') as log_file:
+            for line in log_file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A crash mid-append leaves at most one torn line behind.
+                    malformed_lines += 1
+        if malformed_lines:
+            print(f"Skipped {malformed_lines} unreadable encode history line(s)")
+            self.appended_since_compaction = EncodeHistoryStore.COMPACT_AFTER_APPENDS
+        return entries
+
+    def ensure_loaded(self):
+        if self.entries is None:
+            self.entries = self.load()
+
+    def append(self, entry):
+        with open(self.log_path, 'a', encoding='utf-8') as log_file:
+            log_file.write(json.dumps(entry, separators=(',', ':')) + "\n")
+        if self.entries is not None:
+            self.entries.append(entry)
+        self.appended_since_compaction += 1
+
+    def append_many(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def recent(self, encoder_key=None, limit=None):
+        self.ensure_loaded()
+        matches = []
+        for entry in reversed(self.entries):
+            if encoder_key is not None and entry.get('encoder') != encoder_key:
+                continue
+            matches.append(entry)
+            if limit is not None and len(matches) >= limit:
+                break
+        return matches
+
+    def count(self):
+        self.ensure_loaded()
+        return len(self.entries)
+
+    def compact(self, max_records):
+        self.ensure_loaded()
+        self.entries = self.entries[-max_records:]
+        temp_path = f"{self.log_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as log_file:
+            for entry in self.entries:
+                log_file.write(json.dumps(entry, separators=(',', ':')) + "\n")
+        os.replace(temp_path, self.log_path)
+        self.appended_since_compaction = 0
+
+    def needs_compaction(self):
+        return self.appended_since_compaction >= EncodeHistoryStore.COMPACT_AFTER_APPENDS
+
+    def close(self):
+        pass
+
+
+class SqliteHistoryBackend:
+    def __init__(self, database_path):
+        self.database_path = database_path
+        self.connection = None
+        self.appended_since_compaction = 0
+
+    def get_paths(self):
+        return [self.database_path, f"{self.database_path}-journal", f"{self.database_path}-wal", f"{self.database_path}-shm"]
+
+    def ensure_loaded(self):
+        if self.connection is not None:
+            return
+        self.connection = sqlite3.connect(self.database_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS encode_history ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, encoder TEXT, timestamp REAL, entry TEXT NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS encode_history_encoder ON encode_history (encoder, id)"
+        )
+        self.connection.commit()
+
+    def append(self, entry):
+        self.append_many([entry])
+
+    def append_many(self, entries):
+        self.ensure_loaded()
+        self.connection.executemany(
+            "INSERT INTO encode_history (encoder, timestamp, entry) VALUES (?, ?, ?)",
+            [
+                (entry.get('encoder'), entry.get('timestamp'), json.dumps(entry, separators=(',', ':')))
+                for entry in entries
+            ],
+        )
+        self.connection.commit()
+        self.appended_since_compaction += len(entries)
+
+    def recent(self, encoder_key=None, limit=None):
+        self.ensure_loaded()
+        query = "SELECT entry FROM encode_history"
+        parameters = []
+        if encoder_key is not None:
+            query += " WHERE encoder = ?"
+            parameters.append(encoder_key)
+        query += " ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(int(limit))
+        return [json.loads(row[0]) for row in self.connection.execute(query, parameters)]
+
+    def count(self):
+        self.ensure_loaded()
+        return self.connection.execute("SELECT COUNT(*) FROM encode_history").fetchone()[0]
+
+    def compact(self, max_records):
+        self.ensure_loaded()
+        self.connection.execute(
+            "DELETE FROM encode_history WHERE id <= (SELECT MAX(id) FROM encode_history) - ?",
+            (int(max_records),),
+        )
+        self.connection.commit()
+        self.appended_since_compaction = 0
+
+    def needs_compaction(self):
+        return self.appended_since_compaction >= EncodeHistoryStore.COMPACT_AFTER_APPENDS
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class EncodeHistoryStore:
+    BACKENDS = ('jsonl', 'sqlite')
+    COMPACT_AFTER_APPENDS = 500
+    MAX_RECORDS = 50000
+    LEGACY_FILE = "encode_history.json"
+
+    def __init__(self, folder, backend='jsonl'):
+        self.folder = folder
+        self.backend_name = backend if backend in self.BACKENDS else 'jsonl'
+        self.legacy_path = os.path.join(folder, self.LEGACY_FILE)
+        self.backend = self._create_backend(self.backend_name)
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.recent_cache = {}
+
+    def get_paths(self):
+        # Every backend's files count as history, so switching backends never
+        # lets cache cleanup delete records that have not been migrated yet.
+        paths = [self.legacy_path]
+        for backend_name in self.BACKENDS:
+            paths.extend(self._create_backend(backend_name).get_paths())
+        return paths
+
+    def _create_backend(self, backend_name):
+        if backend_name == 'sqlite':
+            return SqliteHistoryBackend(os.path.join(self.folder, "encode_history.sqlite3"))
+        return JsonLinesHistoryBackend(os.path.join(self.folder, "encode_history.jsonl"))
+
+    def append(self, entry):
+        with self.lock:
+            self._ensure_loaded()
+            self.backend.append(entry)
+            self.recent_cache = {}
+            if self.backend.needs_compaction():
+                self._compact()
+
+    def recent(self, encoder_key=None, limit=None):
+        # Queue refreshes ask for the same few entries once per row, so keep
+        # the answers until the next append.
+        with self.lock:
+            self._ensure_loaded()
+            cache_key = (encoder_key, limit)
+            if cache_key not in self.recent_cache:
+                self.recent_cache[cache_key] = self.backend.recent(encoder_key, limit)
+            return self.recent_cache[cache_key]
+
+    def count(self):
+        with self.lock:
+            self._ensure_loaded()
+            return self.backend.count()
+
+    def compact(self):
+        with self.lock:
+            self._ensure_loaded()
+            self._compact()
+
+    def close(self):
+        with self.lock:
+            self.backend.close()
+            self.loaded = False
+            self.recent_cache = {}
+
+    def _ensure_loaded(self):
+        # History is only read once an estimate or a completed job needs it,
+        # so startup never pays for parsing a large log.
+        if self.loaded:
+            return
+        self.backend.ensure_loaded()
+        self._migrate_legacy_history()
+        self._migrate_other_backends()
+        self.loaded = True
+
+    def _compact(self):
+        before = self.backend.count()
+        self.backend.compact(self.MAX_RECORDS)
+        print(f"Compacted encode history: {before} -> {self.backend.count()} record(s)")
+
+    def _migrate_legacy_history(self):
+        if not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as legacy_file:
+                legacy_entries = json.load(legacy_file)
+            if isinstance(legacy_entries, list) and legacy_entries:
+                self.backend.append_many(legacy_entries)
+                print(f"Migrated {len(legacy_entries)} record(s) from {self.legacy_path}")
+            os.remove(self.legacy_path)
+        except Exception as exc:
+            print(f"Unable to migrate legacy encode history: {exc}")
+
+    def _migrate_other_backends(self):
+        # After a backend switch the previous backend's records move over, so
+        # switching back and forth keeps one complete history.
+        for backend_name in self.BACKENDS:
+            if backend_name == self.backend_name:
+                continue
+            other_backend = self._create_backend(backend_name)
+            other_paths = other_backend.get_paths()
+            if not os.path.exists(other_paths[0]):
+                continue
+            try:
+                other_entries = list(reversed(other_backend.recent()))
+                other_backend.close()
+                if other_entries:
+                    self.backend.append_many(other_entries)
+                    print(f"Migrated {len(other_entries)} record(s) from {other_paths[0]}")
+                for path in other_paths:
+                    if os.path.exists(path):
+                        os.remove(path)
+            except Exception as exc:
+                other_backend.close()
+                print(f"Unable to migrate encode history from {other_paths[0]}: {exc}")
@@ -1,15 +1,30 @@
 import sys
 import os
+import signal
 import configparser
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QHBoxLayout, QVBoxLayout,
     QWidget, QTableWidget, QHeaderView, QSlider, QCheckBox, QLabel, QFrame, QLineEdit, QGridLayout, QProgressBar,
-    QComboBox, QMessageBox, QFileDialog
+    QComboBox, QMessageBox, QFileDialog, QMenu, QSpinBox
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt, QTimer
+from activity_log import write_log_entry
+from control_api import ControlApi, generate_token
 from file_manager import FileManager
+from process_priority import DEFAULT_PRIORITY, get_priority_options
+from preset_planner import DEFAULT_PRESET_MODE, get_preset_mode_options
+from queue_ordering import DEFAULT_ORDERING, get_ordering_options
+from resolution_cap import DEFAULT_RESOLUTION_CAP, get_resolution_cap_options
+from savings_predictor import DEFAULT_SAVINGS_ACTION, DEFAULT_SAVINGS_FLOOR_PERCENT
+from startup_timer import StartupTimer
 from table_columns import TABLE_HEADERS
+
+PID_FILE = 'ez_ffmpeg.pid'
+CONTROL_COMMANDS = {
+    '--pause': 'SIGUSR1',
+    '--resume': 'SIGUSR2',
+}
 
 def resource_path(relative_path):
     if hasattr(sys, '_MEIPASS'):
@@ -18,6 +33,8 @@ def resource_path(relative_path):
 
 class MainWindow(QMainWindow):
     CACHE_FOLDER_NAME = "ez_ffmpeg_cache"
+    DEFAULT_MAX_PARALLEL_JOBS = 4
+    DEFAULT_CHECKPOINT_SEGMENT_SECONDS = 300
     THEMES = {
         "Light": {
             "WINDOW_BG": "#f5f1e8",
@@ -65,12 +82,25 @@ class MainWindow(QMainWindow):
         },
     }
 
-    def __init__(self):
+    def __init__(self, startup_timer=None):
         super().__init__()
+        self.startup_timer = startup_timer or StartupTimer()
+        self.saved_encoder_mode = 'auto'
         self.file_manager = FileManager(self)
+        self.startup_timer.mark("backend setup")
         self.files_list = []
         self.current_speed = ''
         self.current_eta = ''
+        self.cpu_affinity = ''
+        self.max_parallel_jobs = self.DEFAULT_MAX_PARALLEL_JOBS
+        self.pause_cpu_percent = 0.0
+        self.resume_cpu_percent = ''
+        self.pause_schedule = ''
+        self.checkpoint_segment_seconds = self.DEFAULT_CHECKPOINT_SEGMENT_SECONDS
+        self.copy_limit_mb_per_second = 0.0
+        self.control_api_port = 0
+        self.control_api_token = ''
+        self.control_api = None
         self.initUI()
         self.file_manager.video_processor.progress_updated.connect(self.update_progress)
         self.file_manager.video_processor.speed_updated.connect(self.update_speed)
@@ -78,7 +108,9 @@ class MainWindow(QMainWindow):
         self.file_manager.queue_summary_updated.connect(self.update_queue_summary)
         self.file_manager.queue_stats_updated.connect(self.update_queue_stats)
         self.file_manager.processing_complete.connect(self.reset_start_button)
+        self.file_manager.pause_state_changed.connect(self.update_pause_button)
         self.file_manager.analysis_complete.connect(self.reset_analyze_button)
+        self.file_manager.video_processor.encoders_detected.connect(self.on_encoders_detected)
 
     def initUI(self):
         self.setWindowTitle("EZ_ffmpeg")
@@ -109,6 +141,47 @@ class MainWindow(QMainWindow):
         temp_layout.addWidget(self.theme_combo)
         layout.addLayout(temp_layout)
 
+        queue_controls_layout = QHBoxLayout()
+        self.priority_label = QLabel("Priority")
+        self.priority_label.setObjectName("folderPathLabel")
+        self.priority_combo = QComboBox()
+        for preset_key, preset_label in get_priority_options():
+            self.priority_combo.addItem(preset_label, preset_key)
+        self.priority_combo.setCurrentIndex(self.priority_combo.findData(DEFAULT_PRIORITY))
+        queue_controls_layout.addWidget(self.priority_label)
+        queue_controls_layout.addWidget(self.priority_combo)
+        self.parallel_label = QLabel("Parallel jobs")
+        self.parallel_label.setObjectName("folderPathLabel")
+        self.parallel_combo = QComboBox()
+        queue_controls_layout.addWidget(self.parallel_label)
+        queue_controls_layout.addWidget(self.parallel_combo)
+        self.ordering_label = QLabel("Order")
+        self.ordering_label.setObjectName("folderPathLabel")
+        self.ordering_combo = QComboBox()
+        for policy_key, policy_label in get_ordering_options():
+            self.ordering_combo.addItem(policy_label, policy_key)
+        self.ordering_combo.setCurrentIndex(self.ordering_combo.findData(DEFAULT_ORDERING))
+        self.deadline_input = QSpinBox()
+        self.deadline_input.setRange(1, 72)
+        self.deadline_input.setValue(8)
+        self.deadline_input.setSuffix(" h")
+        self.preset_mode_label = QLabel("Presets")
+        self.preset_mode_label.setObjectName("folderPathLabel")
+        self.preset_mode_combo = QComboBox()
+        for mode_key, mode_label in get_preset_mode_options():
+            self.preset_mode_combo.addItem(mode_label, mode_key)
+        self.preset_mode_combo.setCurrentIndex(self.preset_mode_combo.findData(DEFAULT_PRESET_MODE))
+        queue_controls_layout.addWidget(self.ordering_label)
+        queue_controls_layout.addWidget(self.ordering_combo)
+        queue_controls_layout.addWidget(self.preset_mode_label)
+        queue_controls_layout.addWidget(self.preset_mode_combo)
+        queue_controls_layout.addWidget(self.deadline_input)
+        self.pause_button = QPushButton("Pause")
+        self.pause_button.clicked.connect(self.on_pause_pressed)
+        queue_controls_layout.addWidget(self.pause_button)
+        queue_controls_layout.addStretch(1)
+        layout.addLayout(queue_controls_layout)
+
         top_row_layout = QHBoxLayout()
 
         options_frame = QFrame(self)
@@ -130,6 +203,36 @@ class MainWindow(QMainWindow):
         self.convert_checkbox = QCheckBox("Convert")
         self.convert_checkbox.setChecked(True)
         grid_layout.addWidget(self.convert_checkbox, 1, 1)
+
+        self.resumable_checkbox = QCheckBox("Resumable")
+        self.resumable_checkbox.setChecked(False)
+        self.resumable_checkbox.setToolTip("Encode in checkpointed segments so stopped or crashed jobs continue where they left off")
+        grid_layout.addWidget(self.resumable_checkbox, 2, 0)
+
+        self.watch_checkbox = QCheckBox("Watch")
+        self.watch_checkbox.setChecked(False)
+        self.watch_checkbox.setToolTip("Queue new or changed videos in the loaded folder once they stop growing")
+        grid_layout.addWidget(self.watch_checkbox, 2, 1)
+
+        self.auto_start_checkbox = QCheckBox("Auto-start")
+        self.auto_start_checkbox.setChecked(False)
+        self.auto_start_checkbox.setToolTip("Start processing when the folder watch queues a file")
+        grid_layout.addWidget(self.auto_start_checkbox, 3, 0)
+
+        self.pipeline_checkbox = QCheckBox("Pipeline")
+        self.pipeline_checkbox.setChecked(False)
+        self.pipeline_checkbox.setToolTip("Probe files as they are found and start encoding before the scan finishes")
+        grid_layout.addWidget(self.pipeline_checkbox, 3, 1)
+
+        self.dedup_checkbox = QCheckBox("Dedup")
+        self.dedup_checkbox.setChecked(False)
+        self.dedup_checkbox.setToolTip("Find files with identical content after a scan and encode only one copy")
+        grid_layout.addWidget(self.dedup_checkbox, 4, 0)
+
+        self.dedup_apply_checkbox = QCheckBox("Apply to dupes")
+        self.dedup_apply_checkbox.setChecked(False)
+        self.dedup_apply_checkbox.setToolTip("Copy the encoded result over every duplicate once its original finishes")
+        grid_layout.addWidget(self.dedup_apply_checkbox, 4, 1)
 
         top_row_layout.addWidget(options_frame)
 
@@ -169,6 +272,19 @@ class MainWindow(QMainWindow):
         encoder_layout.addWidget(self.encoder_combo)
         top_row_layout.addWidget(encoder_frame)
 
+        resolution_cap_frame = QFrame()
+        resolution_cap_frame.setObjectName("sliderFrame")
+        resolution_cap_layout = QVBoxLayout(resolution_cap_frame)
+        self.resolution_cap_label = QLabel("Max resolution")
+        self.resolution_cap_combo = QComboBox()
+        for cap_key, cap_label in get_resolution_cap_options():
+            self.resolution_cap_combo.addItem(cap_label, cap_key)
+        self.resolution_cap_combo.setCurrentIndex(self.resolution_cap_combo.findData(DEFAULT_RESOLUTION_CAP))
+        self.resolution_cap_combo.setToolTip("Downscale larger sources to fit this resolution")
+        resolution_cap_layout.addWidget(self.resolution_cap_label, alignment=Qt.AlignCenter)
+        resolution_cap_layout.addWidget(self.resolution_cap_combo)
+        top_row_layout.addWidget(resolution_cap_frame)
+
         stacked_button_layout = QVBoxLayout()
         self.movies_button = QPushButton("Movies")
         self.television_button = QPushButton("Television")
@@ -190,6 +306,12 @@ class MainWindow(QMainWindow):
         self.browse_button.setFixedSize(100, 100)
         self.browse_button.clicked.connect(self.file_manager.browse_folder)
         top_row_layout.addWidget(self.browse_button)
+
+        self.rescan_button = QPushButton("Rescan")
+        self.rescan_button.setFixedSize(100, 100)
+        self.rescan_button.setToolTip("Apply files added, changed or removed since the last scan")
+        self.rescan_button.clicked.connect(self.file_manager.rescan_folder)
+        top_row_layout.addWidget(self.rescan_button)
 
         self.start_button = QPushButton("Start")
         self.start_button.setFixedSize(100, 100)
@@ -214,6 +336,8 @@ class MainWindow(QMainWindow):
         self.file_table.verticalHeader().setVisible(False)
         self.file_table.setSortingEnabled(False)
         self.file_table.setAlternatingRowColors(True)
+        self.file_table.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.file_table.customContextMenuRequested.connect(self.show_table_context_menu)
         layout.addWidget(self.file_table)
 
         self.progress_bar = QProgressBar(self)
@@ -229,12 +353,54 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.queue_stats_label)
 
         self.populate_encoder_modes()
+        self.populate_parallel_modes()
         self.update_temp_folder_label()
+        self.startup_timer.mark("window build")
         self.load_settings()
+        self.startup_timer.mark("settings")
         self.encoder_combo.currentIndexChanged.connect(self.on_encoder_changed)
+        self.resolution_cap_combo.currentIndexChanged.connect(self.on_encoder_changed)
         self.theme_combo.currentTextChanged.connect(self.on_theme_changed)
+        self.priority_combo.currentIndexChanged.connect(self.on_priority_changed)
+        self.update_deadline_input()
+        self.ordering_combo.currentIndexChanged.connect(self.on_ordering_changed)
+        self.deadline_input.valueChanged.connect(self.on_ordering_changed)
+        self.preset_mode_combo.currentIndexChanged.connect(self.update_deadline_input)
+        self.watch_checkbox.toggled.connect(self.file_manager.update_folder_watch)
+        self.dedup_checkbox.toggled.connect(self.on_dedup_toggled)
         self.show()
+        self.startup_timer.mark("show")
         QTimer.singleShot(0, self.apply_current_theme)
+        QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        self.startup_timer.mark("first paint")
+        write_log_entry(
+            self.file_manager.video_processor.activity_log_path,
+            'STARTUP',
+            self.startup_timer.format_summary(),
+        )
+        self.file_manager.video_processor.start_encoder_detection()
+        self.file_manager.video_processor.start_cache_cleanup()
+        self.file_manager.update_folder_watch()
+        self.start_control_api()
+
+    def start_control_api(self):
+        if not self.control_api_port:
+            return
+        log_path = self.file_manager.video_processor.activity_log_path
+        if not self.control_api_token:
+            # The API never runs without a token; the generated one is saved
+            # so clients can read it from settings.ini.
+            self.control_api_token = generate_token()
+            self.save_settings()
+            write_log_entry(log_path, 'API', "Generated a new control_api_token in settings.ini")
+        self.control_api = ControlApi(self, self.control_api_port, self.control_api_token, log_path)
+        try:
+            self.control_api.start()
+        except OSError as exc:
+            write_log_entry(log_path, 'API', f"Control API could not listen on port {self.control_api_port}: {exc}")
+            self.control_api = None
 
     def update_mb_min_label(self, value):
         self.mb_min_label.setText(f"MB/min: {value}")
@@ -261,9 +427,136 @@ class MainWindow(QMainWindow):
     def get_selected_encoder_mode(self):
         return self.encoder_combo.currentData() or 'auto'
 
+    def get_selected_resolution_cap(self):
+        return self.resolution_cap_combo.currentData() or DEFAULT_RESOLUTION_CAP
+
     def on_encoder_changed(self):
         self.file_manager.refresh_estimates_for_selected_encoder()
 
+    def on_encoders_detected(self):
+        # The capability list can grow after the window is shown, which makes
+        # a saved encoder choice selectable again.
+        selected_mode = self.get_selected_encoder_mode()
+        if selected_mode == 'auto':
+            selected_mode = self.saved_encoder_mode
+        self.populate_encoder_modes()
+        combo_index = self.encoder_combo.findData(selected_mode)
+        if combo_index >= 0:
+            self.encoder_combo.setCurrentIndex(combo_index)
+        self.file_manager.refresh_estimates_for_selected_encoder()
+
+    def populate_parallel_modes(self):
+        selected_mode = self.parallel_combo.currentData() if self.parallel_combo.count() else 1
+        self.parallel_combo.blockSignals(True)
+        self.parallel_combo.clear()
+        self.parallel_combo.addItem("Auto", 'auto')
+        for job_count in range(1, self.max_parallel_jobs + 1):
+            self.parallel_combo.addItem(str(job_count), job_count)
+        parallel_index = self.parallel_combo.findData(selected_mode)
+        self.parallel_combo.setCurrentIndex(parallel_index if parallel_index >= 0 else 1)
+        self.parallel_combo.blockSignals(False)
+
+    def get_selected_ordering_policy(self):
+        return self.ordering_combo.currentData() or DEFAULT_ORDERING
+
+    def get_deadline_hours(self):
+        return self.deadline_input.value()
+
+    def get_selected_preset_mode(self):
+        return self.preset_mode_combo.currentData() or DEFAULT_PRESET_MODE
+
+    def update_deadline_input(self):
+        self.deadline_input.setEnabled(
+            self.get_selected_ordering_policy() == 'deadline'
+            or self.get_selected_preset_mode() == 'deadline'
+        )
+
+    def on_ordering_changed(self):
+        self.update_deadline_input()
+        self.file_manager.apply_ordering_policy()
+
+    def get_selected_parallel_jobs(self):
+        return self.parallel_combo.currentData() or 1
+
+    def get_max_parallel_jobs(self):
+        return self.max_parallel_jobs
+
+    def is_checkpoint_mode_enabled(self):
+        return self.resumable_checkbox.isChecked()
+
+    def is_folder_watch_enabled(self):
+        return self.watch_checkbox.isChecked()
+
+    def is_watch_auto_start_enabled(self):
+        return self.auto_start_checkbox.isChecked()
+
+    def is_pipeline_enabled(self):
+        return self.pipeline_checkbox.isChecked()
+
+    def is_duplicate_check_enabled(self):
+        return self.dedup_checkbox.isChecked()
+
+    def is_apply_to_duplicates_enabled(self):
+        return self.dedup_apply_checkbox.isChecked()
+
+    def on_dedup_toggled(self, checked):
+        if checked and self.files_list and not self.file_manager.is_loading():
+            self.file_manager.start_duplicate_check()
+
+    def get_checkpoint_segment_seconds(self):
+        return self.checkpoint_segment_seconds
+
+    def get_pause_policy_settings(self):
+        return self.pause_cpu_percent, self.resume_cpu_percent, self.pause_schedule
+
+    def on_pause_pressed(self):
+        if self.pause_button.text() == "Pause":
+            self.file_manager.pause_processing()
+        else:
+            self.file_manager.resume_processing()
+
+    def update_pause_button(self, paused):
+        self.pause_button.setText("Resume" if paused else "Pause")
+
+    def get_selected_priority_preset(self):
+        return self.priority_combo.currentData() or DEFAULT_PRIORITY
+
+    def get_cpu_affinity_override(self):
+        return self.cpu_affinity
+
+    def get_copy_limit_mb_per_second(self):
+        return self.copy_limit_mb_per_second
+
+    def on_priority_changed(self):
+        self.file_manager.refresh_priorities_for_selected_preset()
+
+    def get_selected_rows(self):
+        return sorted({item.row() for item in self.file_table.selectedItems()})
+
+    def show_table_context_menu(self, position):
+        rows = self.get_selected_rows()
+        if not rows:
+            return
+
+        menu = QMenu(self)
+        priority_menu = menu.addMenu("Priority")
+        default_action = priority_menu.addAction("Use queue default")
+        default_action.triggered.connect(lambda: self.file_manager.set_priority_for_rows(rows, None))
+        for preset_key, preset_label in get_priority_options():
+            action = priority_menu.addAction(preset_label)
+            action.triggered.connect(lambda checked=False, key=preset_key: self.file_manager.set_priority_for_rows(rows, key))
+        urgent_action = menu.addAction("Mark urgent")
+        urgent_action.triggered.connect(lambda: self.file_manager.set_urgent_for_rows(rows, True))
+        normal_action = menu.addAction("Clear urgent")
+        normal_action.triggered.connect(lambda: self.file_manager.set_urgent_for_rows(rows, False))
+        resolution_menu = menu.addMenu("Max resolution")
+        default_cap_action = resolution_menu.addAction("Use queue default")
+        default_cap_action.triggered.connect(lambda: self.file_manager.set_resolution_cap_for_rows(rows, None))
+        for cap_key, cap_label in get_resolution_cap_options():
+            action = resolution_menu.addAction(cap_label)
+            action.triggered.connect(lambda checked=False, key=cap_key: self.file_manager.set_resolution_cap_for_rows(rows, key))
+        menu.exec_(self.file_table.viewport().mapToGlobal(position))
+
     def get_selected_theme(self):
         if hasattr(self, "theme_combo"):
             return self.theme_combo.currentText() or "Light"
@@ -295,6 +588,7 @@ class MainWindow(QMainWindow):
         folder_path = QFileDialog.getExistingDirectory(self, "Select Temp Folder Root", current_temp)
         if folder_path:
             self.set_temp_folder(os.path.join(folder_path, self.CACHE_FOLDER_NAME))
+            self.file_manager.video_processor.start_cache_cleanup()
 
     def on_start_pressed(self):
         if self.start_button.text() == "Start":
@@ -373,6 +667,8 @@ class MainWindow(QMainWindow):
             self.start_button.setText("Stop")
 
     def closeEvent(self, event):
+        if self.control_api is not None:
+            self.control_api.stop()
         self.file_manager.prepare_for_exit()
         self.save_settings()
         event.accept()
@@ -394,8 +690,36 @@ class MainWindow(QMainWindow):
             'stereo': self.stereo_checkbox.isChecked(),
             'replace': self.replace_checkbox.isChecked(),
             'convert': self.convert_checkbox.isChecked(),
+            'resumable': self.resumable_checkbox.isChecked(),
+            'watch_folder': self.watch_checkbox.isChecked(),
+            'watch_auto_start': self.auto_start_checkbox.isChecked(),
+            'pipeline': self.pipeline_checkbox.isChecked(),
+            'dedup': self.dedup_checkbox.isChecked(),
+            'dedup_apply': self.dedup_apply_checkbox.isChecked(),
+            'checkpoint_segment_seconds': self.checkpoint_segment_seconds,
             'encoder_mode': self.get_selected_encoder_mode(),
+            'resolution_cap': self.get_selected_resolution_cap(),
             'theme': self.get_selected_theme(),
+            'priority': self.get_selected_priority_preset(),
+            'cpu_affinity': self.cpu_affinity,
+            'parallel_jobs': self.get_selected_parallel_jobs(),
+            'ordering': self.get_selected_ordering_policy(),
+            'deadline_hours': self.get_deadline_hours(),
+            'preset_mode': self.get_selected_preset_mode(),
+            'max_parallel_jobs': self.max_parallel_jobs,
+            'pause_cpu_percent': self.pause_cpu_percent,
+            'resume_cpu_percent': self.resume_cpu_percent,
+            'pause_schedule': self.pause_schedule,
+            'history_backend': self.file_manager.video_processor.history_backend,
+            'savings_floor_percent': self.file_manager.video_processor.savings_predictor.floor_percent,
+            'savings_action': self.file_manager.video_processor.savings_predictor.action,
+            'staging_cache_gb': self.file_manager.video_processor.staging_cache_bytes / 1024 ** 3,
+            'copy_limit_mb_per_second': self.copy_limit_mb_per_second,
+            'control_api_port': self.control_api_port,
+            'control_api_token': self.control_api_token,
+            'ram_staging_folder': self.file_manager.video_processor.ram_staging_folder,
+            'ram_staging_threshold_mb': self.file_manager.video_processor.ram_staging_threshold_mb,
+            'ram_staging_budget_mb': self.file_manager.video_processor.ram_staging_budget_mb,
             'temp_folder': self.file_manager.video_processor.cache_folder,
             'last_folder': getattr(self, 'current_folder', '')
         }
@@ -411,15 +735,66 @@ class MainWindow(QMainWindow):
             self.stereo_checkbox.setChecked(settings.getboolean('stereo', True))
             self.replace_checkbox.setChecked(settings.getboolean('replace', True))
             self.convert_checkbox.setChecked(settings.getboolean('convert', True))
+            self.resumable_checkbox.setChecked(settings.getboolean('resumable', False))
+            self.watch_checkbox.setChecked(settings.getboolean('watch_folder', False))
+            self.auto_start_checkbox.setChecked(settings.getboolean('watch_auto_start', False))
+            self.pipeline_checkbox.setChecked(settings.getboolean('pipeline', False))
+            self.dedup_checkbox.setChecked(settings.getboolean('dedup', False))
+            self.dedup_apply_checkbox.setChecked(settings.getboolean('dedup_apply', False))
+            self.checkpoint_segment_seconds = max(
+                settings.getint('checkpoint_segment_seconds', self.DEFAULT_CHECKPOINT_SEGMENT_SECONDS),
+                10,
+            )
             encoder_mode = settings.get('encoder_mode', 'auto')
+            self.saved_encoder_mode = encoder_mode
             combo_index = self.encoder_combo.findData(encoder_mode)
             if combo_index >= 0:
                 self.encoder_combo.setCurrentIndex(combo_index)
+            resolution_cap_index = self.resolution_cap_combo.findData(settings.get('resolution_cap', DEFAULT_RESOLUTION_CAP))
+            if resolution_cap_index >= 0:
+                self.resolution_cap_combo.setCurrentIndex(resolution_cap_index)
             theme_name = settings.get('theme', 'Light')
             theme_index = self.theme_combo.findText(theme_name)
             if theme_index >= 0:
                 self.theme_combo.setCurrentIndex(theme_index)
             self.apply_stylesheet(self.get_selected_theme())
+            priority_index = self.priority_combo.findData(settings.get('priority', DEFAULT_PRIORITY))
+            if priority_index >= 0:
+                self.priority_combo.setCurrentIndex(priority_index)
+            self.cpu_affinity = settings.get('cpu_affinity', '')
+            self.max_parallel_jobs = max(settings.getint('max_parallel_jobs', self.DEFAULT_MAX_PARALLEL_JOBS), 1)
+            self.pause_cpu_percent = settings.getfloat('pause_cpu_percent', 0.0)
+            self.resume_cpu_percent = settings.get('resume_cpu_percent', '')
+            self.pause_schedule = settings.get('pause_schedule', '')
+            self.populate_parallel_modes()
+            parallel_mode = settings.get('parallel_jobs', '1')
+            parallel_index = self.parallel_combo.findData(int(parallel_mode) if parallel_mode.isdigit() else parallel_mode)
+            if parallel_index >= 0:
+                self.parallel_combo.setCurrentIndex(parallel_index)
+            ordering_index = self.ordering_combo.findData(settings.get('ordering', DEFAULT_ORDERING))
+            if ordering_index >= 0:
+                self.ordering_combo.setCurrentIndex(ordering_index)
+            self.deadline_input.setValue(settings.getint('deadline_hours', 8))
+            preset_mode_index = self.preset_mode_combo.findData(settings.get('preset_mode', DEFAULT_PRESET_MODE))
+            if preset_mode_index >= 0:
+                self.preset_mode_combo.setCurrentIndex(preset_mode_index)
+            self.file_manager.video_processor.set_history_backend(settings.get('history_backend', 'jsonl'))
+            self.copy_limit_mb_per_second = max(settings.getfloat('copy_limit_mb_per_second', 0.0), 0.0)
+            self.control_api_port = max(settings.getint('control_api_port', 0), 0)
+            self.control_api_token = settings.get('control_api_token', '')
+            video_processor = self.file_manager.video_processor
+            video_processor.savings_predictor.set_floor(
+                settings.getfloat('savings_floor_percent', DEFAULT_SAVINGS_FLOOR_PERCENT),
+                settings.get('savings_action', DEFAULT_SAVINGS_ACTION),
+            )
+            video_processor.set_ram_staging(
+                settings.get('ram_staging_folder', video_processor.DEFAULT_RAM_STAGING_FOLDER),
+                settings.getfloat('ram_staging_threshold_mb', video_processor.DEFAULT_RAM_STAGING_THRESHOLD_MB),
+                settings.getfloat('ram_staging_budget_mb', video_processor.DEFAULT_RAM_STAGING_BUDGET_MB),
+            )
+            self.file_manager.video_processor.set_staging_cache_limit(
+                settings.getfloat('staging_cache_gb', self.file_manager.video_processor.DEFAULT_STAGING_CACHE_GB)
+            )
             temp_folder = settings.get('temp_folder', '')
             if temp_folder and os.path.isdir(temp_folder):
                 self.set_temp_folder(temp_folder)
@@ -428,11 +803,60 @@ class MainWindow(QMainWindow):
                 self.current_folder = os.path.normpath(last_folder).replace('\\', '/')
                 self.folder_path_label.setText(f"Folder: {self.current_folder}")
 
+def send_control_command(command):
+    signal_name = CONTROL_COMMANDS[command]
+    if not hasattr(signal, signal_name):
+        print("Pausing and resuming from the command line requires a POSIX system.")
+        return 1
+
+    try:
+        with open(PID_FILE, 'r') as pid_file:
+            pid = int(pid_file.read().strip())
+        os.kill(pid, getattr(signal, signal_name))
+    except (OSError, ValueError) as exc:
+        print(f"No running EZ_ffmpeg instance found: {exc}")
+        return 1
+
+    print(f"Sent {command[2:]} request to EZ_ffmpeg (pid {pid})")
+    return 0
+
+def install_control_signals(window):
+    if not hasattr(signal, 'SIGUSR1'):
+        return None
+
+    signal.signal(signal.SIGUSR1, lambda *_: window.file_manager.pause_processing())
+    signal.signal(signal.SIGUSR2, lambda *_: window.file_manager.resume_processing())
+    with open(PID_FILE, 'w') as pid_file:
+        pid_file.write(str(os.getpid()))
+
+    # Python only runs signal handlers when the interpreter regains control,
+    # so wake it up periodically while Qt's event loop is running.
+    wake_timer = QTimer()
+    wake_timer.timeout.connect(lambda: None)
+    wake_timer.start(500)
+    return wake_timer
+
+def remove_pid_file():
+    try:
+        with open(PID_FILE, 'r') as pid_file:
+            if pid_file.read().strip() != str(os.getpid()):
+                return
+        os.remove(PID_FILE)
+    except (OSError, ValueError):
+        pass
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in CONTROL_COMMANDS:
+        sys.exit(send_control_command(sys.argv[1]))
+
+    startup_timer = StartupTimer()
     app = QApplication(sys.argv)
-    ex = MainWindow()
+    startup_timer.mark("Qt init")
+    ex = MainWindow(startup_timer)
+    wake_timer = install_control_signals(ex)
     try:
         app.aboutToQuit.connect(ex.save_settings)
+        app.aboutToQuit.connect(remove_pid_file)
         sys.exit(app.exec_())
     except KeyboardInterrupt:
         sys.exit(0)
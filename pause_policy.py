@@ -0,0 +1,175 @@
+import sys
+import time
+from datetime import datetime
+
+from activity_log import write_log_entry
+
+
+class SystemLoadSampler:
+    def __init__(self):
+        self.last_totals = None
+        self.last_process_ticks = {}
+
+    def is_supported(self):
+        return sys.platform.startswith('linux')
+
+    def sample_foreign_cpu_percent(self, pids):
+        # Share of total CPU time spent by processes other than our own ffmpeg
+        # children, so the encodes themselves never trigger a pause.
+        if not self.is_supported():
+            return None
+
+        try:
+            totals = self._read_cpu_totals()
+        except OSError as exc:
+            print(f"Unable to read CPU statistics: {exc}")
+            return None
+
+        process_ticks = {}
+        for pid in pids:
+            ticks = self._read_process_ticks(pid)
+            if ticks is not None:
+                process_ticks[pid] = ticks
+
+        previous_totals = self.last_totals
+        previous_ticks = self.last_process_ticks
+        self.last_totals = totals
+        self.last_process_ticks = process_ticks
+        if previous_totals is None:
+            return None
+
+        total_delta = totals[0] - previous_totals[0]
+        busy_delta = totals[1] - previous_totals[1]
+        if total_delta <= 0:
+            return None
+
+        own_delta = sum(
+            ticks - previous_ticks[pid]
+            for pid, ticks in process_ticks.items()
+            if pid in previous_ticks
+        )
+        foreign_delta = max(busy_delta - own_delta, 0)
+        return foreign_delta * 100.0 / total_delta
+
+    def _read_cpu_totals(self):
+        with open('/proc/stat', 'r', encoding='utf-8') as stat_file:
+            fields = stat_file.readline().split()[1:9]
+        values = [int(value) for value in fields]
+        total = sum(values)
+        idle = values[3] + values[4]
+        return total, total - idle
+
+    def _read_process_ticks(self, pid):
+        try:
+            with open(f'/proc/{pid}/stat', 'r', encoding='utf-8') as stat_file:
+                stat_line = stat_file.read()
+        except OSError:
+            return None
+        fields = stat_line.rsplit(')', 1)[-1].split()
+        return int(fields[11]) + int(fields[12])
+
+
+class PausePolicy:
+    SAMPLE_INTERVAL = 5.0
+    PAUSE_AFTER_SECONDS = 30.0
+    RESUME_AFTER_SECONDS = 60.0
+
+    def __init__(self, pause_cpu_percent=0.0, resume_cpu_percent=None, schedule='', log_path=''):
+        self.pause_cpu_percent = max(float(pause_cpu_percent or 0.0), 0.0)
+        if resume_cpu_percent is None or resume_cpu_percent == '':
+            resume_cpu_percent = self.pause_cpu_percent * 0.6
+        self.resume_cpu_percent = min(float(resume_cpu_percent), self.pause_cpu_percent)
+        self.windows = parse_time_windows(schedule)
+        self.log_path = log_path
+        self.sampler = SystemLoadSampler()
+        self.active_reasons = set()
+        self.last_sample_at = 0.0
+        self.load_high_since = None
+        self.load_low_since = None
+
+    def is_enabled(self):
+        return bool(self.pause_cpu_percent or self.windows)
+
+    def evaluate(self, pids, now=None):
+        now = time.time() if now is None else now
+        if now - self.last_sample_at < self.SAMPLE_INTERVAL:
+            return set(self.active_reasons)
+        self.last_sample_at = now
+
+        if self.windows:
+            in_window = is_within_windows(datetime.fromtimestamp(now), self.windows)
+            self._set_reason(
+                'schedule',
+                in_window,
+                "inside the configured pause window" if in_window else "the configured pause window ended",
+            )
+
+        if self.pause_cpu_percent and self.sampler.is_supported():
+            foreign_percent = self.sampler.sample_foreign_cpu_percent(pids)
+            if foreign_percent is not None:
+                self._update_load_reason(foreign_percent, now)
+
+        return set(self.active_reasons)
+
+    def _update_load_reason(self, foreign_percent, now):
+        if 'load' not in self.active_reasons:
+            if foreign_percent >= self.pause_cpu_percent:
+                self.load_high_since = self.load_high_since or now
+                if now - self.load_high_since >= self.PAUSE_AFTER_SECONDS:
+                    self._set_reason(
+                        'load',
+                        True,
+                        f"other processes used {foreign_percent:.0f}% CPU (limit {self.pause_cpu_percent:.0f}%)",
+                    )
+                    self.load_low_since = None
+            else:
+                self.load_high_since = None
+            return
+
+        if foreign_percent <= self.resume_cpu_percent:
+            self.load_low_since = self.load_low_since or now
+            if now - self.load_low_since >= self.RESUME_AFTER_SECONDS:
+                self._set_reason(
+                    'load',
+                    False,
+                    f"other processes dropped to {foreign_percent:.0f}% CPU (resume at {self.resume_cpu_percent:.0f}%)",
+                )
+                self.load_high_since = None
+        else:
+            self.load_low_since = None
+
+    def _set_reason(self, reason, active, detail):
+        if active and reason not in self.active_reasons:
+            self.active_reasons.add(reason)
+            write_log_entry(self.log_path, 'PAUSE', f"Pausing encodes ({reason}): {detail}")
+        elif not active and reason in self.active_reasons:
+            self.active_reasons.discard(reason)
+            write_log_entry(self.log_path, 'RESUME', f"Resuming encodes ({reason}): {detail}")
+
+
+def parse_time_windows(text):
+    windows = []
+    for part in (text or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            start_text, end_text = part.split('-', 1)
+            start = datetime.strptime(start_text.strip(), '%H:%M').time()
+            end = datetime.strptime(end_text.strip(), '%H:%M').time()
+        except ValueError:
+            print(f"Ignoring invalid pause window: {part}")
+            continue
+        windows.append((start, end))
+    return windows
+
+
+def is_within_windows(moment, windows):
+    current = moment.time()
+    for start, end in windows:
+        if start <= end:
+            if start <= current < end:
+                return True
+        elif current >= start or current < end:
+            return True
+    return False
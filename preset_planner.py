@@ -0,0 +1,110 @@
+import heapq
+import time
+
+from activity_log import write_log_entry
+
+# Best quality first. Factors are throughput relative to x265's default
+# "medium" preset and only need to be roughly right: live speeds correct them.
+X265_PRESETS = ['slow', 'medium', 'fast', 'ultrafast']
+PRESET_SPEED_FACTORS = {
+    'slow': 0.5,
+    'medium': 1.0,
+    'fast': 1.6,
+    'ultrafast': 4.0,
+}
+PLANNED_ENCODERS = {'libx265'}
+PRESET_MODES = {
+    'default': 'Encoder default',
+    'deadline': 'Fit deadline',
+}
+PRESET_MODE_ORDER = ['default', 'deadline']
+DEFAULT_PRESET_MODE = 'default'
+
+
+def get_preset_mode_options():
+    return [(key, PRESET_MODES[key]) for key in PRESET_MODE_ORDER]
+
+
+def get_preset_speed_factor(encoder_key, preset):
+    if encoder_key not in PLANNED_ENCODERS or not preset:
+        return 1.0
+    return PRESET_SPEED_FACTORS.get(preset, 1.0)
+
+
+class PresetPlanner:
+    REPLAN_INTERVAL = 30.0
+    CORRECTION_SMOOTHING = 0.2
+    MIN_CORRECTION = 0.25
+    MAX_CORRECTION = 4.0
+
+    def __init__(self, deadline_at, log_path=''):
+        self.deadline_at = deadline_at
+        self.log_path = log_path
+        self.speed_correction = 1.0
+        self.last_plan_at = 0.0
+        self.last_plan = {}
+        self.last_unplanned = 0
+
+    def should_replan(self, now=None):
+        now = time.time() if now is None else now
+        return now - self.last_plan_at >= self.REPLAN_INTERVAL
+
+    def observe_speed(self, predicted_speed, observed_speed):
+        # Folds the gap between predicted and live ffmpeg speed into every
+        # pending job's prediction.
+        if predicted_speed <= 0 or observed_speed <= 0:
+            return
+        ratio = min(max(observed_speed / predicted_speed, self.MIN_CORRECTION), self.MAX_CORRECTION)
+        self.speed_correction += (ratio - self.speed_correction) * self.CORRECTION_SMOOTHING
+
+    def get_job_seconds(self, encoder_key, base_seconds, preset):
+        return base_seconds / get_preset_speed_factor(encoder_key, preset) / self.speed_correction
+
+    def plan(self, jobs, busy_seconds, parallel_jobs, now=None, unplanned=0):
+        # jobs: (key, encoder_key, base_seconds at the default preset).
+        # unplanned: pending jobs with no estimate at all, only reported.
+        # Start everyone on the slowest preset and repeatedly speed up the job
+        # whose next step saves the most time until the queue fits.
+        now = time.time() if now is None else now
+        self.last_plan_at = now
+        capacity_seconds = max(self.deadline_at - now, 0.0) * max(parallel_jobs, 1) - busy_seconds
+        plan = {key: X265_PRESETS[0] for key, encoder_key, _ in jobs if encoder_key in PLANNED_ENCODERS}
+        total_seconds = sum(
+            self.get_job_seconds(encoder_key, base_seconds, plan.get(key))
+            for key, encoder_key, base_seconds in jobs
+        )
+
+        steps = []
+        for index, (key, encoder_key, base_seconds) in enumerate(jobs):
+            if key in plan:
+                heapq.heappush(steps, (-self._get_step_saving(encoder_key, base_seconds, 0), index, 0))
+
+        while total_seconds > capacity_seconds and steps:
+            negative_saving, index, preset_index = heapq.heappop(steps)
+            key, encoder_key, base_seconds = jobs[index]
+            plan[key] = X265_PRESETS[preset_index + 1]
+            total_seconds += negative_saving
+            if preset_index + 2 < len(X265_PRESETS):
+                heapq.heappush(steps, (-self._get_step_saving(encoder_key, base_seconds, preset_index + 1), index, preset_index + 1))
+
+        if plan != self.last_plan or unplanned != self.last_unplanned:
+            counts = {preset: list(plan.values()).count(preset) for preset in X265_PRESETS}
+            preset_text = ", ".join(f"{preset} {count}" for preset, count in counts.items() if count)
+            fits = "fits" if total_seconds <= capacity_seconds else "cannot meet"
+            write_log_entry(
+                self.log_path,
+                'PLAN',
+                f"Preset plan ({preset_text}) {fits} the deadline: "
+                f"{total_seconds / 3600:.1f} h of work for {max(capacity_seconds, 0.0) / 3600:.1f} h of capacity "
+                f"(speed correction {self.speed_correction:.2f})"
+                + (f"; partial plan, {unplanned} file(s) not analyzed yet are not counted" if unplanned else ""),
+            )
+        self.last_plan = plan
+        self.last_unplanned = unplanned
+        return plan
+
+    def _get_step_saving(self, encoder_key, base_seconds, preset_index):
+        return (
+            self.get_job_seconds(encoder_key, base_seconds, X265_PRESETS[preset_index])
+            - self.get_job_seconds(encoder_key, base_seconds, X265_PRESETS[preset_index + 1])
+        )
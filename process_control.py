@@ -0,0 +1,60 @@
+import os
+import signal
+
+PROCESS_SUSPEND_RESUME = 0x0800
+
+
+def suspend_process(process):
+    return _signal_process(process, suspend=True)
+
+
+def resume_process(process):
+    return _signal_process(process, suspend=False)
+
+
+def terminate_process(process, timeout=5):
+    if process is None or process.poll() is not None:
+        return
+
+    # A stopped process cannot act on SIGTERM until it is continued.
+    resume_process(process)
+    try:
+        process.terminate()
+        process.wait(timeout=timeout)
+    except Exception as exc:
+        print(f"Error terminating ffmpeg process {process.pid}: {exc}")
+        try:
+            process.kill()
+        except Exception as kill_exc:
+            print(f"Error killing ffmpeg process {process.pid}: {kill_exc}")
+
+
+def _signal_process(process, suspend):
+    if process is None or process.poll() is not None:
+        return False
+
+    try:
+        if os.name == 'nt':
+            return _signal_windows_process(process.pid, suspend)
+        os.kill(process.pid, signal.SIGSTOP if suspend else signal.SIGCONT)
+        return True
+    except Exception as exc:
+        action = "suspend" if suspend else "resume"
+        print(f"Unable to {action} ffmpeg process {process.pid}: {exc}")
+        return False
+
+
+def _signal_windows_process(pid, suspend):
+    import ctypes
+
+    handle = ctypes.windll.kernel32.OpenProcess(PROCESS_SUSPEND_RESUME, False, pid)
+    if not handle:
+        return False
+    try:
+        if suspend:
+            status = ctypes.windll.ntdll.NtSuspendProcess(handle)
+        else:
+            status = ctypes.windll.ntdll.NtResumeProcess(handle)
+        return status == 0
+    finally:
+        ctypes.windll.kernel32.CloseHandle(handle)
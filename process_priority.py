@@ -0,0 +1,209 @@
+import ctypes
+import os
+import platform
+import sys
+import threading
+
+PRIORITY_PRESETS = {
+    'background': {
+        'label': 'Background',
+        'nice': 19,
+        'io_class': 'idle',
+        'cpu_share': 0.5,
+        'windows_class': 0x00004000,
+    },
+    'normal': {
+        'label': 'Normal',
+        'nice': 0,
+        'io_class': 'best-effort',
+        'io_level': 4,
+        'cpu_share': 1.0,
+        'windows_class': 0x00000020,
+    },
+    'full_blast': {
+        'label': 'Full blast',
+        'nice': -10,
+        'io_class': 'best-effort',
+        'io_level': 0,
+        'cpu_share': 1.0,
+        'windows_class': 0x00008000,
+    },
+}
+
+PRIORITY_ORDER = ['background', 'normal', 'full_blast']
+DEFAULT_PRIORITY = 'normal'
+
+IOPRIO_CLASSES = {
+    'realtime': 1,
+    'best-effort': 2,
+    'idle': 3,
+}
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_SET_SYSCALLS = {
+    'x86_64': 251,
+    'amd64': 251,
+    'i386': 289,
+    'i686': 289,
+    'aarch64': 30,
+    'arm64': 30,
+    'armv7l': 314,
+}
+
+
+def get_priority_options():
+    return [(preset_key, PRIORITY_PRESETS[preset_key]['label']) for preset_key in PRIORITY_ORDER]
+
+
+def get_priority_label(preset_key):
+    preset = PRIORITY_PRESETS.get(preset_key)
+    if preset:
+        return preset['label']
+    return preset_key or ''
+
+
+def parse_cpu_list(text):
+    cpus = set()
+    for part in (text or '').replace(' ', '').split(','):
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                start, end = part.split('-', 1)
+                cpus.update(range(int(start), int(end) + 1))
+            else:
+                cpus.add(int(part))
+        except ValueError:
+            print(f"Ignoring invalid CPU list entry: {part}")
+    return cpus
+
+
+def resolve_cpu_set(preset_key, cpu_override=''):
+    if not hasattr(os, 'sched_getaffinity'):
+        return None
+
+    available = sorted(os.sched_getaffinity(0))
+    override = parse_cpu_list(cpu_override) & set(available)
+    if override:
+        return override
+
+    share = PRIORITY_PRESETS.get(preset_key, PRIORITY_PRESETS[DEFAULT_PRIORITY])['cpu_share']
+    if share >= 1.0 or len(available) <= 1:
+        return None
+
+    # Keep the lowest-numbered cores free for the services sharing the host.
+    count = max(int(len(available) * share), 1)
+    return set(available[-count:])
+
+
+def build_popen_kwargs(preset_key):
+    # Elsewhere the priority is applied after the spawn with
+    # apply_process_priority: preexec_fn can deadlock the child while other
+    # threads hold locks, and workers launch processes concurrently.
+    if os.name != 'nt':
+        return {}
+    preset = PRIORITY_PRESETS.get(preset_key, PRIORITY_PRESETS[DEFAULT_PRIORITY])
+    return {'creationflags': preset['windows_class']}
+
+
+def apply_process_priority(pid, preset_key, cpu_override=''):
+    if os.name == 'nt':
+        return
+
+    preset = PRIORITY_PRESETS.get(preset_key, PRIORITY_PRESETS[DEFAULT_PRIORITY])
+    cpu_set = resolve_cpu_set(preset_key, cpu_override)
+    # Threads the child started before this call do not inherit the new
+    # settings, so each one is updated.
+    for thread_id in _get_thread_ids(pid):
+        try:
+            _apply_nice(thread_id, preset['nice'])
+            if cpu_set:
+                os.sched_setaffinity(thread_id, cpu_set)
+            ioprio_call = _build_ioprio_call(preset, thread_id)
+            if ioprio_call:
+                ioprio_call()
+        except ProcessLookupError:
+            continue
+        except Exception as exc:
+            print(f"Unable to apply {preset_key} priority to process {pid}: {exc}")
+            return
+
+
+def apply_thread_priority(preset_key, cpu_override=''):
+    # Niceness, affinity and I/O class are per-thread on Linux, so a worker
+    # thread can be demoted without touching the GUI or the other workers.
+    if not sys.platform.startswith('linux'):
+        return
+
+    preset = PRIORITY_PRESETS.get(preset_key, PRIORITY_PRESETS[DEFAULT_PRIORITY])
+    thread_id = threading.get_native_id()
+    try:
+        _apply_nice(thread_id, preset['nice'])
+        cpu_set = resolve_cpu_set(preset_key, cpu_override)
+        if cpu_set:
+            os.sched_setaffinity(0, cpu_set)
+        ioprio_call = _build_ioprio_call(preset, thread_id)
+        if ioprio_call:
+            ioprio_call()
+    except Exception as exc:
+        print(f"Unable to apply {preset_key} priority to worker thread: {exc}")
+
+
+def run_with_priority(preset_key, cpu_override, target, *args, **kwargs):
+    outcome = {}
+
+    def runner():
+        apply_thread_priority(preset_key, cpu_override)
+        try:
+            outcome['result'] = target(*args, **kwargs)
+        except BaseException as exc:
+            outcome['error'] = exc
+
+    worker = threading.Thread(target=runner, daemon=True)
+    worker.start()
+    worker.join()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome.get('result')
+
+
+def _get_thread_ids(pid):
+    try:
+        return [int(thread_id) for thread_id in os.listdir(f"/proc/{pid}/task")]
+    except (OSError, ValueError):
+        return [pid]
+
+
+def _apply_nice(target_id, nice_value):
+    if not hasattr(os, 'setpriority'):
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, target_id, nice_value)
+    except PermissionError:
+        # Raising priority above the current niceness needs CAP_SYS_NICE;
+        # keep whatever the process already has.
+        pass
+
+
+def _build_ioprio_call(preset, target_id):
+    if not sys.platform.startswith('linux'):
+        return None
+
+    syscall_number = IOPRIO_SET_SYSCALLS.get(platform.machine().lower())
+    io_class = IOPRIO_CLASSES.get(preset.get('io_class'))
+    if syscall_number is None or io_class is None:
+        return None
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return None
+
+    io_level = 0 if io_class == IOPRIO_CLASSES['idle'] else preset.get('io_level', 4)
+    ioprio = (io_class << IOPRIO_CLASS_SHIFT) | io_level
+    syscall = libc.syscall
+
+    def set_ioprio():
+        syscall(syscall_number, IOPRIO_WHO_PROCESS, target_id, ioprio)
+
+    return set_ioprio
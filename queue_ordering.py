@@ -0,0 +1,91 @@
+ORDERING_POLICIES = {
+    'largest': 'Largest first',
+    'mb_per_min': 'Highest MB/min',
+    'savings_rate': 'Most saved per hour',
+    'deadline': 'Best fit for deadline',
+}
+ORDERING_ORDER = ['largest', 'mb_per_min', 'savings_rate', 'deadline']
+DEFAULT_ORDERING = 'largest'
+DEADLINE_STEP_SECONDS = 60
+MAX_DEADLINE_CELLS = 5000000
+
+
+def get_ordering_options():
+    return [(key, ORDERING_POLICIES[key]) for key in ORDERING_ORDER]
+
+
+def predict_saved_mb(size_mb, duration_seconds, target_mb_per_min):
+    if not duration_seconds:
+        return None
+    return max(size_mb - target_mb_per_min * duration_seconds / 60.0, 0.0)
+
+
+def get_savings_rate(saved_mb, encode_seconds):
+    # MB saved per hour of encoding.
+    if saved_mb is None or not encode_seconds:
+        return None
+    return saved_mb * 3600.0 / encode_seconds
+
+
+def rank_by_savings_rate(candidates):
+    # candidates: (key, saved_mb, encode_seconds). Jobs without a prediction
+    # keep their relative order after every job that has one.
+    def sort_key(candidate):
+        rate = get_savings_rate(candidate[1], candidate[2])
+        return (rate is None, -(rate or 0.0))
+
+    return [candidate[0] for candidate in sorted(candidates, key=sort_key)]
+
+
+def select_for_deadline(candidates, capacity_seconds):
+    # 0/1 knapsack on encode time at one-minute resolution: the subset that
+    # saves the most space while its predicted encode time fits the window.
+    predicted = [
+        (key, saved_mb, max(int(-(-encode_seconds // DEADLINE_STEP_SECONDS)), 1))
+        for key, saved_mb, encode_seconds in candidates
+        if saved_mb and encode_seconds
+    ]
+    capacity = int(capacity_seconds // DEADLINE_STEP_SECONDS)
+    if capacity <= 0 or not predicted:
+        return set()
+    if capacity * len(predicted) > MAX_DEADLINE_CELLS:
+        return _select_greedy(predicted, capacity)
+
+    best = [0.0] * (capacity + 1)
+    taken = []
+    for _, saved_mb, steps in predicted:
+        took_item = bytearray(capacity + 1)
+        for used in range(capacity, steps - 1, -1):
+            candidate_total = best[used - steps] + saved_mb
+            if candidate_total > best[used]:
+                best[used] = candidate_total
+                took_item[used] = 1
+        taken.append(took_item)
+
+    selected = set()
+    used = capacity
+    for index in range(len(predicted) - 1, -1, -1):
+        if taken[index][used]:
+            selected.add(predicted[index][0])
+            used -= predicted[index][2]
+    return selected
+
+
+def get_deferred_keys(candidates, selected):
+    # Only jobs with a prediction can be ruled out. Files that have not been
+    # analyzed yet stay queued behind the selected set instead of being
+    # deferred for lack of numbers.
+    return [
+        key for key, saved_mb, encode_seconds in candidates
+        if saved_mb is not None and encode_seconds and key not in selected
+    ]
+
+
+def _select_greedy(predicted, capacity):
+    selected = set()
+    remaining = capacity
+    for key, saved_mb, steps in sorted(predicted, key=lambda item: item[1] / item[2], reverse=True):
+        if steps <= remaining:
+            selected.add(key)
+            remaining -= steps
+    return selected
@@ -0,0 +1,137 @@
+import sys
+from collections.abc import Mapping
+
+
+class QueueRecord:
+    # One queue row. Slots instead of a per-record dict keep queues of
+    # hundreds of thousands of files small; item access mirrors the plain
+    # dicts the queue used before.
+    __slots__ = (
+        'row',
+        'file_path',
+        'size_mb',
+        'status',
+        'source_info',
+        'resolved_encoder',
+        'priority_preset',
+        'encoder_preset',
+        'resolution_cap',
+        'estimated_seconds',
+        'eta_seconds',
+        'eta_display',
+        'elapsed_seconds',
+        'elapsed_display',
+        'avg_speed_multiplier',
+        'avg_speed_display',
+        'output_size_mb',
+        'duplicate_of',
+        'duplicate_records',
+    )
+    FIELD_NAMES = frozenset(__slots__)
+    INTERNED_FIELDS = frozenset({'status', 'resolved_encoder', 'priority_preset', 'encoder_preset', 'resolution_cap'})
+
+    def __init__(self, row, file_path, size_mb, resolved_encoder=None):
+        self.row = row
+        self.file_path = file_path
+        self.size_mb = size_mb
+        self.status = 'Queued'
+        self.source_info = None
+        self.resolved_encoder = sys.intern(resolved_encoder) if resolved_encoder else resolved_encoder
+        self.priority_preset = None
+        self.encoder_preset = None
+        self.resolution_cap = None
+        self.estimated_seconds = None
+        self.eta_seconds = None
+        self.eta_display = '--'
+        self.elapsed_seconds = 0.0
+        self.elapsed_display = ''
+        self.avg_speed_multiplier = 0.0
+        self.avg_speed_display = ''
+        self.output_size_mb = None
+        self.duplicate_of = None
+        self.duplicate_records = None
+
+    def __getitem__(self, key):
+        if key not in self.FIELD_NAMES:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELD_NAMES:
+            raise KeyError(key)
+        if key in self.INTERNED_FIELDS and isinstance(value, str):
+            value = sys.intern(value)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        if key not in self.FIELD_NAMES:
+            return default
+        return getattr(self, key)
+
+    def update(self, values):
+        for key, value in values.items():
+            self[key] = value
+
+
+class MediaInfo(Mapping):
+    # Probe and analysis results for one record. Codec names and labels repeat
+    # across a library, so they are interned and shared between records.
+    FIELDS = (
+        'duration_seconds',
+        'video_codec',
+        'audio_codec',
+        'audio_channels',
+        'width',
+        'height',
+        'length_formatted',
+        'mb_per_min_before',
+        'estimated_seconds',
+        'estimated_display',
+        'estimated_output_size_mb',
+        'resolved_encoder',
+        'encoder_label',
+        'video_codec_label',
+        'resolution_label',
+        'audio_label',
+    )
+    INTERNED_FIELDS = frozenset({
+        'video_codec',
+        'audio_codec',
+        'resolved_encoder',
+        'encoder_label',
+        'video_codec_label',
+        'resolution_label',
+        'audio_label',
+    })
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, values):
+        # Fields the probe did not produce stay unset, so they are missing
+        # from the mapping rather than present as None.
+        for field in self.FIELDS:
+            if field not in values:
+                continue
+            value = values[field]
+            if field in self.INTERNED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, field, value)
+        extra = {key: value for key, value in values.items() if key not in self.FIELDS}
+        self.extra = extra or None
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from (field for field in self.FIELDS if hasattr(self, field))
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for field in self.FIELDS if hasattr(self, field)) + len(self.extra or ())
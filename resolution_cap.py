@@ -0,0 +1,59 @@
+RESOLUTION_CAPS = {
+    'none': 'Source',
+    '2160p': '2160p',
+    '1440p': '1440p',
+    '1080p': '1080p',
+    '720p': '720p',
+}
+RESOLUTION_CAP_ORDER = ['none', '2160p', '1440p', '1080p', '720p']
+RESOLUTION_CAP_HEIGHTS = {
+    '2160p': 2160,
+    '1440p': 1440,
+    '1080p': 1080,
+    '720p': 720,
+}
+DEFAULT_RESOLUTION_CAP = 'none'
+
+
+def get_resolution_cap_options():
+    return [(key, RESOLUTION_CAPS[key]) for key in RESOLUTION_CAP_ORDER]
+
+
+def get_resolution_cap_label(cap_key):
+    return RESOLUTION_CAPS.get(cap_key, RESOLUTION_CAPS[DEFAULT_RESOLUTION_CAP])
+
+
+def get_rotation(video_stream):
+    # Newer ffprobe reports rotation as display matrix side data, older
+    # versions as a 'rotate' tag.
+    for side_data in video_stream.get('side_data_list') or []:
+        if 'rotation' in side_data:
+            try:
+                return int(float(side_data['rotation']))
+            except (TypeError, ValueError):
+                return 0
+    try:
+        return int(float((video_stream.get('tags') or {}).get('rotate') or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_display_size(width, height, rotation):
+    # ffmpeg autorotates before -vf, so filters see the rotated frame.
+    if rotation % 180 == 90:
+        return height, width
+    return width, height
+
+
+def get_capped_size(width, height, cap_key):
+    # The cap is a 16:9 box turned to match the source, so portrait video is
+    # limited on its short side too. Returns None when no scaling is needed.
+    cap_height = RESOLUTION_CAP_HEIGHTS.get(cap_key)
+    if not cap_height or not width or not height:
+        return None
+    short_side, long_side = sorted((width, height))
+    scale = min(cap_height / short_side, cap_height * 16 / 9 / long_side)
+    if scale >= 1.0:
+        return None
+    # Most encoders need even dimensions for 4:2:0 chroma.
+    return max(int(width * scale / 2) * 2, 2), max(int(height * scale / 2) * 2, 2)
@@ -0,0 +1,110 @@
+import statistics
+import threading
+
+from activity_log import write_log_entry
+
+SAVINGS_ACTIONS = ('off', 'flag', 'skip')
+DEFAULT_SAVINGS_ACTION = 'flag'
+DEFAULT_SAVINGS_FLOOR_PERCENT = 5.0
+
+
+def get_resolution_class(height):
+    if not height:
+        return None
+    if height >= 1800:
+        return '2160p'
+    if height >= 900:
+        return '1080p'
+    if height >= 650:
+        return '720p'
+    return 'SD'
+
+
+def build_outcome(source_info, source_size_mb, output_size_mb, target_mb_per_min, encoded_height=None):
+    # Stored with the encode history entry. The target ratio is how far the
+    # output landed from the requested MB/min, which carries over to other
+    # sources of the same kind better than the raw output/source ratio.
+    duration_seconds = source_info.get('duration_seconds')
+    if not duration_seconds or not source_size_mb or not target_mb_per_min:
+        return {}
+    output_mb_per_min = output_size_mb * 60.0 / duration_seconds
+    return {
+        'video_codec': source_info.get('video_codec'),
+        'resolution_class': get_resolution_class(encoded_height or source_info.get('height')),
+        'size_ratio': output_size_mb / source_size_mb,
+        'target_ratio': output_mb_per_min / target_mb_per_min,
+    }
+
+
+class SavingsPredictor:
+    # Predicts the fraction of a source an encode will save from past
+    # outcomes with the same source codec, resolution class and encoder.
+    MIN_SAMPLES = 3
+    HISTORY_SAMPLES = 200
+
+    def __init__(self, floor_percent=DEFAULT_SAVINGS_FLOOR_PERCENT, action=DEFAULT_SAVINGS_ACTION, log_path=''):
+        self.floor_percent = floor_percent
+        self.action = action
+        self.log_path = log_path
+        self.lock = threading.Lock()
+        self.checked = 0
+        self.hits = 0
+
+    def set_floor(self, floor_percent, action):
+        self.floor_percent = max(float(floor_percent), 0.0)
+        self.action = action if action in SAVINGS_ACTIONS else DEFAULT_SAVINGS_ACTION
+
+    def is_enabled(self):
+        return self.action != 'off'
+
+    def predict(self, history_entries, source_info, target_mb_per_min, encoded_height=None):
+        mb_per_min_before = source_info.get('mb_per_min_before')
+        if not mb_per_min_before or not target_mb_per_min:
+            return None
+        video_codec = source_info.get('video_codec')
+        resolution_class = get_resolution_class(encoded_height or source_info.get('height'))
+        target_ratios = [
+            entry['target_ratio']
+            for entry in history_entries
+            if entry.get('target_ratio')
+            and entry.get('video_codec') == video_codec
+            and entry.get('resolution_class') == resolution_class
+        ]
+        if len(target_ratios) < self.MIN_SAMPLES:
+            return None
+        predicted_mb_per_min = statistics.median(target_ratios) * target_mb_per_min
+        return 1.0 - predicted_mb_per_min / mb_per_min_before
+
+    def is_below_floor(self, savings):
+        return savings * 100.0 < self.floor_percent
+
+    def describe(self, savings):
+        if savings is None:
+            return ''
+        text = f"Predicted to save {savings * 100:.0f}%"
+        if self.is_below_floor(savings):
+            text += f", below the {self.floor_percent:.0f}% floor"
+            text += ": will be skipped" if self.action == 'skip' else ": likely not worth encoding"
+        return text
+
+    def record_result(self, file_path, predicted_savings, actual_savings):
+        # A hit is a prediction that landed on the same side of the floor as
+        # the real result. Skipped files never produce a result to compare.
+        if predicted_savings is None:
+            return
+        hit = self.is_below_floor(predicted_savings) == self.is_below_floor(actual_savings)
+        with self.lock:
+            self.checked += 1
+            self.hits += int(hit)
+            hit_rate_text = self.get_hit_rate_text()
+        write_log_entry(
+            self.log_path,
+            'PREDICT',
+            f"{file_path}: predicted {predicted_savings * 100:.0f}% saved, got {actual_savings * 100:.0f}% "
+            f"({'hit' if hit else 'miss'}, {hit_rate_text})",
+        )
+
+    def get_hit_rate_text(self):
+        if not self.checked:
+            return ''
+        return f"{self.hits / self.checked * 100:.0f}% hits ({self.hits}/{self.checked})"
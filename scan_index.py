@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class DirectoryIndex:
+    VERSION = 1
+    # A directory changed this close to the scan could change again within
+    # the same mtime tick, so it is listed again next time.
+    MTIME_SLACK_SECONDS = 2.0
+    # Directory listings on network shares are bound by round-trip latency,
+    # so several are kept in flight at once.
+    SCAN_WORKERS = 16
+
+    def __init__(self, index_path, max_workers=SCAN_WORKERS):
+        self.index_path = index_path
+        self.max_workers = max(int(max_workers), 1)
+        self.root = None
+        self.directories = {}
+        self.listed_count = 0
+        self.reused_count = 0
+
+    @staticmethod
+    def get_index_path(index_folder, root):
+        root_key = hashlib.sha1(os.path.abspath(root).encode('utf-8', errors='surrogateescape')).hexdigest()[:16]
+        return os.path.join(index_folder, f"{root_key}.json")
+
+    def load(self, root):
+        self.root = root
+        self.directories = {}
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as index_file:
+                data = json.load(index_file)
+        except (OSError, ValueError) as exc:
+            print(f"Ignoring unreadable scan index {self.index_path}: {exc}")
+            return
+        if data.get('version') == self.VERSION and data.get('root') == root:
+            self.directories = data.get('directories', {})
+
+    def save(self):
+        if not self.index_path:
+            return
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump({'version': self.VERSION, 'root': self.root, 'directories': self.directories}, index_file)
+        os.replace(temp_path, self.index_path)
+
+    def scan(self, is_wanted, on_directory=None):
+        # Only directories whose mtime moved are listed again. Their mtime
+        # changes when entries are added, removed or renamed, not when a file
+        # inside is rewritten in place.
+        scan_started = time.time()
+        previous_directories = self.directories
+        directories = {}
+        files = {}
+        visited_folders = set()
+        self.listed_count = 0
+        self.reused_count = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = {pool.submit(self._resolve_directory, self.root, previous_directories, is_wanted, scan_started)}
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    folder_path, folder_identity, entry, listed = future.result()
+                    if entry is None:
+                        continue
+                    # Symlinked folders are never followed, but bind mounts
+                    # can still lead back into a folder already scanned.
+                    if folder_identity is not None:
+                        if folder_identity in visited_folders:
+                            print(f"Skipping {folder_path}: already scanned through another path")
+                            continue
+                        visited_folders.add(folder_identity)
+
+                    if listed:
+                        self.listed_count += 1
+                    else:
+                        self.reused_count += 1
+                    directories[folder_path] = entry
+                    folder_files = {
+                        os.path.join(folder_path, file_name): tuple(file_state)
+                        for file_name, file_state in entry['files'].items()
+                    }
+                    files.update(folder_files)
+                    if on_directory and folder_files:
+                        on_directory(folder_files)
+                    for name in entry['subdirs']:
+                        pending.add(pool.submit(
+                            self._resolve_directory,
+                            os.path.join(folder_path, name),
+                            previous_directories,
+                            is_wanted,
+                            scan_started,
+                        ))
+
+        self.directories = directories
+        return files
+
+    def _resolve_directory(self, folder_path, previous_directories, is_wanted, scan_started):
+        try:
+            stat_result = os.stat(folder_path)
+        except OSError:
+            return folder_path, None, None, False
+        # Some network filesystems report no inode numbers at all.
+        folder_identity = (stat_result.st_dev, stat_result.st_ino) if stat_result.st_ino else None
+
+        entry = previous_directories.get(folder_path)
+        if entry is not None and entry['mtime'] == stat_result.st_mtime:
+            return folder_path, folder_identity, entry, False
+
+        entry = self._list_directory(folder_path, is_wanted)
+        if entry is not None:
+            recent = stat_result.st_mtime >= scan_started - self.MTIME_SLACK_SECONDS
+            entry['mtime'] = None if recent else stat_result.st_mtime
+        return folder_path, folder_identity, entry, True
+
+    def _list_directory(self, folder_path, is_wanted):
+        subdirs = []
+        folder_files = {}
+        try:
+            with os.scandir(folder_path) as entries:
+                for dir_entry in entries:
+                    try:
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            subdirs.append(dir_entry.name)
+                        elif dir_entry.is_file() and is_wanted(dir_entry.path):
+                            stat_result = dir_entry.stat()
+                            folder_files[dir_entry.name] = [stat_result.st_size, stat_result.st_mtime]
+                    except OSError as exc:
+                        print(f"Skipping {dir_entry.path}: {exc}")
+        except OSError as exc:
+            print(f"Unable to list {folder_path}: {exc}")
+            return None
+        subdirs.sort()
+        return {'mtime': None, 'subdirs': subdirs, 'files': folder_files}
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class StagingCache:
+    INDEX_FILE = "index.json"
+    PARTIAL_SUFFIX = ".partial"
+    SAMPLE_BYTES = 1024 * 1024
+
+    def __init__(self, folder, max_bytes):
+        self.folder = folder
+        self.max_bytes = max(int(max_bytes), 0)
+        self.index_path = os.path.join(folder, self.INDEX_FILE)
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.pins = {}
+        self.copies_in_progress = {}
+        os.makedirs(self.folder, exist_ok=True)
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as index_file:
+                self.entries = json.load(index_file)
+        except Exception as exc:
+            print(f"Unable to read staging cache index {self.index_path}: {exc}")
+            self.entries = {}
+
+    def save(self):
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump(self.entries, index_file, indent=2)
+        os.replace(temp_path, self.index_path)
+
+    def set_max_bytes(self, max_bytes):
+        with self.lock:
+            self.max_bytes = max(int(max_bytes), 0)
+            self._evict_to_limit()
+
+    def fingerprint(self, source_path):
+        # Size plus samples from the head, middle and tail identifies a source
+        # without reading all of a multi-gigabyte file over the network.
+        size = os.path.getsize(source_path)
+        digest = hashlib.sha1(str(size).encode('utf-8'))
+        with open(source_path, 'rb') as source_file:
+            for offset in (0, max(size // 2 - self.SAMPLE_BYTES // 2, 0), max(size - self.SAMPLE_BYTES, 0)):
+                source_file.seek(offset)
+                digest.update(source_file.read(self.SAMPLE_BYTES))
+        return digest.hexdigest()[:20]
+
+    def acquire(self, source_path, copy_function, key=None):
+        # key: the source's fingerprint when the caller already computed it.
+        key = key or self.fingerprint(source_path)
+        extension = os.path.splitext(source_path)[1]
+        staged_path = os.path.join(self.folder, f"{key}{extension}")
+
+        while True:
+            with self.lock:
+                pending_copy = self.copies_in_progress.get(key)
+                if pending_copy is None:
+                    self.pins[key] = self.pins.get(key, 0) + 1
+                    entry = self.entries.get(key)
+                    if entry and self._is_entry_valid(entry):
+                        entry['last_used'] = time.time()
+                        self._save_quietly()
+                        print(f"Reusing staged copy of {source_path}")
+                        return staged_path
+                    pending_copy = threading.Event()
+                    self.copies_in_progress[key] = pending_copy
+                    self._evict_to_limit(incoming_bytes=os.path.getsize(source_path))
+                    break
+            pending_copy.wait()
+
+        partial_path = f"{staged_path}{self.PARTIAL_SUFFIX}"
+        try:
+            copy_function(source_path, partial_path)
+            os.replace(partial_path, staged_path)
+        except BaseException:
+            self._remove_file(partial_path)
+            with self.lock:
+                self._unpin(key)
+                self.copies_in_progress.pop(key).set()
+            raise
+
+        with self.lock:
+            self.entries[key] = {
+                'file': os.path.basename(staged_path),
+                'size': os.path.getsize(staged_path),
+                'source_path': source_path,
+                'last_used': time.time(),
+            }
+            self._evict_to_limit()
+            self.copies_in_progress.pop(key).set()
+        return staged_path
+
+    def contains(self, source_path, key=None):
+        key = key or self.fingerprint(source_path)
+        with self.lock:
+            entry = self.entries.get(key)
+            return bool(entry) and self._is_entry_valid(entry)
+
+    def release(self, staged_path):
+        with self.lock:
+            self._unpin(self._key_from_path(staged_path))
+
+    def evict(self, staged_path):
+        key = self._key_from_path(staged_path)
+        with self.lock:
+            if not self.pins.get(key):
+                self._evict_entry(key)
+                self._save_quietly()
+
+    def clean_orphans(self):
+        # Only files the index does not know about (interrupted copies and
+        # strays) are removed; indexed copies stay for the next run.
+        with self.lock:
+            known_files = {self.INDEX_FILE}
+            for key, entry in list(self.entries.items()):
+                if self._is_entry_valid(entry):
+                    known_files.add(entry['file'])
+                else:
+                    self.entries.pop(key)
+            for entry in os.listdir(self.folder):
+                if entry in known_files:
+                    continue
+                if any(entry.startswith(key) for key in self.copies_in_progress):
+                    continue
+                self._remove_file(os.path.join(self.folder, entry))
+            self._evict_to_limit()
+
+    def get_total_bytes(self):
+        with self.lock:
+            return sum(entry.get('size', 0) for entry in self.entries.values())
+
+    def _is_entry_valid(self, entry):
+        entry_path = os.path.join(self.folder, entry.get('file', ''))
+        return os.path.isfile(entry_path) and os.path.getsize(entry_path) == entry.get('size')
+
+    def _evict_to_limit(self, incoming_bytes=0):
+        total_bytes = incoming_bytes + sum(entry.get('size', 0) for entry in self.entries.values())
+        by_last_use = sorted(self.entries.items(), key=lambda item: item[1].get('last_used', 0))
+        for key, entry in by_last_use:
+            if total_bytes <= self.max_bytes:
+                break
+            if self.pins.get(key):
+                continue
+            total_bytes -= entry.get('size', 0)
+            self._evict_entry(key)
+        self._save_quietly()
+
+    def _evict_entry(self, key):
+        entry = self.entries.pop(key, None)
+        if entry:
+            self._remove_file(os.path.join(self.folder, entry['file']))
+            print(f"Evicted staged copy of {entry.get('source_path', entry['file'])}")
+
+    def _unpin(self, key):
+        remaining = self.pins.get(key, 0) - 1
+        if remaining > 0:
+            self.pins[key] = remaining
+        else:
+            self.pins.pop(key, None)
+
+    def _key_from_path(self, staged_path):
+        return os.path.splitext(os.path.basename(staged_path))[0]
+
+    def _save_quietly(self):
+        try:
+            self.save()
+        except Exception as exc:
+            print(f"Unable to save staging cache index: {exc}")
+
+    def _remove_file(self, path):
+        retries = 3
+        for attempt in range(retries):
+            try:
+                if os.path.exists(path):
+                    os.chmod(path, 0o666)
+                    os.remove(path)
+                    print(f"Deleted cached file: {path}")
+                return
+            except PermissionError:
+                print(f"Attempt {attempt + 1}: Permission denied for {path}. Retrying...")
+                time.sleep(1)
+            except Exception as exc:
+                print(f"Error deleting {path}: {exc}")
+                return
@@ -0,0 +1,20 @@
+import time
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.last_mark_at = self.started_at
+        self.phases = []
+
+    def mark(self, label):
+        now = time.perf_counter()
+        self.phases.append((label, now - self.last_mark_at))
+        self.last_mark_at = now
+
+    def get_total_seconds(self):
+        return self.last_mark_at - self.started_at
+
+    def format_summary(self):
+        phase_text = ", ".join(f"{label} {seconds:.2f}s" for label, seconds in self.phases)
+        return f"Startup took {self.get_total_seconds():.2f}s ({phase_text})"
@@ -13,6 +13,7 @@ TABLE_HEADERS = [
     "Avg speed",
     "MB after",
     "MB/min after",
+    "Priority",
 ]
 
 COLUMN_FILENAME = 0
@@ -29,3 +30,4 @@ COLUMN_ELAPSED = 10
 COLUMN_AVG_SPEED = 11
 COLUMN_MB_AFTER = 12
 COLUMN_MB_PER_MIN_AFTER = 13
+COLUMN_PRIORITY = 14
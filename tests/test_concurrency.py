@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrency import ConcurrencyController
+
+
+class ConcurrencyControllerTest(unittest.TestCase):
+    def run_window(self, controller, seconds, running_jobs, gaps=()):
+        # One observation per second; a job slot is empty during each gap.
+        for now in range(int(seconds)):
+            running = running_jobs
+            if any(gap_start <= now < gap_end for gap_start, gap_end in gaps):
+                running -= 1
+            controller.observe([1.0] * running, running, now=float(now))
+
+    def test_short_gaps_between_jobs_do_not_restart_the_window(self):
+        controller = ConcurrencyController(4)
+        controller._restart_window(0.0)
+        window = controller.WARMUP_SECONDS + controller.WINDOW_SECONDS
+        # A job finishes every 40 seconds and its slot stays empty for 5.
+        gaps = [(start, start + 5) for start in range(40, int(window), 40)]
+        self.run_window(controller, window + 2, 1, gaps)
+        self.assertEqual(controller.target_jobs, 2)
+        self.assertAlmostEqual(controller.previous_level[1], 1.0)
+
+    def test_long_gap_restarts_the_window(self):
+        controller = ConcurrencyController(4)
+        controller._restart_window(0.0)
+        window = controller.WARMUP_SECONDS + controller.WINDOW_SECONDS
+        gap_end = 60 + controller.GAP_TOLERANCE_SECONDS + 5
+        self.run_window(controller, window + 2, 1, [(60, gap_end)])
+        self.assertEqual(controller.target_jobs, 1)
+        self.assertIsNone(controller.previous_level)
+
+    def test_spin_up_does_not_count_as_a_gap(self):
+        controller = ConcurrencyController(4, min_jobs=2)
+        controller._restart_window(0.0)
+        controller.observe([1.0], 1, now=100.0)
+        self.assertEqual(controller.window_started, 100.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duplicate_finder import release_duplicates
+from queue_record import QueueRecord
+
+
+def make_group(primary_path, duplicate_paths):
+    primary = QueueRecord(0, primary_path, 100.0)
+    duplicates = []
+    for row, file_path in enumerate(duplicate_paths, start=1):
+        duplicate = QueueRecord(row, file_path, 100.0)
+        duplicate['status'] = "Duplicate"
+        duplicate['duplicate_of'] = primary_path
+        duplicates.append(duplicate)
+    primary['duplicate_records'] = duplicates
+    return primary, duplicates
+
+
+class ReleaseDuplicatesTest(unittest.TestCase):
+    def test_duplicates_of_a_failed_primary_are_queued_again(self):
+        primary, duplicates = make_group('/videos/a.mkv', ['/videos/b.mkv', '/videos/c.mkv'])
+        primary['status'] = "Error: See log"
+
+        released = release_duplicates(primary)
+
+        self.assertEqual(released, duplicates)
+        self.assertEqual([duplicate['status'] for duplicate in duplicates], ["Queued", "Queued"])
+        self.assertEqual([duplicate['duplicate_of'] for duplicate in duplicates], [None, None])
+        self.assertIsNone(primary['duplicate_records'])
+
+    def test_analyzed_duplicates_keep_their_analysis(self):
+        primary, duplicates = make_group('/videos/a.mkv', ['/videos/b.mkv'])
+        duplicates[0]['source_info'] = {'duration_seconds': 60.0}
+
+        release_duplicates(primary)
+
+        self.assertEqual(duplicates[0]['status'], "Analyzed")
+
+    def test_duplicates_that_moved_on_are_left_alone(self):
+        primary, duplicates = make_group('/videos/a.mkv', ['/videos/b.mkv', '/videos/c.mkv'])
+        duplicates[0]['status'] = "Completed"
+        duplicates[1]['duplicate_of'] = '/videos/other.mkv'
+
+        self.assertEqual(release_duplicates(primary), [])
+        self.assertEqual(duplicates[0]['status'], "Completed")
+        self.assertEqual(duplicates[1]['status'], "Duplicate")
+
+    def test_primary_without_duplicates(self):
+        primary = QueueRecord(0, '/videos/a.mkv', 100.0)
+        self.assertEqual(release_duplicates(primary), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
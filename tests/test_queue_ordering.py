@@ -0,0 +1,37 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from queue_ordering import get_deferred_keys, rank_by_savings_rate, select_for_deadline
+
+
+class DeadlineSelectionTest(unittest.TestCase):
+    def test_unanalyzed_queue_is_not_deferred(self):
+        candidates = [('a.mkv', None, None), ('b.mkv', None, 600.0), ('c.mkv', None, None)]
+        selected = select_for_deadline(candidates, 3600)
+        self.assertEqual(selected, set())
+        self.assertEqual(get_deferred_keys(candidates, selected), [])
+
+    def test_only_predicted_files_outside_the_plan_are_deferred(self):
+        candidates = [
+            ('big.mkv', 900.0, 3000.0),
+            ('small.mkv', 100.0, 3000.0),
+            ('new.mkv', None, None),
+        ]
+        selected = select_for_deadline(candidates, 3600)
+        self.assertEqual(selected, {'big.mkv'})
+        self.assertEqual(get_deferred_keys(candidates, selected), ['small.mkv'])
+
+    def test_knapsack_prefers_the_best_subset(self):
+        candidates = [('a', 500.0, 3600.0), ('b', 300.0, 1800.0), ('c', 300.0, 1800.0)]
+        self.assertEqual(select_for_deadline(candidates, 3600), {'b', 'c'})
+
+    def test_unpredicted_files_rank_last(self):
+        candidates = [('new', None, None), ('slow', 100.0, 3600.0), ('fast', 100.0, 600.0)]
+        self.assertEqual(rank_by_savings_rate(candidates), ['fast', 'slow', 'new'])
+
+
+if __name__ == '__main__':
+    unittest.main()
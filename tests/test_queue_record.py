@@ -0,0 +1,41 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from queue_record import MediaInfo, QueueRecord
+
+
+class MediaInfoTest(unittest.TestCase):
+    def test_only_probed_fields_are_present(self):
+        info = MediaInfo({'duration_seconds': 60.0, 'video_codec': 'hevc'})
+        self.assertNotIn('height', info)
+        self.assertIsNone(info.get('height'))
+        self.assertEqual(dict(info), {'duration_seconds': 60.0, 'video_codec': 'hevc'})
+        self.assertEqual(len(info), 2)
+        with self.assertRaises(KeyError):
+            info['height']
+
+    def test_extra_keys_and_explicit_none_are_kept(self):
+        info = MediaInfo({'width': None, 'predicted_savings': 0.3})
+        self.assertIn('width', info)
+        self.assertIsNone(info['width'])
+        self.assertEqual(dict(info), {'width': None, 'predicted_savings': 0.3})
+
+    def test_strings_are_shared_between_records(self):
+        first = MediaInfo({'video_codec': ''.join(['he', 'vc'])})
+        second = MediaInfo({'video_codec': ''.join(['he', 'vc'])})
+        self.assertIs(first['video_codec'], second['video_codec'])
+
+
+class QueueRecordTest(unittest.TestCase):
+    def test_unknown_keys_are_rejected(self):
+        record = QueueRecord(0, '/videos/a.mkv', 100.0)
+        with self.assertRaises(KeyError):
+            record['filename'] = 'a.mkv'
+        self.assertIsNone(record.get('filename'))
+
+
+if __name__ == '__main__':
+    unittest.main()
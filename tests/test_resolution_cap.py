@@ -0,0 +1,41 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resolution_cap import get_capped_size, get_display_size, get_rotation
+
+
+class CappedSizeTest(unittest.TestCase):
+    def test_landscape_source_is_scaled_into_the_box(self):
+        self.assertEqual(get_capped_size(3840, 2160, '1080p'), (1920, 1080))
+
+    def test_portrait_source_is_capped_on_its_short_side(self):
+        self.assertEqual(get_capped_size(2160, 3840, '1080p'), (1080, 1920))
+
+    def test_rotated_phone_video_keeps_its_orientation(self):
+        # Coded 3840x2160 with a 90 degree display matrix plays as portrait.
+        stream = {'width': 3840, 'height': 2160, 'side_data_list': [{'rotation': -90}]}
+        width, height = get_display_size(stream['width'], stream['height'], get_rotation(stream))
+        self.assertEqual((width, height), (2160, 3840))
+        self.assertEqual(get_capped_size(width, height, '1080p'), (1080, 1920))
+
+    def test_sizes_are_even(self):
+        width, height = get_capped_size(1998, 1080, '720p')
+        self.assertEqual((width % 2, height % 2), (0, 0))
+
+    def test_no_scaling_when_source_fits(self):
+        self.assertIsNone(get_capped_size(1920, 1080, '1080p'))
+        self.assertIsNone(get_capped_size(3840, 2160, 'none'))
+        self.assertIsNone(get_capped_size(0, 0, '720p'))
+
+    def test_rotation_from_legacy_tag(self):
+        self.assertEqual(get_rotation({'tags': {'rotate': '270'}}), 270)
+        self.assertEqual(get_display_size(1920, 1080, 270), (1080, 1920))
+        self.assertEqual(get_display_size(1920, 1080, 180), (1920, 1080))
+        self.assertEqual(get_rotation({}), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,9 @@
+import hashlib
 import json
 import os
-import re
 import shutil
 import subprocess
+import sys
 import tempfile
 import threading
 import time
@@ -10,6 +11,25 @@ from queue import Empty, Queue
 
 from PyQt5.QtCore import QObject, pyqtSignal
 
+from activity_log import write_log_entry
+from checkpoint import EncodeCheckpoint
+from encode_monitor import monitor_stream, parse_speed
+from fast_copy import copy_file, format_copy_report
+from finalizer import FinalizeWorker
+from history_store import EncodeHistoryStore
+from preset_planner import get_preset_speed_factor
+from process_control import resume_process, suspend_process, terminate_process
+from process_priority import (
+    DEFAULT_PRIORITY,
+    apply_process_priority,
+    build_popen_kwargs,
+    get_priority_label,
+    run_with_priority,
+)
+from resolution_cap import DEFAULT_RESOLUTION_CAP, get_capped_size, get_display_size, get_rotation
+from savings_predictor import SavingsPredictor, build_outcome
+from staging_cache import StagingCache
+
 
 class VideoProcessor(QObject):
     analysis_updated = pyqtSignal(int, object)
@@ -20,6 +40,7 @@ class VideoProcessor(QObject):
     current_eta_updated = pyqtSignal(str)
     runtime_updated = pyqtSignal(int, object)
     encoder_updated = pyqtSignal(int, str)
+    encoders_detected = pyqtSignal()
 
     ENCODER_PROFILES = {
         'auto': {
@@ -45,22 +66,53 @@ class VideoProcessor(QObject):
     }
 
     AUTO_PRIORITY = ['hevc_nvenc', 'h264_nvenc', 'av1_nvenc', 'libx265']
-    MAX_HISTORY_ITEMS = 200
-    TIME_PATTERN = re.compile(r'time=(\d+):(\d+):(\d+(?:\.\d+)?)')
-    SPEED_PATTERN = re.compile(r'speed=\s*([0-9.]+)x')
+    SPEED_ESTIMATE_SAMPLES = 8
+    DEFAULT_STAGING_CACHE_GB = 50
+    DEFAULT_RAM_STAGING_FOLDER = '/dev/shm' if os.path.isdir('/dev/shm') else ''
+    DEFAULT_RAM_STAGING_THRESHOLD_MB = 1024
+    DEFAULT_RAM_STAGING_BUDGET_MB = 4096
+    ENCODER_CACHE_PATH = 'encoder_cache.json'
+    ENCODER_DETECTION_TIMEOUT = 60
+    PROBE_WIDTH = 1280
+    PROBE_HEIGHT = 720
+    PROBE_FRAMES = 30
+    PROBE_TIMEOUT = 20
+    ENCODE_MONITOR_EXIT_TIMEOUT = 10
+    ENCODE_MONITOR_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'encode_monitor.py')
 
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
         self.cache_folder = ""
-        self.history_path = ""
+        self.history_backend = 'jsonl'
+        self.history_store = None
+        self.activity_log_path = ""
+        self.checkpoint_folder = ""
+        self.staging_cache = None
+        self.staging_cache_bytes = self.DEFAULT_STAGING_CACHE_GB * 1024 ** 3
+        self.ram_staging_cache = None
+        self.ram_staging_folder = ""
+        self.ram_staging_threshold_mb = 0.0
+        self.ram_staging_budget_mb = 0.0
+        self.ram_reserved_bytes = 0
+        self.ram_staging_lock = threading.Lock()
         self.stop_requested = False
-        self.current_process = None
-        self.current_cached_file_path = None
-        self.current_output_file = None
-        self.available_encoders = self.detect_available_encoders()
-        self.encode_history = []
+        self.active_jobs = {}
+        self.jobs_lock = threading.Lock()
+        self.pause_reasons = set()
+        self.finalizer = FinalizeWorker()
+        self.pending_finalize_outputs = set()
+        self.written_outputs = {}
+        self.savings_predictor = SavingsPredictor()
+        self.encoder_detection_done = threading.Event()
+        self.encoder_probes = {}
+        self.available_encoders = self.load_cached_encoders()
         self.set_cache_folder(os.path.join(tempfile.gettempdir(), "ez_ffmpeg_cache"))
+        self.set_ram_staging(
+            self.DEFAULT_RAM_STAGING_FOLDER,
+            self.DEFAULT_RAM_STAGING_THRESHOLD_MB,
+            self.DEFAULT_RAM_STAGING_BUDGET_MB,
+        )
 
     def get_available_encoder_options(self):
         options = [('auto', self.get_encoder_label('auto'))]
@@ -74,10 +126,141 @@ class VideoProcessor(QObject):
     def set_cache_folder(self, folder_path):
         normalized_path = os.path.abspath(folder_path)
         self.cache_folder = normalized_path
-        self.history_path = os.path.join(self.cache_folder, "encode_history.json")
+        self.activity_log_path = os.path.join(self.cache_folder, "ez_ffmpeg.log")
+        self.savings_predictor.log_path = self.activity_log_path
+        self.checkpoint_folder = os.path.join(self.cache_folder, "checkpoints")
+        self.scan_index_folder = os.path.join(self.cache_folder, "scan_index")
         os.makedirs(self.cache_folder, exist_ok=True)
-        self.encode_history = self.load_encode_history()
-        self.cleanup_stale_cache()
+        self.open_history_store()
+        self.staging_cache = StagingCache(os.path.join(self.cache_folder, "staging"), self.staging_cache_bytes)
+
+    def start_cache_cleanup(self):
+        # Clearing a large leftover cache can take minutes, so it never runs
+        # on the UI thread.
+        cache_folder = self.cache_folder
+        activity_log_path = self.activity_log_path
+
+        def run_cleanup():
+            started_at = time.perf_counter()
+            self.cleanup_stale_cache()
+            write_log_entry(
+                activity_log_path,
+                'STARTUP',
+                f"Cache cleanup of {cache_folder} finished in {time.perf_counter() - started_at:.2f}s",
+            )
+
+        threading.Thread(target=run_cleanup, daemon=True).start()
+
+    def set_staging_cache_limit(self, limit_gb):
+        self.staging_cache_bytes = max(float(limit_gb), 0.0) * 1024 ** 3
+        self.staging_cache.set_max_bytes(self.staging_cache_bytes)
+
+    def set_ram_staging(self, folder, threshold_mb, budget_mb):
+        self.ram_staging_folder = folder
+        self.ram_staging_threshold_mb = max(float(threshold_mb), 0.0)
+        self.ram_staging_budget_mb = max(float(budget_mb), 0.0)
+        self.ram_staging_cache = None
+        if not (folder and self.ram_staging_threshold_mb and self.ram_staging_budget_mb):
+            return
+        if not (os.path.isdir(folder) and os.access(folder, os.W_OK)):
+            print(f"RAM staging folder {folder} is not available; staging everything on disk")
+            return
+        self.ram_staging_cache = StagingCache(
+            os.path.join(folder, "ez_ffmpeg_staging"),
+            self.ram_staging_budget_mb * 1024 ** 2,
+        )
+
+    def select_staging_tier(self, job, source_path):
+        # Small sources go to RAM while they fit the budget; everything else,
+        # anything that would overcommit memory, and sources the disk cache
+        # already holds a copy of are staged on disk.
+        size = os.path.getsize(source_path)
+        ram_cache = self.ram_staging_cache
+        job['staging_key'] = None
+        if ram_cache and size <= self.ram_staging_threshold_mb * 1024 ** 2:
+            # Fingerprinting reads samples of the source, possibly over the
+            # network, so the key is kept for the acquire that follows.
+            job['staging_key'] = self.staging_cache.fingerprint(source_path)
+        if job['staging_key'] and not self.staging_cache.contains(source_path, job['staging_key']):
+            with self.ram_staging_lock:
+                fits_budget = self.ram_reserved_bytes + size <= ram_cache.max_bytes
+                if fits_budget and shutil.disk_usage(ram_cache.folder).free > size:
+                    self.ram_reserved_bytes += size
+                    job['staging_cache'] = ram_cache
+                    job['ram_reserved_bytes'] = size
+                    return 'RAM'
+        job['staging_cache'] = self.staging_cache
+        return 'disk'
+
+    def set_history_backend(self, backend):
+        if backend not in EncodeHistoryStore.BACKENDS:
+            print(f"Unknown history backend '{backend}', using jsonl")
+            backend = 'jsonl'
+        if backend == self.history_backend:
+            return
+        self.history_backend = backend
+        self.open_history_store()
+
+    def open_history_store(self):
+        if self.history_store is not None:
+            self.history_store.close()
+        self.history_store = EncodeHistoryStore(self.cache_folder, self.history_backend)
+
+    def get_ffmpeg_identity(self):
+        ffmpeg_path = shutil.which('ffmpeg')
+        if not ffmpeg_path:
+            return None
+        try:
+            return {'ffmpeg_path': os.path.realpath(ffmpeg_path), 'ffmpeg_mtime': os.path.getmtime(ffmpeg_path)}
+        except OSError:
+            return None
+
+    def load_cached_encoders(self):
+        identity = self.get_ffmpeg_identity()
+        if identity is None or not os.path.exists(self.ENCODER_CACHE_PATH):
+            return {'libx265'}
+        try:
+            with open(self.ENCODER_CACHE_PATH, 'r', encoding='utf-8') as cache_file:
+                cached = json.load(cache_file)
+        except Exception as exc:
+            print(f"Unable to read encoder cache: {exc}")
+            return {'libx265'}
+
+        if {key: cached.get(key) for key in identity} != identity:
+            return {'libx265'}
+        self.encoder_probes = cached.get('probes', {})
+        self.encoder_detection_done.set()
+        return set(cached.get('encoders', [])) | {'libx265'}
+
+    def start_encoder_detection(self):
+        threading.Thread(target=self.refresh_available_encoders, daemon=True).start()
+
+    def refresh_available_encoders(self):
+        # An encoder can be listed by ffmpeg and still fail at runtime (no GPU,
+        # old driver, unsupported codec), so each one must pass a test encode.
+        probes = {}
+        for encoder_key in self.detect_available_encoders():
+            probes[encoder_key] = self.probe_encoder(encoder_key)
+            if probes[encoder_key]['ok']:
+                print(f"Encoder {encoder_key} passed its test encode at {probes[encoder_key]['speed']:.2f}x")
+            else:
+                print(f"Encoder {encoder_key} is listed by ffmpeg but failed its test encode")
+        detected = {encoder_key for encoder_key, probe in probes.items() if probe['ok']} | {'libx265'}
+        self.encoder_probes = probes
+
+        identity = self.get_ffmpeg_identity()
+        if identity is not None:
+            try:
+                with open(self.ENCODER_CACHE_PATH, 'w', encoding='utf-8') as cache_file:
+                    json.dump({**identity, 'encoders': sorted(detected), 'probes': probes}, cache_file, indent=2)
+            except Exception as exc:
+                print(f"Unable to save encoder cache: {exc}")
+
+        changed = detected != self.available_encoders
+        self.available_encoders = detected
+        self.encoder_detection_done.set()
+        if changed:
+            self.encoders_detected.emit()
 
     def detect_available_encoders(self):
         detected = {'libx265'}
@@ -97,11 +280,53 @@ class VideoProcessor(QObject):
             print(f"Unable to detect FFmpeg encoders: {exc}")
         return detected
 
-    def get_encoder_label(self, encoder_key):
+    def probe_encoder(self, encoder_key):
+        cmd = [
+            'ffmpeg',
+            '-hide_banner',
+            '-nostdin',
+            '-f',
+            'lavfi',
+            '-i',
+            f'testsrc2=size={self.PROBE_WIDTH}x{self.PROBE_HEIGHT}:rate=30',
+            '-frames:v',
+            str(self.PROBE_FRAMES),
+            '-pix_fmt',
+            'yuv420p',
+            *self.build_video_args(encoder_key, 2000 * 1000),
+            '-f',
+            'null',
+            '-',
+        ]
+        probe = {'ok': False, 'speed': 0.0, 'pixels': self.PROBE_WIDTH * self.PROBE_HEIGHT}
+        started_at = time.perf_counter()
+        try:
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=self.PROBE_TIMEOUT,
+                check=False,
+            )
+        except Exception as exc:
+            print(f"Test encode with {encoder_key} failed: {exc}")
+            return probe
+
+        elapsed_seconds = max(time.perf_counter() - started_at, 0.001)
+        probe['ok'] = result.returncode == 0
+        if probe['ok']:
+            speeds = [parse_speed(line) for line in result.stderr.splitlines()]
+            speeds = [speed for speed in speeds if speed]
+            probe['speed'] = speeds[-1] if speeds else self.PROBE_FRAMES / 30.0 / elapsed_seconds
+        return probe
+
+    def get_encoder_label(self, encoder_key, preset=None):
         profile = self.ENCODER_PROFILES.get(encoder_key)
-        if profile:
-            return profile['label']
-        return encoder_key
+        label = profile['label'] if profile else encoder_key
+        if preset:
+            return f"{label} [{preset}]"
+        return label
 
     def resolve_encoder_mode(self, selected_mode):
         if selected_mode and selected_mode != 'auto' and selected_mode in self.available_encoders:
@@ -112,6 +337,9 @@ class VideoProcessor(QObject):
                 return encoder_key
         return 'libx265'
 
+    def resolve_priority_preset(self, record):
+        return record.get('priority_preset') or self.main_window.get_selected_priority_preset() or DEFAULT_PRIORITY
+
     def get_video_length(self, file_path):
         source_info = self.probe_media_info(file_path)
         if source_info:
@@ -150,8 +378,11 @@ class VideoProcessor(QObject):
             duration_seconds = self._safe_float(
                 format_info.get('duration') or video_stream.get('duration') or audio_stream.get('duration')
             )
-            width = self._safe_int(video_stream.get('width'))
-            height = self._safe_int(video_stream.get('height'))
+            width, height = get_display_size(
+                self._safe_int(video_stream.get('width')),
+                self._safe_int(video_stream.get('height')),
+                get_rotation(video_stream),
+            )
             audio_channels = self._safe_int(audio_stream.get('channels'))
 
             return {
@@ -188,12 +419,25 @@ class VideoProcessor(QObject):
         if not duration_seconds:
             return None
 
+        # Without a cached capability list, wait for the first detection so
+        # jobs do not fall back to libx265 just because startup was quick.
+        self.encoder_detection_done.wait(self.ENCODER_DETECTION_TIMEOUT)
         resolved_encoder = self.resolve_encoder_mode(self.main_window.get_selected_encoder_mode())
         width = source_info.get('width') or 0
         height = source_info.get('height') or 0
         mb_per_min_before = self.calculate_mb_per_min(record['size_mb'], duration_seconds)
-        estimated_seconds = self.estimate_encode_seconds(source_info, resolved_encoder)
-        estimated_output_size_mb = self.main_window.mb_min_slider.value() * (duration_seconds / 60.0)
+        resolution_cap = self.resolve_resolution_cap(record)
+        estimated_seconds = self.estimate_encode_seconds(source_info, resolved_encoder, resolution_cap=resolution_cap)
+        mb_min_target = self.main_window.mb_min_slider.value()
+        estimated_output_size_mb = mb_min_target * (duration_seconds / 60.0)
+        # Predicted here so a likely loser is visible in the queue before its
+        # encode is due, not only once it starts.
+        predicted_savings = self.get_predicted_savings(
+            {**source_info, 'mb_per_min_before': mb_per_min_before},
+            resolved_encoder,
+            mb_min_target,
+            self.get_encoded_size(source_info, resolution_cap)[1],
+        )
         audio_channels = source_info.get('audio_channels') or 0
         audio_codec = source_info.get('audio_codec') or 'None'
 
@@ -204,6 +448,7 @@ class VideoProcessor(QObject):
             'estimated_seconds': estimated_seconds,
             'estimated_display': self.format_seconds(estimated_seconds),
             'estimated_output_size_mb': estimated_output_size_mb,
+            'predicted_savings': predicted_savings,
             'resolved_encoder': resolved_encoder,
             'encoder_label': self.get_encoder_label(resolved_encoder),
             'video_codec_label': (source_info.get('video_codec') or 'Unknown').upper(),
@@ -211,25 +456,34 @@ class VideoProcessor(QObject):
             'audio_label': f"{audio_codec.upper()} {audio_channels}ch" if audio_channels else audio_codec.upper(),
         }
 
-    def estimate_encode_seconds(self, source_info, encoder_key):
+    def resolve_resolution_cap(self, record):
+        return record.get('resolution_cap') or self.main_window.get_selected_resolution_cap()
+
+    def get_encoded_size(self, source_info, resolution_cap=None):
+        width = source_info.get('width') or 0
+        height = source_info.get('height') or 0
+        return get_capped_size(width, height, resolution_cap or DEFAULT_RESOLUTION_CAP) or (width, height)
+
+    def estimate_encode_seconds(self, source_info, encoder_key, preset=None, resolution_cap=None):
         duration_seconds = source_info.get('duration_seconds')
         if not duration_seconds:
             return None
 
-        speed_multiplier = self.estimate_speed_multiplier(source_info, encoder_key)
+        speed_multiplier = self.estimate_speed_multiplier(source_info, encoder_key, resolution_cap)
+        speed_multiplier *= get_preset_speed_factor(encoder_key, preset)
         if speed_multiplier <= 0:
             return None
         return duration_seconds / speed_multiplier
 
-    def estimate_speed_multiplier(self, source_info, encoder_key):
-        pixels = (source_info.get('width') or 0) * (source_info.get('height') or 0)
+    def estimate_speed_multiplier(self, source_info, encoder_key, resolution_cap=None):
+        # Speeds are compared per encoded pixel, so a capped 2160p source is
+        # estimated like the smaller frame it is encoded at.
+        encoded_width, encoded_height = self.get_encoded_size(source_info, resolution_cap)
+        pixels = encoded_width * encoded_height
         weighted_total = 0.0
         total_weight = 0.0
 
-        for entry in reversed(self.encode_history):
-            if entry.get('encoder') != encoder_key:
-                continue
-
+        for entry in self.history_store.recent(encoder_key, self.SPEED_ESTIMATE_SAMPLES):
             weight = 1.0
             entry_pixels = entry.get('pixels') or 0
             if pixels and entry_pixels:
@@ -240,7 +494,13 @@ class VideoProcessor(QObject):
             if entry.get('stereo') == self.main_window.stereo_checkbox.isChecked():
                 weight += 0.25
 
-            weighted_total += entry.get('avg_speed', 0.0) * weight
+            # History is kept at the encoder's default preset speed so runs
+            # made under a deadline plan do not skew later estimates.
+            preset_factor = get_preset_speed_factor(encoder_key, entry.get('preset'))
+            entry_speed = entry.get('avg_speed', 0.0) / preset_factor
+            if pixels and entry_pixels:
+                entry_speed *= entry_pixels / pixels
+            weighted_total += entry_speed * weight
             total_weight += weight
 
             if total_weight >= 8:
@@ -249,11 +509,19 @@ class VideoProcessor(QObject):
         if total_weight > 0:
             return weighted_total / total_weight
 
+        # With no history yet, scale the speed measured by the test encode to
+        # this source's frame size.
+        probe = self.encoder_probes.get(encoder_key)
+        if probe and probe.get('ok') and probe.get('speed'):
+            if pixels and probe.get('pixels'):
+                return probe['speed'] * probe['pixels'] / pixels
+            return probe['speed']
+
         return self.ENCODER_PROFILES.get(encoder_key, {}).get('default_speed', 1.0)
 
     def build_output_path(self, file_path):
         base_name, extension = os.path.splitext(os.path.basename(file_path))
-        output_name = f"{base_name}_processed{extension}"
+        output_name = f"{self._cache_prefix(file_path)}_{base_name}_processed{extension}"
         return os.path.join(self.cache_folder, output_name)
 
     def build_final_output_path(self, file_path):
@@ -271,10 +539,61 @@ class VideoProcessor(QObject):
                 return candidate
             counter += 1
 
-    def build_ffmpeg_command(self, input_path, output_path, resolved_encoder, video_bitrate):
-        cmd = [
-            'ffmpeg',
-            '-hide_banner',
+    def build_ffmpeg_command(
+        self,
+        input_path,
+        output_path,
+        resolved_encoder,
+        video_bitrate,
+        preset=None,
+        scaled_size=None,
+    ):
+        cmd = self.build_input_args(input_path)
+        cmd.extend(self.build_video_args(resolved_encoder, video_bitrate, preset, scaled_size))
+        cmd.extend(self.build_audio_args())
+        cmd.extend(self.build_subtitle_args())
+        cmd.extend(['-y', output_path])
+        return cmd
+
+    def build_segmented_ffmpeg_command(
+        self,
+        input_path,
+        checkpoint,
+        checkpoint_run,
+        resolved_encoder,
+        video_bitrate,
+        preset=None,
+        scaled_size=None,
+    ):
+        segment_seconds = self.main_window.get_checkpoint_segment_seconds()
+        cmd = self.build_input_args(input_path, checkpoint_run['offset'])
+        cmd.extend(self.build_video_args(resolved_encoder, video_bitrate, preset, scaled_size))
+        cmd.extend(['-force_key_frames', f'expr:gte(t,n_forced*{segment_seconds})'])
+        cmd.extend(self.build_audio_args())
+        cmd.extend(self.build_subtitle_args())
+        cmd.extend([
+            '-f',
+            'segment',
+            '-segment_time',
+            str(segment_seconds),
+            '-segment_start_number',
+            str(checkpoint_run['first_index']),
+            '-segment_list',
+            checkpoint.get_run_list_path(checkpoint_run),
+            '-segment_list_type',
+            'csv',
+            '-reset_timestamps',
+            '1',
+            '-y',
+            checkpoint.get_segment_output_pattern(),
+        ])
+        return cmd
+
+    def build_input_args(self, input_path, start_offset=0.0):
+        cmd = ['ffmpeg', '-hide_banner']
+        if start_offset:
+            cmd.extend(['-ss', f'{start_offset:.3f}'])
+        cmd.extend([
             '-i',
             input_path,
             '-map',
@@ -285,17 +604,50 @@ class VideoProcessor(QObject):
             '0:a?',
             '-map',
             '0:s?',
-        ]
-        cmd.extend(self.build_video_args(resolved_encoder, video_bitrate))
-        cmd.extend(self.build_audio_args())
-        cmd.extend(self.build_subtitle_args())
-        cmd.extend(['-y', output_path])
+        ])
         return cmd
 
-    def build_video_args(self, encoder_key, video_bitrate):
+    def build_encode_signature(self, resolved_encoder, video_bitrate, scaled_size=None):
+        # The preset is left out so a re-planned job still resumes its segments.
+        # The frame size is not: segments of different sizes cannot be joined.
+        args = self.build_video_args(resolved_encoder, video_bitrate, scaled_size=scaled_size)
+        args.extend(self.build_audio_args())
+        args.extend(self.build_subtitle_args())
+        args.append(f"segment={self.main_window.get_checkpoint_segment_seconds()}")
+        return ' '.join(args)
+
+    def concat_segments(self, checkpoint, output_path):
+        concat_list_path = checkpoint.write_concat_list()
+        result = subprocess.run(
+            [
+                'ffmpeg',
+                '-hide_banner',
+                '-f',
+                'concat',
+                '-safe',
+                '0',
+                '-i',
+                concat_list_path,
+                '-map',
+                '0',
+                '-c',
+                'copy',
+                '-y',
+                output_path,
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        if result.returncode != 0:
+            stderr_text = result.stderr.decode('utf-8', errors='replace').strip()
+            print(f"Error joining segments into {output_path}: {stderr_text[-2000:]}")
+        return result.returncode
+
+    def build_video_args(self, encoder_key, video_bitrate, preset=None, scaled_size=None):
         bitrate_kbps = max(int(video_bitrate / 1000), 100)
         buffer_kbps = max(int(video_bitrate / 500), 200)
-        return [
+        args = [
             '-c:v',
             encoder_key,
             '-b:v',
@@ -305,6 +657,16 @@ class VideoProcessor(QObject):
             '-bufsize',
             f'{buffer_kbps}k',
         ]
+        if scaled_size:
+            # The size is a bound rather than exact, so a frame whose probed
+            # orientation is off is still never stretched.
+            args.extend([
+                '-vf',
+                f'scale={scaled_size[0]}:{scaled_size[1]}:force_original_aspect_ratio=decrease:force_divisible_by=2',
+            ])
+        if preset:
+            args.extend(['-preset', preset])
+        return args
 
     def build_audio_args(self):
         needs_audio_processing = (
@@ -326,52 +688,84 @@ class VideoProcessor(QObject):
     def build_subtitle_args(self):
         return ['-c:s', 'copy']
 
-    def enqueue_output(self, stream, queue):
-        try:
-            buffer = ""
-            while True:
-                chunk = stream.read(4096)
-                if not chunk:
-                    break
-
-                buffer += chunk.decode('utf-8', errors='replace')
-                parts = re.split(r'[\r\n]+', buffer)
-                buffer = parts.pop() if parts else ""
+    def start_encode_monitor(self, stream, reports, priority_preset, cpu_affinity):
+        # ffmpeg's stderr is split, parsed and echoed in a child process, so
+        # the GUI process only handles a couple of progress reports a second
+        # per job instead of competing for the GIL on every ffmpeg line.
+        if not getattr(sys, 'frozen', False):
+            try:
+                monitor = subprocess.Popen(
+                    [sys.executable, self.ENCODE_MONITOR_SCRIPT],
+                    stdin=stream,
+                    stdout=subprocess.PIPE,
+                    **build_popen_kwargs(priority_preset),
+                )
+            except OSError as exc:
+                print(f"Encode monitor unavailable ({exc}), parsing ffmpeg output in-process")
+            else:
+                apply_process_priority(monitor.pid, priority_preset, cpu_affinity)
+                stream.close()
+                threading.Thread(target=self.read_monitor_reports, args=(monitor.stdout, reports), daemon=True).start()
+                return monitor
 
-                for line in parts:
-                    if line:
-                        queue.put(line)
+        threading.Thread(target=self.monitor_in_process, args=(stream, reports), daemon=True).start()
+        return None
 
-            if buffer.strip():
-                queue.put(buffer)
+    def read_monitor_reports(self, stream, reports):
+        try:
+            for line in stream:
+                try:
+                    reports.put(json.loads(line))
+                except ValueError:
+                    continue
         except Exception as exc:
-            print(f"Error in enqueue_output: {exc}")
+            print(f"Error reading encode monitor: {exc}")
         finally:
             stream.close()
+            reports.put(None)
 
-    def delete_cached_file(self, cached_file_path):
-        retries = 3
-        for attempt in range(retries):
-            try:
-                if os.path.exists(cached_file_path):
-                    os.chmod(cached_file_path, 0o666)
-                    os.remove(cached_file_path)
-                    print(f"Deleted cached file: {cached_file_path}")
-                    break
-            except PermissionError:
-                print(f"Attempt {attempt + 1}: Permission denied for {cached_file_path}. Retrying...")
-                time.sleep(1)
-            except Exception as exc:
-                print(f"Error deleting {cached_file_path}: {exc}")
-                break
+    def monitor_in_process(self, stream, reports):
+        try:
+            monitor_stream(stream, reports.put, print)
+        except Exception as exc:
+            print(f"Error monitoring ffmpeg output: {exc}")
+        finally:
+            stream.close()
+            reports.put(None)
+
+    def release_staged_copy(self, job):
+        cached_file_path = job.get('cached_file_path')
+        if cached_file_path:
+            job['cached_file_path'] = None
+            job['staging_cache'].release(cached_file_path)
+        reserved_bytes = job.pop('ram_reserved_bytes', 0)
+        if reserved_bytes:
+            with self.ram_staging_lock:
+                self.ram_reserved_bytes -= reserved_bytes
 
     def cleanup_stale_cache(self):
         if not os.path.isdir(self.cache_folder):
             return
 
+        # Staged copies and checkpoints outlive the session; only encode
+        # outputs that no running job owns are treated as leftovers.
+        preserved_paths = {
+            os.path.abspath(self.activity_log_path),
+            os.path.abspath(self.checkpoint_folder),
+            os.path.abspath(self.scan_index_folder),
+            os.path.abspath(self.staging_cache.folder),
+        }
+        preserved_paths.update(os.path.abspath(path) for path in self.history_store.get_paths())
+        with self.jobs_lock:
+            preserved_paths.update(os.path.abspath(job['output_file']) for job in self.active_jobs.values())
+            preserved_paths.update(os.path.abspath(path) for path in self.pending_finalize_outputs)
+        self.staging_cache.clean_orphans()
+        ram_staging_cache = self.ram_staging_cache
+        if ram_staging_cache is not None:
+            ram_staging_cache.clean_orphans()
         for entry in os.listdir(self.cache_folder):
             entry_path = os.path.join(self.cache_folder, entry)
-            if os.path.abspath(entry_path) == os.path.abspath(self.history_path):
+            if os.path.abspath(entry_path) in preserved_paths:
                 continue
 
             try:
@@ -388,43 +782,171 @@ class VideoProcessor(QObject):
     def abort_active_process(self):
         self.stop_requested = True
 
-        if self.current_process and self.current_process.poll() is None:
-            try:
-                self.current_process.terminate()
-                self.current_process.wait(timeout=5)
-            except Exception as exc:
-                print(f"Error terminating active ffmpeg process: {exc}")
+        with self.jobs_lock:
+            jobs = list(self.active_jobs.values())
+
+        for job in jobs:
+            terminate_process(job.get('process'))
+
+            output_file = job.get('output_file')
+            if output_file and os.path.exists(output_file):
                 try:
-                    self.current_process.kill()
-                except Exception as kill_exc:
-                    print(f"Error killing active ffmpeg process: {kill_exc}")
+                    os.remove(output_file)
+                except Exception as exc:
+                    print(f"Error deleting partial output {output_file}: {exc}")
+
+        with self.jobs_lock:
+            self.active_jobs.clear()
+
+    def get_encoding_speeds(self):
+        with self.jobs_lock:
+            return [
+                job['speed_multiplier']
+                for job in self.active_jobs.values()
+                if job.get('process') and not job['suspended']
+            ]
+
+    def get_speed_observations(self):
+        # (predicted, live) speed pairs for the deadline preset planner.
+        with self.jobs_lock:
+            return [
+                (job['predicted_speed'], job['speed_multiplier'])
+                for job in self.active_jobs.values()
+                if job.get('process') and not job['suspended'] and job['speed_multiplier'] > 0
+            ]
+
+    def get_active_pids(self):
+        with self.jobs_lock:
+            return [job['process'].pid for job in self.active_jobs.values() if job.get('process')]
+
+    def is_paused(self):
+        return bool(self.pause_reasons)
+
+    def set_pause_reasons(self, reasons):
+        with self.jobs_lock:
+            was_paused = bool(self.pause_reasons)
+            self.pause_reasons = set(reasons)
+            is_paused = bool(self.pause_reasons)
+            jobs = list(self.active_jobs.values())
+
+        if is_paused and not was_paused:
+            print(f"Pausing active encodes: {', '.join(sorted(self.pause_reasons))}")
+            for job in jobs:
+                self._suspend_job(job)
+        elif was_paused and not is_paused:
+            print("Resuming active encodes")
+            for job in jobs:
+                # Preempted jobs stay suspended until their urgent job is done.
+                if not job['preempted']:
+                    self._resume_job(job)
+
+    def preempt_job(self, candidate_paths):
+        # Suspends the candidate with the most encoding left so an urgent job
+        # can take its slot. Jobs still probing or copying are left running.
+        with self.jobs_lock:
+            jobs = [
+                (file_path, job)
+                for file_path, job in self.active_jobs.items()
+                if file_path in candidate_paths and job.get('process') and not job['suspended']
+            ]
+        if not jobs:
+            return None
 
-        if self.current_output_file and os.path.exists(self.current_output_file):
-            try:
-                os.remove(self.current_output_file)
-            except Exception as exc:
-                print(f"Error deleting partial output {self.current_output_file}: {exc}")
+        file_path, job = max(jobs, key=lambda item: item[1]['eta_seconds'] or 0.0)
+        job['preempted'] = True
+        if not self._suspend_job(job, "Preempted"):
+            job['preempted'] = False
+            return None
+        return file_path
+
+    def get_preempted_paths(self):
+        with self.jobs_lock:
+            return [file_path for file_path, job in self.active_jobs.items() if job['preempted']]
 
-        if self.current_cached_file_path:
-            self.delete_cached_file(self.current_cached_file_path)
+    def resume_preempted_job(self, file_path):
+        with self.jobs_lock:
+            job = self.active_jobs.get(file_path)
+        if job is None or not job['preempted']:
+            return False
+        job['preempted'] = False
+        if not self.is_paused():
+            self._resume_job(job)
+        return True
 
-        self.current_process = None
-        self.current_output_file = None
-        self.current_cached_file_path = None
+    def _suspend_job(self, job, status="Paused"):
+        if job['suspended'] or not job.get('process'):
+            return False
+        if not suspend_process(job['process']):
+            return False
+        job['suspended'] = True
+        job['paused_at'] = time.time()
+        self.status_updated.emit(job['row'], status)
+        return True
+
+    def _resume_job(self, job):
+        if not job['suspended']:
+            return
+        if resume_process(job['process']):
+            job['suspended'] = False
+            job['paused_seconds'] += time.time() - job['paused_at']
+            job['paused_at'] = None
+            self.status_updated.emit(job['row'], "Processing")
+
+    def _get_paused_seconds(self, job):
+        paused_seconds = job['paused_seconds']
+        if job['paused_at'] is not None:
+            paused_seconds += time.time() - job['paused_at']
+        return paused_seconds
+
+    def _wait_while_paused(self, job):
+        if not self.is_paused():
+            return True
+
+        self.status_updated.emit(job['row'], "Paused")
+        while self.is_paused():
+            if self.stop_requested:
+                return False
+            time.sleep(0.5)
+        return True
+
+    def _register_job(self, record, output_file):
+        job = {
+            'row': record['row'],
+            'process': None,
+            'cached_file_path': None,
+            'staging_cache': None,
+            'staging_key': None,
+            'output_file': output_file,
+            'speed_multiplier': 0.0,
+            'predicted_speed': 0.0,
+            'eta_seconds': None,
+            'suspended': False,
+            'preempted': False,
+            'paused_at': None,
+            'paused_seconds': 0.0,
+        }
+        with self.jobs_lock:
+            self.active_jobs[record['file_path']] = job
+        return job
+
+    def _unregister_job(self, file_path):
+        with self.jobs_lock:
+            self.active_jobs.pop(file_path, None)
+
+    def _is_lead_job(self, file_path):
+        # The shared progress bar follows the oldest running job when several encode at once.
+        with self.jobs_lock:
+            lead_path = next((path for path, job in self.active_jobs.items() if not job['preempted']), None)
+        return lead_path == file_path
 
     def process_video(self, record):
-        process = None
-        cached_file_path = os.path.join(self.cache_folder, os.path.basename(record['file_path']))
         output_file = self.build_output_path(record['file_path'])
         row = record['row']
         length_seconds = None
-        last_speed_multiplier = 0.0
-        last_avg_speed_multiplier = 0.0
+        checkpoint = None
+        job = self._register_job(record, output_file)
 
         try:
-            self.stop_requested = False
-            self.current_cached_file_path = cached_file_path
-            self.current_output_file = output_file
             self.status_updated.emit(row, "Probing")
             analysis = self.analyze_video(record)
             if not analysis:
@@ -439,98 +961,408 @@ class VideoProcessor(QObject):
 
             self.status_updated.emit(row, "Checking thresholds")
             if mb_per_min_before < (mb_min_target + threshold):
-                self.output_updated.emit(
-                    row,
-                    {
-                        'output_size_mb': record['size_mb'],
-                        'mb_per_min_after': mb_per_min_before,
-                    },
-                )
-                self.runtime_updated.emit(
-                    row,
-                    {
-                        'eta_seconds': 0.0,
-                        'eta_display': '00:00:00',
-                        'elapsed_seconds': 0.0,
-                        'elapsed_display': '',
-                        'avg_speed_multiplier': 0.0,
-                        'avg_speed_display': '',
-                    },
-                )
-                self.delete_cached_file(cached_file_path)
-                self.status_updated.emit(row, "Skipped")
+                self._skip_job(row, record, mb_per_min_before)
                 return
 
-            if not os.path.exists(cached_file_path):
-                self.status_updated.emit(row, "Copying to cache")
-                shutil.copy2(record['file_path'], cached_file_path)
-                print(f"Copied {record['file_path']} to {cached_file_path}")
-
             target_bitrate = (mb_min_target * 1024 * 1024 * 8) / 60 * 0.9
             audio_bitrate = 192 * 1024 if self._is_audio_reencoded() else 0
             video_bitrate = max(target_bitrate - audio_bitrate, 100 * 1024)
             resolved_encoder = analysis['resolved_encoder']
+            resolution_cap = self.resolve_resolution_cap(record)
+            scaled_size = get_capped_size(analysis['width'], analysis['height'], resolution_cap)
+            encoded_height = scaled_size[1] if scaled_size else analysis['height']
+            predicted_savings = self.predict_savings(record, analysis, resolved_encoder, mb_min_target, encoded_height)
+            if (
+                predicted_savings is not None
+                and self.savings_predictor.action == 'skip'
+                and self.savings_predictor.is_below_floor(predicted_savings)
+            ):
+                self._skip_job(row, record, mb_per_min_before)
+                return
+            encoder_preset = record.get('encoder_preset')
+            job['predicted_speed'] = (
+                self.estimate_speed_multiplier(analysis, resolved_encoder, resolution_cap)
+                * get_preset_speed_factor(resolved_encoder, encoder_preset)
+            )
+            self.encoder_updated.emit(row, self.get_encoder_label(resolved_encoder, encoder_preset))
+            if scaled_size:
+                print(
+                    f"Scaling {record['file_path']} from {analysis['width']}x{analysis['height']} "
+                    f"to {scaled_size[0]}x{scaled_size[1]}"
+                )
 
-            self.encoder_updated.emit(row, self.get_encoder_label(resolved_encoder))
-            cmd = self.build_ffmpeg_command(cached_file_path, output_file, resolved_encoder, video_bitrate)
-            self.status_updated.emit(row, "Launching encoder")
-            self.status_updated.emit(row, "Processing")
+            if self.main_window.is_checkpoint_mode_enabled():
+                checkpoint = EncodeCheckpoint(
+                    self.checkpoint_folder,
+                    record['file_path'],
+                    self.build_encode_signature(resolved_encoder, video_bitrate, scaled_size),
+                )
+                job['checkpoint'] = checkpoint
+
+            encode_result = {
+                'returncode': 0,
+                'elapsed_seconds': 0.0,
+                'avg_speed_multiplier': 0.0,
+                'target_mb_per_min': mb_min_target,
+                'predicted_savings': predicted_savings,
+                'encoded_size': scaled_size or (analysis['width'], analysis['height']),
+            }
+            if checkpoint and checkpoint.is_complete(length_seconds):
+                print(f"All segments of {record['file_path']} already encoded")
+            else:
+                priority_preset = self.resolve_priority_preset(record)
+                cpu_affinity = self.main_window.get_cpu_affinity_override()
+
+                staging_tier = self.select_staging_tier(job, record['file_path'])
+                copy_status = f"Copying to {staging_tier} cache"
+                print(f"Staging {record['file_path']} in the {staging_tier} cache")
+
+                def copy_to_cache(source_path, staged_path):
+                    self.status_updated.emit(row, copy_status)
+                    run_with_priority(
+                        priority_preset,
+                        cpu_affinity,
+                        self.copy_with_progress,
+                        source_path,
+                        staged_path,
+                        row,
+                        copy_status,
+                    )
 
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
-                bufsize=0,
+                cached_file_path = job['staging_cache'].acquire(
+                    record['file_path'],
+                    copy_to_cache,
+                    job['staging_key'],
+                )
+                job['cached_file_path'] = cached_file_path
+
+                resume_offset = 0.0
+                if checkpoint:
+                    checkpoint_run = checkpoint.start_run()
+                    resume_offset = checkpoint_run['offset']
+                    if resume_offset:
+                        print(f"Resuming {record['file_path']} from {self.format_seconds(resume_offset)}")
+                    cmd = self.build_segmented_ffmpeg_command(
+                        cached_file_path,
+                        checkpoint,
+                        checkpoint_run,
+                        resolved_encoder,
+                        video_bitrate,
+                        encoder_preset,
+                        scaled_size,
+                    )
+                else:
+                    cmd = self.build_ffmpeg_command(
+                        cached_file_path,
+                        output_file,
+                        resolved_encoder,
+                        video_bitrate,
+                        encoder_preset,
+                        scaled_size,
+                    )
+
+                if not self._wait_while_paused(job):
+                    self._stop_job(record, job)
+                    return
+                encode_result = self._run_encoder(
+                    record,
+                    job,
+                    cmd,
+                    length_seconds,
+                    priority_preset,
+                    cpu_affinity,
+                    resume_offset,
+                )
+                if encode_result is None:
+                    self._stop_job(record, job)
+                    return
+                encode_result['preset'] = encoder_preset
+
+            if encode_result['returncode'] == 0 and checkpoint:
+                self.status_updated.emit(row, "Joining segments")
+                encode_result['returncode'] = self.concat_segments(checkpoint, output_file)
+
+            if encode_result['returncode'] == 0:
+                if self._is_lead_job(record['file_path']):
+                    self.progress_updated.emit(100.0)
+                    self.current_eta_updated.emit('--')
+                    self.speed_updated.emit('')
+                self.status_updated.emit(row, "Finalizing")
+                # Validation and the replace/move copy run on the finalizer so the
+                # dispatcher can launch the next encode right away.
+                finalize_job = {
+                    'row': row,
+                    'output_file': output_file,
+                    'staged_copy': (job['staging_cache'], job['cached_file_path']),
+                }
+                # The staged input is no longer read, so its pin and any RAM it
+                # holds are returned before the finalizer starts copying.
+                self.release_staged_copy(job)
+                with self.jobs_lock:
+                    self.pending_finalize_outputs.add(output_file)
+                self.finalizer.submit(self.finalize_video, record, finalize_job, analysis, checkpoint, encode_result)
+            else:
+                self.status_updated.emit(row, "Error: See log")
+                if self._is_lead_job(record['file_path']):
+                    self.speed_updated.emit('')
+                    self.current_eta_updated.emit('--')
+                if os.path.exists(output_file):
+                    os.remove(output_file)
+
+        except Exception as exc:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+            if self._is_lead_job(record['file_path']):
+                self.speed_updated.emit('')
+                self.current_eta_updated.emit('--')
+            self.status_updated.emit(row, f"Exception: {exc}")
+            print(f"Exception: {exc}")
+        finally:
+            self.release_staged_copy(job)
+            self._unregister_job(record['file_path'])
+
+    def get_predicted_savings(self, analysis, encoder_key, target_mb_per_min, encoded_height=None):
+        predictor = self.savings_predictor
+        if not predictor.is_enabled():
+            return None
+        history_entries = self.history_store.recent(encoder_key, predictor.HISTORY_SAMPLES)
+        return predictor.predict(history_entries, analysis, target_mb_per_min, encoded_height)
+
+    def predict_savings(self, record, analysis, encoder_key, target_mb_per_min, encoded_height=None):
+        predictor = self.savings_predictor
+        predicted_savings = self.get_predicted_savings(analysis, encoder_key, target_mb_per_min, encoded_height)
+        if predicted_savings is None or not predictor.is_below_floor(predicted_savings):
+            return predicted_savings
+        verb = "Skipping" if predictor.action == 'skip' else "Encoding anyway"
+        write_log_entry(
+            self.activity_log_path,
+            'PREDICT',
+            f"{verb} {record['file_path']}: predicted {predicted_savings * 100:.0f}% saved, "
+            f"below the {predictor.floor_percent:.0f}% floor",
+        )
+        return predicted_savings
+
+    def _skip_job(self, row, record, mb_per_min_before):
+        self.output_updated.emit(
+            row,
+            {
+                'output_size_mb': record['size_mb'],
+                'mb_per_min_after': mb_per_min_before,
+            },
+        )
+        self.runtime_updated.emit(
+            row,
+            {
+                'eta_seconds': 0.0,
+                'eta_display': '00:00:00',
+                'elapsed_seconds': 0.0,
+                'elapsed_display': '',
+                'avg_speed_multiplier': 0.0,
+                'avg_speed_display': '',
+            },
+        )
+        self.status_updated.emit(row, "Skipped")
+
+    def _stop_job(self, record, job):
+        if os.path.exists(job['output_file']):
+            os.remove(job['output_file'])
+        self.status_updated.emit(job['row'], "Stopped (resumable)" if job.get('checkpoint') else "Stopped")
+        if self._is_lead_job(record['file_path']):
+            self.speed_updated.emit('')
+            self.current_eta_updated.emit('--')
+
+    def finalize_video(self, record, job, analysis, checkpoint, encode_result):
+        row = job['row']
+        output_file = job['output_file']
+        length_seconds = analysis['duration_seconds']
+        last_avg_speed_multiplier = encode_result['avg_speed_multiplier']
+        completed = False
+
+        try:
+            output_size_mb = os.path.getsize(output_file) / (1024 * 1024)
+            mb_per_min_after = self.calculate_mb_per_min(output_size_mb, length_seconds)
+            output_length = self.get_video_length(output_file)
+            length_check = output_length is not None and abs(output_length - length_seconds) <= 8
+            size_check = output_size_mb < record['size_mb']
+            if length_check:
+                # Outputs that came out too large teach the savings predictor
+                # as much as the ones that are kept.
+                self.record_encode_outcome(record, analysis, encode_result, output_size_mb)
+
+            if not (length_check and size_check):
+                if os.path.exists(output_file):
+                    os.remove(output_file)
+                if checkpoint:
+                    checkpoint.discard()
+                error_message = f"Error: Processing failed for {record['file_path']} due to "
+                if not length_check:
+                    error_message += "length mismatch, "
+                if not size_check:
+                    error_message += "output not smaller"
+                self.status_updated.emit(row, error_message.strip(", "))
+                return
+
+            self.output_updated.emit(
+                row,
+                {
+                    'output_size_mb': output_size_mb,
+                    'mb_per_min_after': mb_per_min_after,
+                },
             )
-            self.current_process = process
-            queue = Queue()
-            threading.Thread(target=self.enqueue_output, args=(process.stderr, queue), daemon=True).start()
+            self.runtime_updated.emit(
+                row,
+                {
+                    'eta_seconds': 0.0,
+                    'eta_display': '00:00:00',
+                    'elapsed_seconds': encode_result['elapsed_seconds'],
+                    'elapsed_display': self.format_seconds(encode_result['elapsed_seconds']),
+                    'avg_speed_multiplier': last_avg_speed_multiplier,
+                    'avg_speed_display': self.format_speed(last_avg_speed_multiplier),
+                },
+            )
+
+            if self.main_window.replace_checkbox.isChecked():
+                self.status_updated.emit(row, "Replacing")
+                final_output_path = record['file_path']
+                if not self.replace_file(record['file_path'], output_file, row):
+                    return
+            else:
+                self.status_updated.emit(row, "Moving output")
+                final_output_path = self.build_final_output_path(record['file_path'])
+                if not self.move_output_file(output_file, final_output_path, row):
+                    return
+            self.remember_written_output(final_output_path)
+
+            if checkpoint:
+                checkpoint.discard()
+            self.status_updated.emit(row, "Completed")
+            completed = True
+            self.apply_result_to_duplicates(record, final_output_path, output_size_mb, mb_per_min_after)
+        except Exception as exc:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+            self.status_updated.emit(row, f"Exception: {exc}")
+            print(f"Exception: {exc}")
+        finally:
+            with self.jobs_lock:
+                self.pending_finalize_outputs.discard(output_file)
+            staging_cache, cached_file_path = job['staged_copy']
+            if completed and cached_file_path:
+                staging_cache.evict(cached_file_path)
+
+    def apply_result_to_duplicates(self, record, final_output_path, output_size_mb, mb_per_min_after):
+        duplicates = record.get('duplicate_records') or []
+        if not duplicates or not self.main_window.is_apply_to_duplicates_enabled():
+            return
+
+        for duplicate in duplicates:
+            if duplicate['status'] != "Duplicate":
+                continue
+            duplicate_row = duplicate['row']
+            duplicate_path = duplicate['file_path']
+            partial_path = f"{duplicate_path}.ez_ffmpeg_partial"
+            try:
+                # Content was matched when the folder was scanned; a copy that
+                # changed since then gets encoded on its own instead.
+                if os.path.getsize(duplicate_path) / (1024 * 1024) != record['size_mb']:
+                    print(f"{duplicate_path} changed since the duplicate check, queueing it separately")
+                    self.status_updated.emit(duplicate_row, "Queued")
+                    continue
 
+                if self.main_window.replace_checkbox.isChecked():
+                    self.copy_with_progress(final_output_path, partial_path, duplicate_row, "Copying result")
+                    if not self.replace_file(duplicate_path, partial_path, duplicate_row):
+                        if os.path.exists(partial_path):
+                            os.remove(partial_path)
+                        continue
+                    target_path = duplicate_path
+                else:
+                    target_path = self.build_final_output_path(duplicate_path)
+                    self.copy_with_progress(final_output_path, target_path, duplicate_row, "Copying result")
+                self.remember_written_output(target_path)
+                self.output_updated.emit(
+                    duplicate_row,
+                    {
+                        'output_size_mb': output_size_mb,
+                        'mb_per_min_after': mb_per_min_after,
+                    },
+                )
+                self.status_updated.emit(duplicate_row, "Completed")
+            except Exception as exc:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                print(f"Error applying result of {record['file_path']} to {duplicate_path}: {exc}")
+                self.status_updated.emit(duplicate_row, "Error: Failed to copy result")
+
+    def _run_encoder(self, record, job, cmd, length_seconds, priority_preset, cpu_affinity, resume_offset=0.0):
+        row = job['row']
+        last_speed_multiplier = 0.0
+        last_avg_speed_multiplier = 0.0
+        self.status_updated.emit(row, "Launching encoder")
+        self.status_updated.emit(row, "Processing")
+
+        print(f"Launching ffmpeg with {get_priority_label(priority_preset)} priority")
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            **build_popen_kwargs(priority_preset),
+        )
+        apply_process_priority(process.pid, priority_preset, cpu_affinity)
+        job['process'] = process
+        reports = Queue()
+        monitor = self.start_encode_monitor(process.stderr, reports, priority_preset, cpu_affinity)
+        try:
             start_time = time.time()
-            current_seconds = 0.0
+            current_seconds = resume_offset
+            if self.is_paused():
+                self._suspend_job(job)
 
             while True:
                 if self.stop_requested:
-                    try:
-                        process.terminate()
-                        process.wait(timeout=5)
-                    except Exception as exc:
-                        print(f"Error stopping ffmpeg: {exc}")
-                    if os.path.exists(output_file):
-                        os.remove(output_file)
-                    self.delete_cached_file(cached_file_path)
-                    self.status_updated.emit(row, "Stopped")
-                    self.speed_updated.emit('')
-                    self.current_eta_updated.emit('--')
-                    return
+                    terminate_process(process)
+                    return None
 
                 try:
-                    line = queue.get(timeout=0.1)
+                    report = reports.get(timeout=0.1)
                 except Empty:
-                    if process.poll() is not None:
-                        break
                     continue
+                if report is None:
+                    # ffmpeg closed its stderr, normally because it exited.
+                    break
 
-                parsed_time = self.parse_progress_time(line)
-                if parsed_time is not None:
-                    current_seconds = parsed_time
+                is_lead_job = self._is_lead_job(record['file_path'])
+                if report.get('time') is not None:
+                    current_seconds = resume_offset + report['time']
                     progress = min((current_seconds / length_seconds) * 100, 100.0)
-                    self.progress_updated.emit(progress)
-
-                parsed_speed = self.parse_speed(line)
-                if parsed_speed is not None:
-                    speed_text, last_speed_multiplier = parsed_speed
-                    self.speed_updated.emit(speed_text)
-
-                if current_seconds and length_seconds:
-                    elapsed_seconds = max(time.time() - start_time, 0.0)
-                    last_avg_speed_multiplier = current_seconds / elapsed_seconds if elapsed_seconds else 0.0
+                    if is_lead_job:
+                        self.progress_updated.emit(progress)
+
+                if report.get('speed'):
+                    last_speed_multiplier = report['speed']
+                    # ffmpeg averages speed over wall time since launch, which
+                    # includes any time the process spent suspended.
+                    paused_seconds = self._get_paused_seconds(job)
+                    wall_seconds = time.time() - start_time
+                    if paused_seconds and wall_seconds > paused_seconds:
+                        last_speed_multiplier *= wall_seconds / (wall_seconds - paused_seconds)
+                    job['speed_multiplier'] = last_speed_multiplier
+                    if is_lead_job:
+                        self.speed_updated.emit(self.format_speed(last_speed_multiplier))
+
+                if current_seconds > resume_offset and length_seconds:
+                    elapsed_seconds = max(time.time() - start_time - self._get_paused_seconds(job), 0.0)
+                    encoded_seconds = current_seconds - resume_offset
+                    last_avg_speed_multiplier = encoded_seconds / elapsed_seconds if elapsed_seconds else 0.0
                     eta_seconds = None
                     if last_speed_multiplier > 0:
                         eta_seconds = max((length_seconds - current_seconds) / last_speed_multiplier, 0.0)
+                    job['eta_seconds'] = eta_seconds
 
                     eta_display = self.format_seconds(eta_seconds)
-                    self.current_eta_updated.emit(eta_display)
+                    if is_lead_job:
+                        self.current_eta_updated.emit(eta_display)
                     self.runtime_updated.emit(
                         row,
                         {
@@ -543,88 +1375,60 @@ class VideoProcessor(QObject):
                         },
                     )
 
-                print(line.strip())
-
-            process.wait()
-            if process.returncode == 0:
-                self.status_updated.emit(row, "Finalizing")
-                output_size_mb = os.path.getsize(output_file) / (1024 * 1024)
-                mb_per_min_after = self.calculate_mb_per_min(output_size_mb, length_seconds)
-                output_length = self.get_video_length(output_file)
-                length_check = output_length is not None and abs(output_length - length_seconds) <= 8
-                size_check = output_size_mb < record['size_mb']
-
-                if not (length_check and size_check):
-                    if os.path.exists(output_file):
-                        os.remove(output_file)
-                    error_message = f"Error: Processing failed for {record['file_path']} due to "
-                    if not length_check:
-                        error_message += "length mismatch, "
-                    if not size_check:
-                        error_message += "output not smaller"
-                    self.status_updated.emit(row, error_message.strip(", "))
-                    self.delete_cached_file(cached_file_path)
-                    return
-
-                self.output_updated.emit(
-                    row,
-                    {
-                        'output_size_mb': output_size_mb,
-                        'mb_per_min_after': mb_per_min_after,
-                    },
-                )
-                self.progress_updated.emit(100.0)
-                self.current_eta_updated.emit('--')
-                self.runtime_updated.emit(
-                    row,
-                    {
-                        'eta_seconds': 0.0,
-                        'eta_display': '00:00:00',
-                        'elapsed_seconds': time.time() - start_time,
-                        'elapsed_display': self.format_seconds(time.time() - start_time),
-                        'avg_speed_multiplier': last_avg_speed_multiplier,
-                        'avg_speed_display': self.format_speed(last_avg_speed_multiplier),
-                    },
-                )
-
-                if self.main_window.replace_checkbox.isChecked():
-                    self.status_updated.emit(row, "Replacing")
-                    if not self.replace_file(record['file_path'], output_file, row):
-                        self.delete_cached_file(cached_file_path)
-                        return
-                else:
-                    self.status_updated.emit(row, "Moving output")
-                    final_output_path = self.build_final_output_path(record['file_path'])
-                    if not self.move_output_file(output_file, final_output_path, row):
-                        self.delete_cached_file(cached_file_path)
-                        return
-
-                self.record_encode_history(analysis, resolved_encoder, last_avg_speed_multiplier)
-                self.speed_updated.emit('')
-                self.status_updated.emit(row, "Completed")
-                self.delete_cached_file(cached_file_path)
-            else:
-                self.status_updated.emit(row, "Error: See log")
-                self.speed_updated.emit('')
-                self.current_eta_updated.emit('--')
-                if os.path.exists(output_file):
-                    os.remove(output_file)
-                self.delete_cached_file(cached_file_path)
-
-        except Exception as exc:
-            if os.path.exists(output_file):
-                os.remove(output_file)
-            self.delete_cached_file(cached_file_path)
-            self.speed_updated.emit('')
-            self.current_eta_updated.emit('--')
-            self.status_updated.emit(row, f"Exception: {exc}")
-            print(f"Exception: {exc}")
+            try:
+                process.wait(timeout=self.ENCODE_MONITOR_EXIT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                # The monitor went away while ffmpeg was still writing to it.
+                print(f"Encode monitor for {record['file_path']} exited early, stopping ffmpeg")
+                terminate_process(process)
+            return {
+                'returncode': process.returncode,
+                'elapsed_seconds': max(time.time() - start_time - self._get_paused_seconds(job), 0.0),
+                'avg_speed_multiplier': last_avg_speed_multiplier,
+            }
         finally:
-            if process and process.stderr:
-                process.stderr.close()
-            self.current_process = None
-            self.current_output_file = None
-            self.current_cached_file_path = None
+            job['process'] = None
+            if monitor is not None:
+                try:
+                    monitor.wait(timeout=self.ENCODE_MONITOR_EXIT_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    monitor.kill()
+
+    def copy_with_progress(self, source_path, destination_path, row, status_text):
+        def report_progress(copied_bytes, total_bytes, mb_per_second):
+            percent = copied_bytes * 100.0 / total_bytes if total_bytes else 100.0
+            self.status_updated.emit(row, f"{status_text} ({percent:.0f}%, {mb_per_second:.0f} MB/s)")
+
+        copy_result = copy_file(
+            source_path,
+            destination_path,
+            self.main_window.get_copy_limit_mb_per_second(),
+            report_progress,
+        )
+        print(f"Copied {source_path} to {destination_path} ({format_copy_report(copy_result)})")
+        return copy_result
+
+    def remember_written_output(self, file_path):
+        # A folder watch must not queue our own results as new media; the size
+        # tells them apart from a later file saved under the same name.
+        with self.jobs_lock:
+            self.written_outputs[os.path.abspath(file_path)] = os.path.getsize(file_path)
+
+    def is_written_output(self, file_path):
+        with self.jobs_lock:
+            written_size = self.written_outputs.get(os.path.abspath(file_path))
+        try:
+            return written_size is not None and written_size == os.path.getsize(file_path)
+        except OSError:
+            return False
+
+    def is_same_device(self, first_path, second_path):
+        try:
+            first_device = os.stat(first_path).st_dev
+            second_device = os.stat(os.path.dirname(os.path.abspath(second_path))).st_dev
+        except OSError:
+            return False
+        return first_device == second_device
 
     def replace_file(self, original_path, new_path, row):
         try:
@@ -641,16 +1445,14 @@ class VideoProcessor(QObject):
                 if current_attributes & FILE_ATTRIBUTE_ARCHIVE:
                     ctypes.windll.kernel32.SetFileAttributesW(original_path, current_attributes & ~FILE_ATTRIBUTE_ARCHIVE)
 
-            original_drive = os.path.splitdrive(os.path.abspath(original_path))[0].lower()
-            new_drive = os.path.splitdrive(os.path.abspath(new_path))[0].lower()
-
-            if original_drive == new_drive:
+            if self.is_same_device(new_path, original_path):
                 os.replace(new_path, original_path)
             else:
                 backup_path = self.build_backup_path(original_path)
                 os.replace(original_path, backup_path)
                 try:
-                    shutil.move(new_path, original_path)
+                    self.copy_with_progress(new_path, original_path, row, "Replacing")
+                    os.remove(new_path)
                 except Exception:
                     if os.path.exists(backup_path):
                         os.replace(backup_path, original_path)
@@ -680,7 +1482,11 @@ class VideoProcessor(QObject):
 
     def move_output_file(self, processed_path, final_path, row):
         try:
-            shutil.move(processed_path, final_path)
+            if self.is_same_device(processed_path, final_path):
+                os.replace(processed_path, final_path)
+            else:
+                self.copy_with_progress(processed_path, final_path, row, "Moving output")
+                os.remove(processed_path)
             self.status_updated.emit(row, f"Saved as {os.path.basename(final_path)}")
             return True
         except Exception as exc:
@@ -688,56 +1494,60 @@ class VideoProcessor(QObject):
             self.status_updated.emit(row, "Error: Failed to move processed file")
             return False
 
-    def record_encode_history(self, source_info, encoder_key, avg_speed_multiplier):
+    def record_encode_outcome(self, record, analysis, encode_result, output_size_mb):
+        encoded_size = encode_result.get('encoded_size')
+        outcome = build_outcome(
+            analysis,
+            record['size_mb'],
+            output_size_mb,
+            encode_result.get('target_mb_per_min'),
+            encoded_size[1] if encoded_size else None,
+        )
+        self.record_encode_history(
+            analysis,
+            analysis['resolved_encoder'],
+            encode_result['avg_speed_multiplier'],
+            encode_result.get('preset'),
+            outcome,
+            encoded_size,
+        )
+        if outcome:
+            self.savings_predictor.record_result(
+                record['file_path'],
+                encode_result.get('predicted_savings'),
+                1.0 - outcome['size_ratio'],
+            )
+
+    def record_encode_history(
+        self,
+        source_info,
+        encoder_key,
+        avg_speed_multiplier,
+        preset=None,
+        outcome=None,
+        encoded_size=None,
+    ):
         if avg_speed_multiplier <= 0:
             return
 
+        width, height = encoded_size or (source_info.get('width') or 0, source_info.get('height') or 0)
+
         entry = {
             'encoder': encoder_key,
-            'pixels': (source_info.get('width') or 0) * (source_info.get('height') or 0),
+            'pixels': (width or 0) * (height or 0),
             'duration_seconds': source_info.get('duration_seconds'),
             'normalize': self.main_window.normalize_checkbox.isChecked(),
             'stereo': self.main_window.stereo_checkbox.isChecked(),
             'avg_speed': avg_speed_multiplier,
+            'preset': preset,
             'timestamp': time.time(),
         }
-        self.encode_history.append(entry)
-        self.encode_history = self.encode_history[-self.MAX_HISTORY_ITEMS:]
-        self.save_encode_history()
-
-    def load_encode_history(self):
-        if not os.path.exists(self.history_path):
-            return []
-        try:
-            with open(self.history_path, 'r', encoding='utf-8') as history_file:
-                return json.load(history_file)
-        except Exception as exc:
-            print(f"Unable to load encode history: {exc}")
-            return []
-
-    def save_encode_history(self):
+        entry.update(outcome or {})
         try:
-            with open(self.history_path, 'w', encoding='utf-8') as history_file:
-                json.dump(self.encode_history, history_file, indent=2)
+            self.history_store.append(entry)
         except Exception as exc:
             print(f"Unable to save encode history: {exc}")
 
-    def parse_progress_time(self, line):
-        match = self.TIME_PATTERN.search(line)
-        if not match:
-            return None
-        hours, minutes, seconds = match.groups()
-        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
-
-    def parse_speed(self, line):
-        match = self.SPEED_PATTERN.search(line)
-        if not match:
-            return None
-        speed_multiplier = self._safe_float(match.group(1))
-        if speed_multiplier <= 0:
-            return None
-        return f"{speed_multiplier:.2f}x", speed_multiplier
-
     def format_speed(self, speed_multiplier):
         if not speed_multiplier or speed_multiplier <= 0:
             return ""
@@ -750,6 +1560,9 @@ class VideoProcessor(QObject):
             or self.main_window.stereo_checkbox.isChecked()
         )
 
+    def _cache_prefix(self, file_path):
+        return hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:8]
+
     def _safe_float(self, value):
         try:
             return float(value)